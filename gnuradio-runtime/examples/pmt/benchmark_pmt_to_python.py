@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Measure pmt.to_python / pmt.to_pmt on nested tag dictionaries.
+
+Builds metadata dicts like those attached to bursts by hardware sources
+(rx_time tuples, frequencies, nested per-channel dicts and vectors) and
+reports conversions per second in both directions.
+"""
+
+import sys
+import time
+import pmt
+from optparse import OptionParser
+
+def make_tag_dict(nkeys, depth):
+    d = {
+        'rx_time': (1234567890L, 0.125),
+        'rx_rate': 1e6,
+        'rx_freq': 2.45e9,
+        'burst': True,
+        'antenna': 'RX2',
+    }
+    for i in range(nkeys):
+        d['key%d' % i] = [i, float(i), 'value%d' % i]
+    if depth > 0:
+        d['channels'] = [make_tag_dict(nkeys/2, depth-1) for i in range(2)]
+    return d
+
+def benchmark(nkeys, depth, niter):
+    obj = make_tag_dict(nkeys, depth)
+
+    start = time.time()
+    for i in xrange(niter):
+        p = pmt.to_pmt(obj)
+    to_pmt = time.time() - start
+
+    start = time.time()
+    for i in xrange(niter):
+        pmt.to_python(p)
+    to_python = time.time() - start
+
+    print "keys: %4d  depth: %d  to pmt: %10.4g dicts/sec  to python: %10.4g dicts/sec" % (
+        nkeys, depth, niter/to_pmt, niter/to_python)
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-n", "--niter", type="int", default=1000,
+                      help="conversions per dict shape [default=%default]")
+    (options, args) = parser.parse_args()
+    if len(args) != 0:
+        parser.print_help()
+        sys.exit(1)
+
+    for nkeys in (0, 8, 64):
+        for depth in (0, 2, 4):
+            benchmark(nkeys, depth, options.niter)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Measure PDU <-> numpy conversion throughput.
+
+Converts PDUs (metadata dict, uniform vector) of 1k to 1M items to numpy
+arrays and back and reports items per second for each supported dtype.
+"""
+
+import sys
+import time
+import numpy
+import pmt
+from pmt import pmt_to_python as pmt2py
+from optparse import OptionParser
+
+DTYPES = (numpy.uint8, numpy.int16, numpy.int32, numpy.int64,
+          numpy.float32, numpy.complex64, numpy.complex128)
+
+def benchmark(dtype, nitems, niter):
+    data = numpy.ones(nitems, dtype=dtype)
+    meta = pmt.to_pmt({'packet_num': 0})
+
+    start = time.time()
+    for i in xrange(niter):
+        pdu = pmt.cons(meta, pmt2py.numpy_to_uvector(data))
+    to_pmt = time.time() - start
+
+    start = time.time()
+    for i in xrange(niter):
+        pmt2py.uvector_to_numpy(pmt.cdr(pdu))
+    to_numpy = time.time() - start
+
+    print "%10s: items: %8d  to pmt: %10.4g items/sec  to numpy: %10.4g items/sec" % (
+        numpy.dtype(dtype).name, nitems,
+        nitems*niter/to_pmt, nitems*niter/to_numpy)
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-n", "--niter", type="int", default=100,
+                      help="conversions per PDU size [default=%default]")
+    (options, args) = parser.parse_args()
+    if len(args) != 0:
+        parser.print_help()
+        sys.exit(1)
+
+    for dtype in DTYPES:
+        for nitems in (1000, 10000, 100000, 1000000):
+            benchmark(dtype, nitems, options.niter)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Measure the per-call overhead of Python blocks.
+
+Runs a flowgraph with a no-op gr.sync_block and reports work() calls per
+second, then times building ndarray views with and without the view cache
+used by the gateway.
+"""
+
+import sys
+import time
+import numpy
+from optparse import OptionParser
+from gnuradio import gr, blocks
+from gnuradio.gr import gateway
+from gnuradio.eng_option import eng_option
+
+class noop_block(gr.sync_block):
+    def __init__(self, nports):
+        gr.sync_block.__init__(
+            self,
+            name = "noop",
+            in_sig = [numpy.complex64]*nports,
+            out_sig = [numpy.complex64]*nports,
+        )
+        self.ncalls = 0
+
+    def work(self, input_items, output_items):
+        self.ncalls += 1
+        return len(output_items[0])
+
+def benchmark_flowgraph(nitems, chunk, nports):
+    tb = gr.top_block()
+    src = blocks.null_source(gr.sizeof_gr_complex)
+    head = blocks.head(gr.sizeof_gr_complex, int(nitems))
+    op = noop_block(nports)
+    op.set_max_noutput_items(chunk)
+    tb.connect(src, head, (op, 0))
+    for i in range(nports):
+        if i > 0:
+            tb.connect(blocks.null_source(gr.sizeof_gr_complex), (op, i))
+        tb.connect((op, i), blocks.null_sink(gr.sizeof_gr_complex))
+    start = time.time()
+    tb.run()
+    delta = time.time() - start
+    print "flowgraph: ports: %2d  chunk: %6d  calls: %8d  time: %6.3f  calls/sec: %10.4g" % (
+        nports, chunk, op.ncalls, delta, op.ncalls/delta)
+
+def benchmark_views(ncalls, chunk):
+    buf = numpy.zeros(chunk, numpy.complex64)
+    addr = buf.__array_interface__['data'][0]
+    dtype = numpy.dtype(numpy.complex64)
+
+    start = time.time()
+    for i in xrange(ncalls):
+        gateway.pointer_to_ndarray(addr, dtype, chunk)
+    uncached = time.time() - start
+
+    cache = gateway.ndarray_view_cache()
+    start = time.time()
+    for i in xrange(ncalls):
+        cache(addr, dtype, chunk)
+    cached = time.time() - start
+
+    print "views: uncached: %10.4g views/sec  cached: %10.4g views/sec" % (
+        ncalls/uncached, ncalls/cached)
+
+def main():
+    parser = OptionParser(option_class=eng_option)
+    parser.add_option("-N", "--nitems", type="eng_float", default=10e6,
+                      help="number of items to push through the flowgraph [default=%default]")
+    parser.add_option("-c", "--chunk", type="intx", default=512,
+                      help="maximum items per work call [default=%default]")
+    parser.add_option("-p", "--nports", type="int", default=1,
+                      help="number of input and output ports [default=%default]")
+    parser.add_option("-n", "--ncalls", type="intx", default=100000,
+                      help="number of views to build [default=%default]")
+    (options, args) = parser.parse_args()
+    if len(args) != 0:
+        parser.print_help()
+        sys.exit(1)
+
+    benchmark_views(options.ncalls, options.chunk)
+    benchmark_flowgraph(options.nitems, options.chunk, options.nports)
+
+if __name__ == '__main__':
+    main()
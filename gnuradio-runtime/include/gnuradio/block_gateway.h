@@ -115,6 +115,24 @@ namespace gr {
     //! Provide access to the shared message object
     virtual block_gw_message_type &block_message(void) = 0;
 
+    /*!
+     * Batch the calls into the python work function.
+     *
+     * Sync, decim and interp gateways hold off calling work until
+     * enough input is available to produce at least \p min_items
+     * output items, so that the python callback runs on larger
+     * vectors. A smaller chunk is passed on once \p max_latency
+     * seconds have passed since the block first had to wait, or when
+     * an upstream block is done. The thread-per-block scheduler wakes
+     * the block up at the deadline also when no more input arrives.
+     *
+     * \param min_items minimum number of output items per call (<= 1 disables batching)
+     * \param max_latency deadline in seconds (<= 0 waits for a full batch)
+     */
+    virtual void set_min_batch(int min_items, double max_latency) = 0;
+    virtual int min_batch(void) const = 0;
+    virtual double max_batch_latency(void) const = 0;
+
     long block__unique_id(void) const {
       return gr::block::unique_id();
     }
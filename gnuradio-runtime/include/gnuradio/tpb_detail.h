@@ -24,6 +24,7 @@
 
 #include <gnuradio/api.h>
 #include <gnuradio/thread/thread.h>
+#include <boost/thread/thread_time.hpp>
 #include <deque>
 #include <pmt/pmt.h>
 
@@ -40,10 +41,12 @@ namespace gr {
     gr::thread::condition_variable	input_cond;
     bool				output_changed;
     gr::thread::condition_variable	output_cond;
+    boost::system_time			input_deadline;	//< wake up while waiting for input
 
   public:
     tpb_detail()
-      : input_changed(false), output_changed(false) { }
+      : input_changed(false), output_changed(false),
+        input_deadline(boost::posix_time::pos_infin) { }
 
     //! Called by us to tell all our upstream blocks that their output
     //! may have changed.
@@ -68,6 +71,16 @@ namespace gr {
       gr::thread::scoped_lock guard(mutex);
       input_changed = false;
       output_changed = false;
+      input_deadline = boost::posix_time::pos_infin;
+    }
+
+    //! Called by our block during an iteration to run the next
+    //! iteration at \p deadline at the latest, even without new input.
+    void set_input_deadline(const boost::system_time &deadline)
+    {
+      gr::thread::scoped_lock guard(mutex);
+      if(deadline < input_deadline)
+        input_deadline = deadline;
     }
 
   private:
@@ -21,6 +21,8 @@
 
 #include "block_gateway_impl.h"
 #include <gnuradio/io_signature.h>
+#include <gnuradio/block_detail.h>
+#include <gnuradio/buffer.h>
 #include <iostream>
 #include <boost/bind.hpp>
 
@@ -61,7 +63,10 @@ namespace gr {
                                          const unsigned factor)
     : block(name, in_sig, out_sig),
       _handler(handler),
-      _work_type(work_type)
+      _work_type(work_type),
+      _min_batch(0),
+      _max_batch_latency(0),
+      _batch_pending(false)
   {
     switch(_work_type) {
     case GR_BLOCK_GW_WORK_GENERAL:
@@ -103,12 +108,52 @@ namespace gr {
 
     default:
       unsigned ninputs = ninput_items_required.size();
-      for(unsigned i = 0; i < ninputs; i++)
-        ninput_items_required[i] = fixed_rate_noutput_to_ninput(noutput_items);
+      int nminimum = fixed_rate_noutput_to_ninput(noutput_items);
+      int nbatch = fixed_rate_noutput_to_ninput(batch_noutput_items(noutput_items));
+      for(unsigned i = 0; i < ninputs; i++) {
+        // never ask for more than the input buffer can ever hold
+        int nmax = detail()->input(i)->max_possible_items_available();
+        ninput_items_required[i] = std::max(nminimum, std::min(nbatch, nmax));
+      }
       return;
     }
   }
 
+  int
+  block_gateway_impl::batch_noutput_items(int noutput_items)
+  {
+    if(_min_batch <= 1 || noutput_items >= _min_batch)
+      return noutput_items;
+
+    // don't hold back the tail of a finished stream
+    for(int i = 0; i < detail()->ninputs(); i++) {
+      if(detail()->input(i)->done())
+        return noutput_items;
+    }
+
+    boost::system_time now = boost::get_system_time();
+    if(!_batch_pending) {
+      _batch_pending = true;
+      _batch_deadline = now + boost::posix_time::microseconds
+        (static_cast<long>(_max_batch_latency*1e6));
+    }
+    else if(_max_batch_latency > 0 && now >= _batch_deadline) {
+      return noutput_items;
+    }
+    // come back at the deadline even if no more input arrives
+    if(_max_batch_latency > 0)
+      detail()->d_tpb.set_input_deadline(_batch_deadline);
+    return _min_batch;
+  }
+
+  void
+  block_gateway_impl::set_min_batch(int min_items, double max_latency)
+  {
+    _min_batch = min_items;
+    _max_batch_latency = max_latency;
+    _batch_pending = false;
+  }
+
   int
   block_gateway_impl::general_work(int noutput_items,
                                    gr_vector_int &ninput_items,
@@ -145,6 +190,7 @@ namespace gr {
     _message.work_args_noutput_items = noutput_items;
     copy_pointers(_message.work_args_input_items, input_items);
     _message.work_args_output_items = output_items;
+    _batch_pending = false;
     _handler->calleval(0);
     return _message.work_args_return_value;
   }
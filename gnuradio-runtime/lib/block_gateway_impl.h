@@ -24,6 +24,7 @@
 #define INCLUDED_RUNTIME_BLOCK_GATEWAY_IMPL_H
 
 #include <gnuradio/block_gateway.h>
+#include <boost/thread/thread_time.hpp>
 
 namespace gr {
 
@@ -63,11 +64,22 @@ namespace gr {
 
     block_gw_message_type& block_message(void);
 
+    void set_min_batch(int min_items, double max_latency);
+    int min_batch(void) const { return _min_batch; }
+    double max_batch_latency(void) const { return _max_batch_latency; }
+
   private:
     feval_ll *_handler;
     block_gw_message_type _message;
     const block_gw_work_type _work_type;
     unsigned _decim, _interp;
+
+    int _min_batch;
+    double _max_batch_latency;
+    bool _batch_pending;
+    boost::system_time _batch_deadline;
+
+    int batch_noutput_items(int noutput_items);
   };
 
 } /* namespace gr */
@@ -27,6 +27,7 @@
 #include <gnuradio/prefs.h>
 #include <boost/thread.hpp>
 #include <boost/foreach.hpp>
+#include <algorithm>
 #include <pmt/pmt.h>
 #include <iostream>
 
@@ -150,7 +151,8 @@ namespace gr {
 
           // wait for input or message
           while(!d->d_tpb.input_changed && block->empty_handled_p()){
-            boost::system_time const timeout=boost::get_system_time()+ boost::posix_time::milliseconds(250);
+            boost::system_time const timeout=std::min(boost::get_system_time()+ boost::posix_time::milliseconds(250),
+                                                      d->d_tpb.input_deadline);
             if(!d->d_tpb.input_cond.timed_wait(guard, timeout)){
               goto tpb_loop_top; // timeout occurred (perform sanity checks up top)
             }
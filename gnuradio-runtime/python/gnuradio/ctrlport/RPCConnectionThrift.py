@@ -27,8 +27,14 @@ from thrift.protocol import TBinaryProtocol
 from gnuradio.ctrlport.GNURadio import ControlPort
 from gnuradio.ctrlport import RPCConnection
 from gnuradio import gr
+import exceptions
+import itertools
+import numpy
 import pmt
+import re
 import sys
+import threading
+import time
 
 class ThriftRadioClient:
     def __init__(self, host, port):
@@ -81,6 +87,8 @@ class RPCConnectionThrift(RPCConnection.RPCConnection):
             port = int(port)
 
         super(RPCConnectionThrift, self).__init__(method='thrift', port=port, host=host)
+        # the client may be shared with a KnobPoller thread
+        self.lock = threading.RLock()
         self.newConnection(host, port)
 
         self.unpack_dict = {
@@ -101,6 +109,25 @@ class RPCConnectionThrift(RPCConnection.RPCConnection):
             self.BaseTypes.C32VECTOR: lambda k,b: self.Knob(k, b.value.a_c32vector, self.BaseTypes.C32VECTOR),
         }
 
+        # getKnobsMulti returns the plain values, vectors as NumPy arrays
+        self.value_dict = {
+            self.BaseTypes.BOOL:      lambda b: b.value.a_bool,
+            self.BaseTypes.BYTE:      lambda b: b.value.a_byte,
+            self.BaseTypes.SHORT:     lambda b: b.value.a_short,
+            self.BaseTypes.INT:       lambda b: b.value.a_int,
+            self.BaseTypes.LONG:      lambda b: b.value.a_long,
+            self.BaseTypes.DOUBLE:    lambda b: b.value.a_double,
+            self.BaseTypes.STRING:    lambda b: b.value.a_string,
+            self.BaseTypes.COMPLEX:   lambda b: complex(b.value.a_complex.re, b.value.a_complex.im),
+            self.BaseTypes.F32VECTOR: lambda b: numpy.array(b.value.a_f32vector, dtype=numpy.float32),
+            self.BaseTypes.F64VECTOR: lambda b: numpy.array(b.value.a_f64vector, dtype=numpy.float64),
+            self.BaseTypes.S64VECTOR: lambda b: numpy.array(b.value.a_s64vector, dtype=numpy.int64),
+            self.BaseTypes.S32VECTOR: lambda b: numpy.array(b.value.a_s32vector, dtype=numpy.int32),
+            self.BaseTypes.S16VECTOR: lambda b: numpy.array(b.value.a_s16vector, dtype=numpy.int16),
+            self.BaseTypes.S8VECTOR:  lambda b: numpy.frombuffer(b.value.a_s8vector, dtype=numpy.int8),
+            self.BaseTypes.C32VECTOR: lambda b: self._complex_array(b.value.a_c32vector),
+        }
+
         self.pack_dict = {
             self.BaseTypes.BOOL:      lambda k: ttypes.Knob(type=k.ktype, value=ttypes.KnobBase(a_bool = k.value)),
             self.BaseTypes.BYTE:      lambda k: ttypes.Knob(type=k.ktype, value=ttypes.KnobBase(a_byte = k.value)),
@@ -127,6 +154,21 @@ class RPCConnectionThrift(RPCConnection.RPCConnection):
             sys.stderr.write("unpackKnobs: Incorrect Knob type: {0}\n".format(knob.type))
             raise exceptions.ValueError
 
+    def unpackValue(self, key, knob):
+        f = self.value_dict.get(knob.type, None)
+        if(f):
+            return f(knob)
+        else:
+            sys.stderr.write("unpackValue: Incorrect Knob type: {0}\n".format(knob.type))
+            raise exceptions.ValueError
+
+    @staticmethod
+    def _complex_array(values):
+        a = numpy.empty(len(values), dtype=numpy.complex64)
+        a.real = [c.re for c in values]
+        a.imag = [c.im for c in values]
+        return a
+
     def packKnob(self, knob):
         f = self.pack_dict.get(knob.ktype, None)
         if(f):
@@ -143,7 +185,8 @@ class RPCConnectionThrift(RPCConnection.RPCConnection):
             sys.exit(1)
 
     def properties(self, *args):
-        knobprops = self.thriftclient.radio.properties(*args)
+        with self.lock:
+            knobprops = self.thriftclient.radio.properties(*args)
         for key, knobprop in knobprops.iteritems():
             #print("key:", key, "value:", knobprop, "type:", knobprop.type)
             knobprops[key].min = self.unpackKnob(key, knobprop.min)
@@ -153,28 +196,84 @@ class RPCConnectionThrift(RPCConnection.RPCConnection):
 
     def getKnobs(self, *args):
         result = {}
-        for key, knob in self.thriftclient.radio.getKnobs(*args).iteritems():
+        with self.lock:
+            knobs = self.thriftclient.radio.getKnobs(*args)
+        for key, knob in knobs.iteritems():
             #print("key:", key, "value:", knob, "type:", knob.type)
             result[key] = self.unpackKnob(key, knob)
 
             # If complex, convert to Python complex
-            # FIXME: better list iterator way to handle this?
             if(knob.type == self.BaseTypes.C32VECTOR):
-                for i in xrange(len(result[key].value)):
-                    result[key].value[i] = complex(result[key].value[i].re,
-                                                   result[key].value[i].im)
+                result[key].value = [complex(c.re, c.im) for c in result[key].value]
         return result
 
+    def getKnobsMulti(self, keylists=(), relists=()):
+        '''
+        Gets several lists of knobs and lists of regular expressions
+        at once, with one getKnobs and one getRe request at most.
+        As with getKnobs and getRe, an empty list selects all knobs.
+        The knobs of the regular expressions are split up again with
+        Python's re module, so the expressions should not use syntax
+        beyond what both it and the server's regex engine understand.
+
+        Returns a tuple of two lists, holding a dict for every key
+        list and for every list of regular expressions. The dicts map
+        the knob names to their values, vector values are NumPy arrays.
+        Keys that do not exist are left out.
+        '''
+        keylists = list(keylists)
+        relists = list(relists)
+        with self.lock:
+            knobs = {}
+            if keylists:
+                if min(map(len, keylists)) == 0:
+                    keys = []
+                else:
+                    keys = list(set(itertools.chain(*keylists)))
+                knobs = self.thriftclient.radio.getKnobs(keys)
+            reknobs = {}
+            if relists:
+                if min(map(len, relists)) == 0:
+                    res = []
+                else:
+                    res = list(set(itertools.chain(*relists)))
+                reknobs = self.thriftclient.radio.getRe(res)
+
+        values = dict((key, self.unpackValue(key, knob))
+                      for key, knob in itertools.chain(knobs.iteritems(), reknobs.iteritems()))
+
+        key_results = []
+        for keylist in keylists:
+            if len(keylist) == 0:
+                key_results.append(dict((key, values[key]) for key in knobs))
+            else:
+                key_results.append(dict((key, values[key]) for key in keylist if key in knobs))
+
+        re_results = []
+        for relist in relists:
+            if len(relist) == 0:
+                re_results.append(dict((key, values[key]) for key in reknobs))
+            else:
+                # the server matches whole names
+                matchers = [re.compile("(?:{0})\\Z".format(r)).match for r in relist]
+                re_results.append(dict((key, values[key]) for key in reknobs
+                                       if any(m(key) for m in matchers)))
+        return (key_results, re_results)
+
     def getKnobsRaw(self, *args):
         result = {}
-        for key, knob in self.thriftclient.radio.getKnobs(*args).iteritems():
+        with self.lock:
+            knobs = self.thriftclient.radio.getKnobs(*args)
+        for key, knob in knobs.iteritems():
             #print("key:", key, "value:", knob, "type:", knob.type)
             result[key] = knob
         return result
 
     def getRe(self,*args):
         result = {}
-        for key, knob in self.thriftclient.radio.getRe(*args).iteritems():
+        with self.lock:
+            knobs = self.thriftclient.radio.getRe(*args)
+        for key, knob in knobs.iteritems():
             result[key] = self.unpackKnob(key, knob)
         return result
 
@@ -184,18 +283,21 @@ class RPCConnectionThrift(RPCConnection.RPCConnection):
             result = {}
             for key, knob in a.iteritems():
                 result[key] = self.packKnob(knob)
-            self.thriftclient.radio.setKnobs(result)
+            with self.lock:
+                self.thriftclient.radio.setKnobs(result)
         elif(type(*args) == list or type(*args) == tuple):
             a = list(*args)
             result = {}
             for k in a:
                 result[k.key] = self.packKnob(k)
-            self.thriftclient.radio.setKnobs(result)
+            with self.lock:
+                self.thriftclient.radio.setKnobs(result)
         else:
             sys.stderr.write("setKnobs: Invalid type; must be dict, list, or tuple\n")
 
     def shutdown(self):
-        self.thriftclient.radio.shutdown()
+        with self.lock:
+            self.thriftclient.radio.shutdown()
 
     def postMessage(self, blk_alias, port, msg):
         '''
@@ -209,9 +311,10 @@ class RPCConnectionThrift(RPCConnection.RPCConnection):
         The alias and port names are converted to PMT symbols and
         serialized. The msg is already a PMT and so just serialized.
         '''
-        self.thriftclient.radio.postMessage(pmt.serialize_str(pmt.intern(blk_alias)),
-                                            pmt.serialize_str(pmt.intern(port)),
-                                            pmt.serialize_str(msg));
+        with self.lock:
+            self.thriftclient.radio.postMessage(pmt.serialize_str(pmt.intern(blk_alias)),
+                                                pmt.serialize_str(pmt.intern(port)),
+                                                pmt.serialize_str(msg));
 
     def printProperties(self, props):
         info = ""
@@ -223,3 +326,73 @@ class RPCConnectionThrift(RPCConnection.RPCConnection):
         info += "Type Code:\t0x{0:x}\n".format(props.type)
         info += "Disp Code:\t0x{0:x}\n".format(props.display)
         return info
+
+
+class KnobPoller(threading.Thread):
+    '''
+    Background thread that polls knobs of a RPCConnectionThrift at a
+    fixed rate.
+
+    Each poll gets all key lists and lists of regular expressions
+    with a single getKnobsMulti call, and every subscriber receives
+    the snapshot as callback(timestamp, key_results, re_results).
+    The callbacks run in the poller thread and share the result
+    dicts, so they must not modify them. GUI code has to pass the
+    snapshot on to its own thread. If a poll fails, the exception is
+    passed to the error callbacks and polling goes on. Polls that
+    are due while a slow poll is running are skipped.
+
+    Args:
+        conn: the RPCConnectionThrift to poll
+        rate: polls per second
+        keylists: lists of knob names, see getKnobsMulti
+        relists: lists of regular expressions, see getKnobsMulti
+    '''
+
+    def __init__(self, conn, rate, keylists=(), relists=()):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.conn = conn
+        self.period = 1.0 / rate
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._subscribers = []
+        self.set_queries(keylists, relists)
+
+    def set_queries(self, keylists=(), relists=()):
+        with self._lock:
+            self._queries = (list(keylists), list(relists))
+
+    def subscribe(self, callback, error_callback=None):
+        with self._lock:
+            self._subscribers.append((callback, error_callback))
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[0] != callback]
+
+    def stop(self):
+        self._done.set()
+
+    def run(self):
+        next_poll = time.time()
+        while not self._done.is_set():
+            with self._lock:
+                (keylists, relists) = self._queries
+                subscribers = list(self._subscribers)
+            try:
+                (key_results, re_results) = self.conn.getKnobsMulti(keylists, relists)
+            except Exception as e:
+                for (callback, error_callback) in subscribers:
+                    if error_callback is not None:
+                        error_callback(e)
+            else:
+                timestamp = time.time()
+                for (callback, error_callback) in subscribers:
+                    callback(timestamp, key_results, re_results)
+
+            now = time.time()
+            next_poll += self.period
+            if next_poll < now:
+                next_poll += self.period * int((now - next_poll) / self.period + 1)
+            self._done.wait(next_poll - now)
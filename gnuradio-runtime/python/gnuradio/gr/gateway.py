@@ -41,6 +41,41 @@ def pointer_to_ndarray(addr, dtype, nitems):
         }
     return numpy.asarray(array_like()).view(dtype.base)
 
+########################################################################
+# Cache of ndarray views onto the scheduler buffers
+########################################################################
+class ndarray_view_cache(object):
+    """
+    Reuse the ndarray views handed to work() across calls.
+
+    The scheduler passes the same buffer addresses and item counts over
+    and over again in steady state, so a view is built once per
+    (address, dtype, nitems) and then looked up. The cache is bounded;
+    when it fills up it is simply cleared and refilled.
+
+    The views alias the scheduler buffers, so work() must not keep a
+    reference to them or change their shape between calls.
+    """
+
+    def __init__(self, max_entries=256):
+        self._max_entries = max_entries
+        self._views = {}
+
+    def __call__(self, addr, dtype, nitems):
+        addr = int(addr)
+        key = (addr, dtype, nitems)
+        try:
+            return self._views[key]
+        except KeyError:
+            pass
+        if len(self._views) >= self._max_entries:
+            self._views.clear()
+        view = self._views[key] = pointer_to_ndarray(addr, dtype, nitems)
+        return view
+
+    def clear(self):
+        self._views.clear()
+
 ########################################################################
 # Handler that does callbacks from C++
 ########################################################################
@@ -82,7 +117,8 @@ class msg_handler(gr.feval_p):
 ########################################################################
 class gateway_block(object):
 
-    def __init__(self, name, in_sig, out_sig, work_type, factor):
+    def __init__(self, name, in_sig, out_sig, work_type, factor,
+                 min_batch=0, max_batch_latency=0.01):
 
         #ensure that the sigs are iterable dtypes
         def sig_to_dtype_sig(sig):
@@ -102,12 +138,17 @@ class gateway_block(object):
         gr_in_sig = sig_to_gr_io_sigv(self.__in_sig)
         gr_out_sig = sig_to_gr_io_sigv(self.__out_sig)
 
+        #views onto the scheduler buffers, reused across work calls
+        self.__views = ndarray_view_cache()
+
         #create internal gateway block
         self.__handler = gateway_handler()
         self.__handler.init(self.__gr_block_handle)
         self.__gateway = block_gateway(
             self.__handler, name, gr_in_sig, gr_out_sig, work_type, factor)
         self.__message = self.__gateway.block_message()
+        if min_batch > 1:
+            self.set_min_batch(min_batch, max_batch_latency)
 
         #dict to keep references to all message handlers
         self.__msg_handlers = {}
@@ -128,49 +169,54 @@ class gateway_block(object):
         """
         Dispatch tasks according to the action type specified in the message.
         """
-        if self.__message.action == gr.block_gw_message_type.ACTION_GENERAL_WORK:
+        action = self.__message.action
+        if action == gr.block_gw_message_type.ACTION_GENERAL_WORK:
+            #fetch the swig vectors once, each attribute access makes a copy
+            view = self.__views
+            in_ptrs = self.__message.general_work_args_input_items
+            out_ptrs = self.__message.general_work_args_output_items
+            ninput_items = self.__message.general_work_args_ninput_items
+            noutput_items = self.__message.general_work_args_noutput_items
             self.__message.general_work_args_return_value = self.general_work(
 
-                input_items=[pointer_to_ndarray(
-                    self.__message.general_work_args_input_items[i],
-                    self.__in_sig[i],
-                    self.__message.general_work_args_ninput_items[i]
+                input_items=[view(
+                    in_ptrs[i], self.__in_sig[i], ninput_items[i]
                 ) for i in self.__in_indexes],
 
-                output_items=[pointer_to_ndarray(
-                    self.__message.general_work_args_output_items[i],
-                    self.__out_sig[i],
-                    self.__message.general_work_args_noutput_items
+                output_items=[view(
+                    out_ptrs[i], self.__out_sig[i], noutput_items
                 ) for i in self.__out_indexes],
             )
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_WORK:
+        elif action == gr.block_gw_message_type.ACTION_WORK:
+            view = self.__views
+            in_ptrs = self.__message.work_args_input_items
+            out_ptrs = self.__message.work_args_output_items
+            ninput_items = self.__message.work_args_ninput_items
+            noutput_items = self.__message.work_args_noutput_items
             self.__message.work_args_return_value = self.work(
 
-                input_items=[pointer_to_ndarray(
-                    self.__message.work_args_input_items[i],
-                    self.__in_sig[i],
-                    self.__message.work_args_ninput_items
+                input_items=[view(
+                    in_ptrs[i], self.__in_sig[i], ninput_items
                 ) for i in self.__in_indexes],
 
-                output_items=[pointer_to_ndarray(
-                    self.__message.work_args_output_items[i],
-                    self.__out_sig[i],
-                    self.__message.work_args_noutput_items
+                output_items=[view(
+                    out_ptrs[i], self.__out_sig[i], noutput_items
                 ) for i in self.__out_indexes],
             )
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_FORECAST:
+        elif action == gr.block_gw_message_type.ACTION_FORECAST:
             self.forecast(
                 noutput_items=self.__message.forecast_args_noutput_items,
                 ninput_items_required=self.__message.forecast_args_ninput_items_required,
             )
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_START:
+        elif action == gr.block_gw_message_type.ACTION_START:
             self.__message.start_args_return_value = self.start()
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_STOP:
+        elif action == gr.block_gw_message_type.ACTION_STOP:
             self.__message.stop_args_return_value = self.stop()
+            self.__views.clear()
 
     def forecast(self, noutput_items, ninput_items_required):
         """
@@ -201,6 +247,25 @@ class gateway_block(object):
         # Save handler object in class so it's not garbage collected
         self.__msg_handlers[which_port] = handler
 
+    def set_min_batch(self, min_items, max_latency=0.01):
+        """
+        Call work with at least min_items output items when possible.
+
+        The gateway waits for more input before calling into python
+        until max_latency seconds have passed (<= 0 waits for a full
+        batch) or the upstream block is done. The batch is limited by
+        the size of the upstream buffer, so also raise its
+        set_min_output_buffer when asking for large batches.
+        Only applies to sync, decim and interp blocks.
+        """
+        self.__gateway.set_min_batch(int(min_items), float(max_latency))
+
+    def min_batch(self):
+        return self.__gateway.min_batch()
+
+    def max_batch_latency(self):
+        return self.__gateway.max_batch_latency()
+
     def in_sig(self):
         return self.__in_sig
 
@@ -222,31 +287,40 @@ class basic_block(gateway_block):
         )
 
 class sync_block(gateway_block):
-    def __init__(self, name, in_sig, out_sig):
+    def __init__(self, name, in_sig, out_sig,
+                 min_batch=0, max_batch_latency=0.01):
         gateway_block.__init__(self,
             name=name,
             in_sig=in_sig,
             out_sig=out_sig,
             work_type=gr.GR_BLOCK_GW_WORK_SYNC,
             factor=1,
+            min_batch=min_batch,
+            max_batch_latency=max_batch_latency,
         )
 
 class decim_block(gateway_block):
-    def __init__(self, name, in_sig, out_sig, decim):
+    def __init__(self, name, in_sig, out_sig, decim,
+                 min_batch=0, max_batch_latency=0.01):
         gateway_block.__init__(self,
             name=name,
             in_sig=in_sig,
             out_sig=out_sig,
             work_type=gr.GR_BLOCK_GW_WORK_DECIM,
             factor=decim,
+            min_batch=min_batch,
+            max_batch_latency=max_batch_latency,
         )
 
 class interp_block(gateway_block):
-    def __init__(self, name, in_sig, out_sig, interp):
+    def __init__(self, name, in_sig, out_sig, interp,
+                 min_batch=0, max_batch_latency=0.01):
         gateway_block.__init__(self,
             name=name,
             in_sig=in_sig,
             out_sig=out_sig,
             work_type=gr.GR_BLOCK_GW_WORK_INTERP,
             factor=interp,
+            min_batch=min_batch,
+            max_batch_latency=max_batch_latency,
         )
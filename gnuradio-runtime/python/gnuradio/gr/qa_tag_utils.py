@@ -109,6 +109,35 @@ class test_tag_utils (gr_unittest.TestCase):
         self.assertTrue(pmt.equal(tmax.value, pmt.from_long(max(offsets))))
         self.assertTrue(pmt.equal(tmax.srcid, srcid))
 
+    def test_004(self):
+        key = pmt.string_to_symbol('rx_time')
+        srcid = pmt.string_to_symbol('qa_tag_utils')
+        tags = []
+        for k in (6, 3, 8):
+            t = gr.tag_t()
+            t.offset = k
+            t.key = key
+            t.value = pmt.from_long(k)
+            t.srcid = srcid
+            tags.append(t)
+        t = gr.tag_t()
+        t.offset = 1
+        t.key = pmt.from_long(5)
+        t.value = pmt.PMT_NIL
+        tags.append(t)
+
+        ptags = gr.tags_to_python(tags)
+        self.assertEqual([pt.offset for pt in ptags], [6, 3, 8, 1])
+        self.assertEqual([pt.key for pt in ptags], ['rx_time']*3 + [5])
+        self.assertTrue(ptags[0].key is ptags[1].key)
+        self.assertEqual(ptags[0].value, 6)
+        self.assertEqual(ptags[0].srcid, 'qa_tag_utils')
+        self.assertEqual(ptags[3].value, None)
+        self.assertRaises(AttributeError, setattr, ptags[0], 'foo', 1)
+
+        ptags.sort(key=gr.tag_t_offset_compare_key())
+        self.assertEqual([pt.offset for pt in ptags], [1, 3, 6, 8])
+
 
 if __name__ == '__main__':
     print 'hi'
@@ -1,14 +1,22 @@
+import operator
+
 import pmt
 
 import runtime_swig as gr
 
 class PythonTag(object):
     " Python container for tags "
-    def __init__(self):
-        self.offset = None
-        self.key    = None
-        self.value  = None
-        self.srcid  = False
+    __slots__ = ('offset', 'key', 'value', 'srcid')
+
+    def __init__(self, offset=None, key=None, value=None, srcid=False):
+        self.offset = offset
+        self.key    = key
+        self.value  = value
+        self.srcid  = srcid
+
+    def __repr__(self):
+        return "PythonTag(offset=%r, key=%r, value=%r, srcid=%r)" % (
+            self.offset, self.key, self.value, self.srcid)
 
 def tag_to_python(tag):
     """ Convert a stream tag to a Python-readable object """
@@ -19,13 +27,35 @@ def tag_to_python(tag):
     newtag.srcid = pmt.to_python(tag.srcid)
     return newtag
 
+def tags_to_python(tags):
+    """
+    Convert a list of stream tags to Python-readable objects.
+
+    Same as calling tag_to_python on every tag, but symbol keys are
+    converted without type checks and repeated key strings are shared
+    between the returned tags.
+    """
+    keys = {}
+    newtags = []
+    for tag in tags:
+        try:
+            key = pmt.symbol_to_string(tag.key)
+        except RuntimeError:
+            key = pmt.to_python(tag.key)
+        else:
+            key = keys.setdefault(key, key)
+        newtags.append(PythonTag(tag.offset, key,
+                                 pmt.to_python(tag.value),
+                                 pmt.to_python(tag.srcid)))
+    return newtags
+
 def tag_to_pmt(tag):
     """ Convert a Python-readable object to a stream tag """
     newtag = gr.tag_t()
     newtag.offset = tag.offset
-    newtag.key = pmt.to_python(tag.key)
-    newtag.value = pmt.from_python(tag.value)
-    newtag.srcid = pmt.from_python(tag.srcid)
+    newtag.key = pmt.to_pmt(tag.key)
+    newtag.value = pmt.to_pmt(tag.value)
+    newtag.srcid = pmt.to_pmt(tag.srcid)
     return newtag
 
 def python_to_tag(tag_struct):
@@ -111,33 +141,13 @@ def python_to_tag(tag_struct):
 
 def tag_t_offset_compare_key():
     """
-    Convert a tag_t_offset_compare function into a key=function
-    This method is modeled after functools.cmp_to_key(_func_).
+    Key function to order tags by their offsets.
+
     It can be used by functions that accept a key function, such as
     sorted(), min(), max(), etc. to compare tags by their offsets,
     e.g., sorted(tag_list, key=gr.tag_t_offset_compare_key()).
+    The key is the plain offset, so sorting compares integers and never
+    calls back into tag_t_offset_compare; it works the same for gr.tag_t
+    and PythonTag objects.
     """
-    class K(object):
-        def __init__(self, obj, *args):
-            self.obj = obj
-        def __lt__(self, other):
-            # x.offset < y.offset
-            return gr.tag_t_offset_compare(self.obj, other.obj)
-        def __gt__(self, other):
-            # y.offset < x.offset
-            return gr.tag_t_offset_compare(other.obj, self.obj)
-        def __eq__(self, other):
-            # not (x.offset < y.offset) and not (y.offset < x.offset)
-            return not gr.tag_t_offset_compare(self.obj, other.obj) and \
-                   not gr.tag_t_offset_compare(other.obj, self.obj)
-        def __le__(self, other):
-            # not (y.offset < x.offset)
-            return not gr.tag_t_offset_compare(other.obj, self.obj)
-        def __ge__(self, other):
-            # not (x.offset < y.offset)
-            return not gr.tag_t_offset_compare(self.obj, other.obj)
-        def __ne__(self, other):
-            # (x.offset < y.offset) or (y.offset < x.offset)
-            return gr.tag_t_offset_compare(self.obj, other.obj) or \
-                   gr.tag_t_offset_compare(other.obj, self.obj)
-    return K
+    return operator.attrgetter('offset')
@@ -67,40 +67,64 @@ def pmt_from_dict(p):
         d = pmt.dict_add(d, python_to_pmt(k), python_to_pmt(v))
     return d
 
+#numpy dtype -> (make uniform vector, check pmt type)
 numpy_mappings = {
-    numpy.dtype(numpy.float32): (pmt.init_f32vector, float, pmt.f32vector_elements, pmt.is_f32vector),
-    numpy.dtype(numpy.float64): (pmt.init_f64vector, float, pmt.f64vector_elements, pmt.is_f64vector),
-    numpy.dtype(numpy.complex64): (pmt.init_c32vector, complex, pmt.c32vector_elements, pmt.is_c32vector),
-    numpy.dtype(numpy.complex128): (pmt.init_c64vector, complex, pmt.c64vector_elements, pmt.is_c64vector),
-    numpy.dtype(numpy.int8): (pmt.init_s8vector, int, pmt.s8vector_elements, pmt.is_s8vector),
-    numpy.dtype(numpy.int16): (pmt.init_s16vector, int, pmt.s16vector_elements, pmt.is_s16vector),
-    numpy.dtype(numpy.int32): (pmt.init_s32vector, int, pmt.s32vector_elements, pmt.is_s32vector),
-#    numpy.dtype(numpy.int64): (pmt.init_s64vector, int, pmt.s64vector_elements, pmt.is_s64vector),
-    numpy.dtype(numpy.uint8): (pmt.init_u8vector, int, pmt.u8vector_elements, pmt.is_u8vector),
-    numpy.dtype(numpy.uint16): (pmt.init_u16vector, int, pmt.u16vector_elements, pmt.is_u16vector),
-    numpy.dtype(numpy.uint32): (pmt.init_u32vector, int, pmt.u32vector_elements, pmt.is_u32vector),
-#    numpy.dtype(numpy.uint64): (pmt.init_u64vector, int, pmt.u64vector_elements, pmt.is_u64vector),
-    numpy.dtype(numpy.byte): (pmt.init_u8vector, int, pmt.u8vector_elements, pmt.is_u8vector),
+    numpy.dtype(numpy.float32): (pmt.make_f32vector, pmt.is_f32vector),
+    numpy.dtype(numpy.float64): (pmt.make_f64vector, pmt.is_f64vector),
+    numpy.dtype(numpy.complex64): (pmt.make_c32vector, pmt.is_c32vector),
+    numpy.dtype(numpy.complex128): (pmt.make_c64vector, pmt.is_c64vector),
+    numpy.dtype(numpy.int8): (pmt.make_s8vector, pmt.is_s8vector),
+    numpy.dtype(numpy.int16): (pmt.make_s16vector, pmt.is_s16vector),
+    numpy.dtype(numpy.int32): (pmt.make_s32vector, pmt.is_s32vector),
+    numpy.dtype(numpy.int64): (pmt.make_s64vector, pmt.is_s64vector),
+    numpy.dtype(numpy.uint8): (pmt.make_u8vector, pmt.is_u8vector),
+    numpy.dtype(numpy.uint16): (pmt.make_u16vector, pmt.is_u16vector),
+    numpy.dtype(numpy.uint32): (pmt.make_u32vector, pmt.is_u32vector),
+    numpy.dtype(numpy.uint64): (pmt.make_u64vector, pmt.is_u64vector),
+    numpy.dtype(numpy.byte): (pmt.make_u8vector, pmt.is_u8vector),
 }
 
-uvector_mappings = dict([ (numpy_mappings[key][3], (numpy_mappings[key][2], key)) for key in numpy_mappings ])
+#check pmt type -> numpy dtype, u8vector maps back to uint8
+uvector_mappings = (
+    (pmt.is_u8vector, numpy.dtype(numpy.uint8)),
+    (pmt.is_s8vector, numpy.dtype(numpy.int8)),
+    (pmt.is_u16vector, numpy.dtype(numpy.uint16)),
+    (pmt.is_s16vector, numpy.dtype(numpy.int16)),
+    (pmt.is_u32vector, numpy.dtype(numpy.uint32)),
+    (pmt.is_s32vector, numpy.dtype(numpy.int32)),
+    (pmt.is_u64vector, numpy.dtype(numpy.uint64)),
+    (pmt.is_s64vector, numpy.dtype(numpy.int64)),
+    (pmt.is_f32vector, numpy.dtype(numpy.float32)),
+    (pmt.is_f64vector, numpy.dtype(numpy.float64)),
+    (pmt.is_c32vector, numpy.dtype(numpy.complex64)),
+    (pmt.is_c64vector, numpy.dtype(numpy.complex128)),
+)
 
 def numpy_to_uvector(numpy_array):
+    """
+    Copy a numpy array into a new uniform vector.
+
+    The array memory is copied in one block, multi-dimensional arrays
+    are flattened in C order.
+    """
     try:
         mapping = numpy_mappings[numpy_array.dtype]
-        pc = map(mapping[1], numpy.ravel(numpy_array))
-        return mapping[0](numpy_array.size, pc)
     except KeyError:
         raise ValueError("unsupported numpy array dtype for converstion to pmt %s"%(numpy_array.dtype))
+    uvector = mapping[0](numpy_array.size, 0)
+    pmt.uniform_vector_copy_from(uvector, numpy.ascontiguousarray(numpy_array))
+    return uvector
 
 def uvector_to_numpy(uvector):
-	match = None
-	for test_func in uvector_mappings.keys():
-		if test_func(uvector):
-			match = uvector_mappings[test_func]
-			return numpy.array(match[0](uvector), dtype = match[1])
-	else:
-		raise ValueError("unsupported uvector data type for conversion to numpy array %s"%(uvector))
+    """
+    Copy a uniform vector into a new numpy array.
+    """
+    for pmt_check, dtype in uvector_mappings:
+        if pmt_check(uvector):
+            numpy_array = numpy.empty(pmt.length(uvector), dtype=dtype)
+            pmt.uniform_vector_copy_to(uvector, numpy_array)
+            return numpy_array
+    raise ValueError("unsupported uvector data type for conversion to numpy array %s"%(uvector))
 
 type_mappings = ( #python type, check pmt type, to python, from python
     (None, pmt.is_null, lambda x: None, lambda x: PMT_NIL),
@@ -118,18 +142,141 @@ type_mappings = ( #python type, check pmt type, to python, from python
     (numpy.ndarray, pmt.is_uniform_vector, uvector_to_numpy, numpy_to_uvector),
 )
 
+def _convert_nested(obj, expand):
+    """
+    Convert a nested structure without recursing.
+
+    expand(obj) returns (value, None, None) for a leaf, or
+    (None, children, build) for a container; build() is called with
+    the list of converted children once they are all done.
+    """
+    value, children, build = expand(obj)
+    if build is None:
+        return value
+    stack = [(children, build, [])]
+    while True:
+        children, build, values = stack[-1]
+        if len(values) < len(children):
+            value, sub_children, sub_build = expand(children[len(values)])
+            if sub_build is None:
+                values.append(value)
+            else:
+                stack.append((sub_children, sub_build, []))
+            continue
+        value = build(values)
+        stack.pop()
+        if not stack:
+            return value
+        stack[-1][2].append(value)
+
+def _alist_items(p):
+    """
+    Flattened [key0, value0, key1, ...] of a pmt dict, or None when p is
+    a pair that isn't a proper list of pairs.
+    """
+    items = []
+    while pmt.is_pair(p):
+        item = pmt.car(p)
+        if not pmt.is_pair(item):
+            return None
+        items.append(pmt.car(item))
+        items.append(pmt.cdr(item))
+        p = pmt.cdr(p)
+    if not pmt.is_null(p):
+        return None
+    return items
+
+def _build_dict(values):
+    return dict(zip(values[0::2], values[1::2]))
+
+def _expand_pmt(p):
+    #checks are ordered by how common the type is in tags and metadata
+    if pmt.is_symbol(p):
+        return pmt.symbol_to_string(p), None, None
+    if pmt.is_number(p):
+        if pmt.is_integer(p):
+            return pmt.to_long(p), None, None
+        if pmt.is_real(p):
+            return pmt.to_double(p), None, None
+        if pmt.is_uint64(p):
+            return long(pmt.to_uint64(p)), None, None
+        if pmt.is_complex(p):
+            return pmt.to_complex(p), None, None
+    elif pmt.is_pair(p):
+        items = _alist_items(p)
+        if items is not None:
+            return None, items, _build_dict
+        return None, [pmt.car(p), pmt.cdr(p)], tuple
+    elif pmt.is_uniform_vector(p):
+        return uvector_to_numpy(p), None, None
+    elif pmt.is_bool(p):
+        return pmt.to_bool(p), None, None
+    elif pmt.is_null(p):
+        return None, None, None
+    elif pmt.is_tuple(p):
+        return None, [pmt.tuple_ref(p, i) for i in range(pmt.length(p))], tuple
+    elif pmt.is_vector(p):
+        return None, [pmt.vector_ref(p, i) for i in range(pmt.length(p))], list
+    raise ValueError("can't convert %s type to pmt (%s)"%(type(p),p))
+
 def pmt_to_python(p):
-    for python_type, pmt_check, to_python, from_python in type_mappings:
-        if pmt_check(p):
-            try:
-                return to_python(p)
-            except:
-                pass
+    return _convert_nested(p, _expand_pmt)
+
+def _build_vector(values):
+    v = pmt.make_vector(len(values), PMT_NIL)
+    for i, elem in enumerate(values):
+        pmt.vector_set(v, i, elem)
+    return v
+
+def _build_pmt_dict(values):
+    d = pmt.make_dict()
+    for i in range(0, len(values), 2):
+        d = pmt.dict_add(d, values[i], values[i+1])
+    return d
+
+#exact python type -> to pmt for leaves
+_python_leaf_mappings = {
+    type(None): lambda x: PMT_NIL,
+    numpy.ndarray: numpy_to_uvector,
+}
+for python_type, pmt_check, to_python, from_python in type_mappings:
+    if python_type not in (None, tuple, list, dict, numpy.ndarray):
+        _python_leaf_mappings[python_type] = from_python
+
+#exact python type -> (children of container, build pmt from children)
+_python_container_mappings = {
+    tuple: (list, lambda values: pmt.make_tuple(*values)),
+    list: (list, _build_vector),
+    dict: (lambda d: [x for item in d.iteritems() for x in item], _build_pmt_dict),
+}
+
+def _python_mapping(python_type):
+    """
+    Find and cache the conversion for a subclass of a supported type.
+    """
+    for base, pmt_check, to_python, from_python in type_mappings:
+        if base is None or not issubclass(python_type, base):
+            continue
+        if base in _python_container_mappings:
+            mapping = _python_container_mappings[base]
+            _python_container_mappings[python_type] = mapping
+            return None, mapping
+        mapping = _python_leaf_mappings[base]
+        _python_leaf_mappings[python_type] = mapping
+        return mapping, None
+    return None, None
+
+def _expand_python(p):
+    python_type = type(p)
+    to_pmt = _python_leaf_mappings.get(python_type)
+    container = _python_container_mappings.get(python_type)
+    if to_pmt is None and container is None:
+        to_pmt, container = _python_mapping(python_type)
+    if to_pmt is not None:
+        return to_pmt(p), None, None
+    if container is not None:
+        return None, container[0](p), container[1]
     raise ValueError("can't convert %s type to pmt (%s)"%(type(p),p))
 
 def python_to_pmt(p):
-    for python_type, pmt_check, to_python, from_python in type_mappings:
-        if python_type is None:
-            if p == None: return from_python(p)
-        elif isinstance(p, python_type): return from_python(p)
-    raise ValueError("can't convert %s type to pmt (%s)"%(type(p),p))
+    return _convert_nested(p, _expand_python)
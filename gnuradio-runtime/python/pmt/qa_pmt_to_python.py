@@ -31,6 +31,33 @@ class test_pmt_to_python(unittest.TestCase):
         self.assertEqual(pmt.to_python(b), 123765)
         t = pmt.to_pmt(range(5))
 
+    def test_nested(self):
+        obj = {'rx_time': (1L, 0.5), 'rx_freq': 2.4e9, 'burst': True,
+               'chans': [{'gain': 10, 'name': 'A'}, {'gain': 20, 'name': 'B'}],
+               'none': None, 'c': 1j}
+        self.assertEqual(pmt.to_python(pmt.to_pmt(obj)), obj)
+
+    def test_pair(self):
+        p = pmt.cons(pmt.from_long(1), pmt.intern("x"))
+        self.assertEqual(pmt.to_python(p), (1, "x"))
+        l = pmt.list2(pmt.from_long(1), pmt.from_long(2))
+        self.assertEqual(pmt.to_python(l), (1, (2, None)))
+
+    def test_deep_nesting(self):
+        depth = 5000
+        obj = leaf = []
+        for i in range(depth):
+            leaf.append([])
+            leaf = leaf[0]
+        result = pmt.to_python(pmt.to_pmt(obj))
+        for i in range(depth):
+            self.assertEqual(len(result), 1)
+            result = result[0]
+        self.assertEqual(result, [])
+
+    def test_unsupported(self):
+        self.assertRaises(ValueError, pmt.to_pmt, object())
+
     def test_numpy_to_uvector_and_reverse(self):
         import numpy as np
         N = 100
@@ -42,6 +69,26 @@ class test_pmt_to_python(unittest.TestCase):
         self.assertTrue(nparr.dtype==narr.dtype)
         self.assertTrue(np.alltrue(nparr == narr))
 
+    def test_numpy_to_uvector_all_dtypes(self):
+        import numpy as np
+        N = 100
+        for dtype in (np.float32, np.float64, np.complex64, np.complex128,
+                      np.int16, np.int32, np.int64,
+                      np.uint8, np.uint16, np.uint32, np.uint64):
+            narr = np.arange(N, dtype=dtype)
+            uvector = pmt2py.numpy_to_uvector(narr)
+            self.assertEqual(pmt.length(uvector), N)
+            nparr = pmt2py.uvector_to_numpy(uvector)
+            self.assertEqual(nparr.dtype, narr.dtype)
+            self.assertTrue(np.alltrue(nparr == narr))
+
+    def test_numpy_to_uvector_non_contiguous(self):
+        import numpy as np
+        narr = np.arange(20, dtype=np.float32).reshape(4, 5)
+        uvector = pmt2py.numpy_to_uvector(narr[:, ::2])
+        self.assertEqual(list(pmt.f32vector_elements(uvector)),
+                         list(narr[:, ::2].ravel()))
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,48 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2016 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef SWIG_BUFFER_TYPEMAPS_I
+#define SWIG_BUFFER_TYPEMAPS_I
+
+// Pass any python object that exposes a contiguous buffer (numpy
+// arrays, strings, bytearrays) as a pointer and its size in bytes.
+// Other argument names can use them with %apply.
+
+%typemap(in) (const void *BUF, size_t BUFLEN) {
+  const void *buf;
+  Py_ssize_t buflen;
+  if(PyObject_AsReadBuffer($input, &buf, &buflen) != 0)
+    SWIG_fail;
+  $1 = buf;
+  $2 = (size_t)buflen;
+}
+
+%typemap(in) (void *WBUF, size_t WBUFLEN) {
+  void *buf;
+  Py_ssize_t buflen;
+  if(PyObject_AsWriteBuffer($input, &buf, &buflen) != 0)
+    SWIG_fail;
+  $1 = buf;
+  $2 = (size_t)buflen;
+}
+
+#endif /* SWIG_BUFFER_TYPEMAPS_I */
@@ -35,6 +35,7 @@
 #include <stdint.h>
 #include <iosfwd>
 #include <stdexcept>
+#include <cstring>
 #include <pmt/pmt.h>
 %}
 
@@ -300,3 +301,31 @@ namespace pmt{
   pmt_t deserialize_str(std::string str);
 
 } //namespace pmt
+
+// Bulk copies between a uniform vector and any python object that
+// exposes a contiguous buffer (numpy arrays, strings, bytearrays).
+%include <buffer_typemaps.i>
+
+%inline %{
+namespace pmt {
+  //! Copy BUFLEN bytes from a buffer into the uniform vector \p v
+  void uniform_vector_copy_from(pmt_t v, const void *BUF, size_t BUFLEN)
+  {
+    size_t len;
+    void *dst = uniform_vector_writable_elements(v, len);
+    if(len != BUFLEN)
+      throw std::invalid_argument("pmt::uniform_vector_copy_from: buffer size mismatch");
+    memcpy(dst, BUF, len);
+  }
+
+  //! Copy the contents of the uniform vector \p v into a writable buffer
+  void uniform_vector_copy_to(pmt_t v, void *WBUF, size_t WBUFLEN)
+  {
+    size_t len;
+    const void *src = uniform_vector_elements(v, len);
+    if(len != WBUFLEN)
+      throw std::invalid_argument("pmt::uniform_vector_copy_to: buffer size mismatch");
+    memcpy(WBUF, src, len);
+  }
+}
+%}
@@ -0,0 +1,428 @@
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+'''
+Random access to files written by blocks.file_meta_sink.
+
+The data file (and the detached header file, if any) is memory-mapped
+and all headers are decoded once into a segment index, so samples can
+be sliced by index or by time without reading the file sequentially.
+'''
+
+import os
+import mmap
+import zipfile
+import numpy
+import pmt
+
+from parse_file_metadata import HEADER_LENGTH, MetadataError
+from parse_file_metadata import header_to_dict, extra_dict_to_dict
+
+# Data type name as found in the header -> numpy scalar type
+type_to_numpy = {"bytes": numpy.int8,
+                 "short": numpy.int16,
+                 "int": numpy.int32,
+                 "long": numpy.int32,
+                 "long long": numpy.int64,
+                 "float": numpy.float32,
+                 "double": numpy.float64}
+
+def info_to_dtype(info):
+    """
+    numpy dtype of one item described by a header dict.
+
+    float and double complex data maps to complex64/complex128, complex
+    integer data to (I, Q) pairs. Vector items get a shape of (vlen,).
+    """
+    base = numpy.dtype(type_to_numpy[info["type"]])
+    if info["cplx"]:
+        if base == numpy.float32:
+            base = numpy.dtype(numpy.complex64)
+        elif base == numpy.float64:
+            base = numpy.dtype(numpy.complex128)
+        else:
+            base = numpy.dtype((base, 2))
+    if info["size"] % base.itemsize:
+        raise MetadataError("Item size {0} is not a multiple of the data type size {1}.".format(
+            info["size"], base.itemsize))
+    vlen = info["size"] / base.itemsize
+    if vlen == 1:
+        return base
+    return numpy.dtype((base, vlen))
+
+def _map_file(filename):
+    handle = open(filename, "rb")
+    try:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return handle, ""
+        return handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except:
+        handle.close()
+        raise
+
+def read_headers(buf, detached=False):
+    """
+    Decode all headers in a memory-mapped metadata or header file.
+
+    Returns a list of header dicts (see parse_file_metadata.header_to_dict)
+    with the extra dict merged in and two more entries: "hdr_offset",
+    where the header starts in buf, and "data_offset", where its data
+    starts in the data file. When the last segment is cut short, its
+    nbytes and nitems are reduced to what is actually there.
+    """
+    segments = []
+    pos = 0
+    data_pos = 0
+    size = len(buf)
+    while pos < size:
+        if pos + HEADER_LENGTH > size:
+            raise MetadataError("Truncated header at byte {0}: invalid or corrupt data file.".format(pos))
+        try:
+            header = pmt.deserialize_str(buf[pos:pos+HEADER_LENGTH])
+        except RuntimeError:
+            raise MetadataError("Could not deserialize header at byte {0}: invalid or corrupt data file.".format(pos))
+        info = header_to_dict(header)
+
+        if info["extra_len"] > 0:
+            extra_start = pos + HEADER_LENGTH
+            try:
+                extra = pmt.deserialize_str(buf[extra_start:extra_start+info["extra_len"]])
+            except RuntimeError:
+                raise MetadataError("Could not deserialize extras at byte {0}: invalid or corrupt data file.".format(extra_start))
+            extra_dict_to_dict(extra, info)
+
+        info["hdr_offset"] = pos
+        pos += info["hdr_len"]
+        if detached:
+            info["data_offset"] = data_pos
+            data_pos += info["nbytes"]
+        else:
+            info["data_offset"] = pos
+            if pos + info["nbytes"] > size:
+                info["nbytes"] = max(0, size - pos)
+                info["nitems"] = info["nbytes"] / info["size"]
+            pos += info["nbytes"]
+        segments.append(info)
+    return segments
+
+INDEX_VERSION = 1
+
+# per-segment header entries stored in an index file
+index_fields = (("hdr_offset", numpy.int64),
+                ("data_offset", numpy.int64),
+                ("hdr_len", numpy.int64),
+                ("extra_len", numpy.int64),
+                ("rx_time", numpy.float64),
+                ("rx_rate", numpy.float64),
+                ("nitems", numpy.int64),
+                ("nbytes", numpy.int64))
+
+def index_filename(filename):
+    """
+    Name of the segment index file kept next to a recording.
+    """
+    return filename + ".idx"
+
+def _header_source(filename, detached, hdr_filename):
+    # the file holding the headers, file_meta_sink names detached ones
+    # after the data file
+    if not detached:
+        return filename
+    if hdr_filename is None:
+        return filename + ".hdr"
+    return hdr_filename
+
+def _file_stamp(filename):
+    st = os.stat(filename)
+    return numpy.array([st.st_size, st.st_mtime], dtype=numpy.float64)
+
+def write_index(segments, filename, detached=False, hdr_filename=None):
+    """
+    Store the segment list of a recording in its index file.
+
+    The index holds the header fields of every segment, the serialized
+    extra dicts and the size and mtime of the data and header files,
+    which invalidate it when the recording changes. The file is written
+    to a temporary name and renamed, so readers never see a partial
+    index. Detached headers default to filename + ".hdr". Returns the
+    index file name.
+    """
+    hdr_source = _header_source(filename, detached, hdr_filename)
+    handle = open(hdr_source, "rb")
+    extras = []
+    try:
+        for info in segments:
+            if info["extra_len"] > 0:
+                handle.seek(info["hdr_offset"] + HEADER_LENGTH)
+                extras.append(handle.read(info["extra_len"]))
+            else:
+                extras.append("")
+    finally:
+        handle.close()
+    extra_bounds = numpy.zeros(len(extras)+1, dtype=numpy.int64)
+    numpy.cumsum([len(e) for e in extras], out=extra_bounds[1:])
+
+    arrays = dict((name, numpy.array([info[name] for info in segments], dtype=dtype))
+                  for name, dtype in index_fields)
+    first = segments[0]
+    arrays.update(version=INDEX_VERSION,
+                  data_stamp=_file_stamp(filename),
+                  hdr_stamp=_file_stamp(hdr_source),
+                  detached=detached,
+                  type=first["type"], cplx=first["cplx"], size=first["size"],
+                  extra_blob=numpy.frombuffer("".join(extras) or "\0", dtype=numpy.uint8),
+                  extra_bounds=extra_bounds)
+
+    idx_filename = index_filename(filename)
+    tmp_filename = "{0}.{1}.tmp".format(idx_filename, os.getpid())
+    handle = open(tmp_filename, "wb")
+    try:
+        numpy.savez(handle, **arrays)
+    finally:
+        handle.close()
+    os.rename(tmp_filename, idx_filename)
+    return idx_filename
+
+def read_index(filename, detached=False, hdr_filename=None):
+    """
+    Load the segment list of a recording from its index file.
+
+    Returns None when there is no index or it is stale (the data or
+    header file changed size or mtime since it was written). Detached
+    headers default to filename + ".hdr".
+    """
+    hdr_source = _header_source(filename, detached, hdr_filename)
+    try:
+        index = numpy.load(index_filename(filename))
+    except (IOError, OSError, ValueError, zipfile.BadZipfile):
+        return None
+    try:
+        if (int(index["version"]) != INDEX_VERSION or
+            bool(index["detached"]) != detached or
+            not numpy.array_equal(index["data_stamp"], _file_stamp(filename)) or
+            not numpy.array_equal(index["hdr_stamp"], _file_stamp(hdr_source))):
+            return None
+        columns = [(name, index[name].tolist()) for name, dtype in index_fields]
+        extra_blob = index["extra_blob"].tostring()
+        extra_bounds = index["extra_bounds"]
+        stype = str(index["type"])
+        cplx = bool(index["cplx"])
+        size = int(index["size"])
+    except (KeyError, ValueError):
+        return None
+    finally:
+        index.close()
+
+    segments = []
+    for i in range(len(columns[0][1])):
+        info = dict((name, values[i]) for name, values in columns)
+        info.update(type=stype, cplx=cplx, size=size,
+                    has_extra=info["extra_len"] > 0)
+        if info["has_extra"]:
+            extra = pmt.deserialize_str(extra_blob[extra_bounds[i]:extra_bounds[i+1]])
+            extra_dict_to_dict(extra, info)
+        segments.append(info)
+    return segments
+
+class MetadataFileReader(object):
+    """
+    Memory-mapped reader for file_meta_sink recordings.
+
+    Args:
+        filename: the data file
+        detached: True if the headers were written to a separate file
+        hdr_filename: the header file, defaults to filename + ".hdr"
+
+    After construction the segment index is available as numpy arrays
+    (one entry per header):
+        offsets      byte offset of the segment data in the data file
+        times        rx_time of the first item, in seconds
+        rates        rx_rate in items/second
+        nitems       number of items in the segment
+        item_starts  index of the first item of the segment in the file
+
+    The per-segment header dicts (including extra dict entries as PMTs)
+    are in segments. Data is returned as read-only numpy arrays that
+    share memory with the file mapping whenever the requested range is
+    contiguous on disk (always for detached headers, within a single
+    segment for attached headers); otherwise the pieces are copied into
+    one array.
+
+    With use_index, the segment list is loaded from the index file
+    next to the recording (see index_filename) if it is up to date,
+    otherwise the headers are parsed and the index is (re)written.
+    Failing to write the index, e.g. in a read-only directory, is not
+    an error.
+
+    Raises MetadataError (or IOError) instead of exiting on bad files.
+    """
+
+    def __init__(self, filename, detached=False, hdr_filename=None,
+                 use_index=False):
+        if detached and hdr_filename is None:
+            hdr_filename = filename + ".hdr"
+        self.filename = filename
+        self.hdr_filename = hdr_filename
+        self.detached = detached
+        self._handles = []
+        self._data = None
+        try:
+            data_handle, self._data = _map_file(filename)
+            self._handles.append(data_handle)
+            segments = None
+            if use_index:
+                segments = read_index(filename, detached, hdr_filename)
+            if segments is None:
+                segments = self._read_headers()
+                if use_index and segments:
+                    try:
+                        write_index(segments, filename, detached, hdr_filename)
+                    except (IOError, OSError):
+                        pass
+            self._set_segments(segments)
+        except:
+            self.close()
+            raise
+
+    def _read_headers(self):
+        if not self.detached:
+            return read_headers(self._data, False)
+        hdr_handle, hdr_buf = _map_file(self.hdr_filename)
+        try:
+            return read_headers(hdr_buf, True)
+        finally:
+            if hdr_buf:
+                hdr_buf.close()
+            hdr_handle.close()
+
+    def _set_segments(self, segments):
+        if not segments:
+            raise MetadataError("No headers found in {0}.".format(self.filename))
+        self.segments = segments
+        self.dtype = info_to_dtype(segments[0])
+        for info in segments:
+            if info_to_dtype(info) != self.dtype:
+                raise MetadataError("Data type changes between segments; not supported.")
+        self.item_size = self.dtype.itemsize
+        self.offsets = numpy.array([s["data_offset"] for s in segments], dtype=numpy.int64)
+        self.times = numpy.array([s["rx_time"] for s in segments], dtype=numpy.float64)
+        self.rates = numpy.array([s["rx_rate"] for s in segments], dtype=numpy.float64)
+        self.nitems = numpy.array([s["nitems"] for s in segments], dtype=numpy.int64)
+        self.item_starts = numpy.zeros(len(segments), dtype=numpy.int64)
+        numpy.cumsum(self.nitems[:-1], out=self.item_starts[1:])
+        if self.detached:
+            # a detached data file may be shorter than the headers claim
+            end = len(self._data) / self.item_size
+            self.nitems = numpy.clip(end - self.item_starts, 0, self.nitems)
+        self.total_items = int(self.nitems.sum())
+        # rx_time normally increases, but don't rely on it for lookups
+        self._time_order = numpy.argsort(self.times, kind='mergesort')
+        self._sorted_times = self.times[self._time_order]
+
+    def __len__(self):
+        return self.total_items
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Release the file mapping. Arrays returned earlier must no longer
+        be used after this.
+        """
+        if self._data:
+            self._data.close()
+        self._data = None
+        for handle in self._handles:
+            handle.close()
+        self._handles = []
+
+    def _view(self, byte_offset, count):
+        return numpy.frombuffer(self._data, dtype=self.dtype,
+                                count=count, offset=int(byte_offset))
+
+    def segment_data(self, index):
+        """
+        All items of segment index as a zero-copy array.
+        """
+        return self._view(self.offsets[index], int(self.nitems[index]))
+
+    def read_items(self, start, stop):
+        """
+        Items [start, stop) counted from the beginning of the recording.
+        """
+        start = max(0, int(start))
+        stop = min(self.total_items, int(stop))
+        if stop <= start:
+            return numpy.empty(0, dtype=self.dtype)
+        first = self.item_starts.searchsorted(start, side='right') - 1
+        last = self.item_starts.searchsorted(stop, side='left') - 1
+        if first == last or self.detached:
+            offset = self.offsets[first] + (start - self.item_starts[first])*self.item_size
+            return self._view(offset, stop - start)
+        pieces = []
+        for index in range(first, last+1):
+            seg_start = max(start, self.item_starts[index])
+            seg_stop = min(stop, self.item_starts[index] + self.nitems[index])
+            if seg_stop > seg_start:
+                offset = self.offsets[index] + (seg_start - self.item_starts[index])*self.item_size
+                pieces.append(self._view(offset, int(seg_stop - seg_start)))
+        return numpy.concatenate(pieces)
+
+    def segment_at(self, t):
+        """
+        Index of the segment covering time t (the latest one starting at
+        or before t), or -1 if t is before the start of the recording.
+        This is a binary search over the segment start times.
+        """
+        pos = self._sorted_times.searchsorted(t, side='right') - 1
+        if pos < 0:
+            return -1
+        return int(self._time_order[pos])
+
+    def time_to_item(self, t):
+        """
+        Index of the first item sampled at or after time t, using the
+        rx_time and rx_rate of the segment that covers t.
+        """
+        index = max(0, self.segment_at(t))
+        # allow for rounding in rx_time so t on an item boundary maps to that item
+        delta = (t - self.times[index])*self.rates[index]
+        item = self.item_starts[index] + numpy.ceil(delta - 1e-6)
+        item = max(item, self.item_starts[index])
+        return int(min(item, self.item_starts[index] + self.nitems[index]))
+
+    def segments_in_time(self, t0, t1):
+        """
+        Indexes of the segments that overlap the time range [t0, t1).
+        """
+        first = max(0, self._sorted_times.searchsorted(t0, side='right') - 1)
+        last = self._sorted_times.searchsorted(t1, side='left')
+        return sorted(self._time_order[first:last].tolist())
+
+    def read_time(self, t0, t1):
+        """
+        Items sampled in the time range [t0, t1), in seconds.
+        """
+        return self.read_items(self.time_to_item(t0), self.time_to_item(t1))
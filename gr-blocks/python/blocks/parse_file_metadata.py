@@ -51,14 +51,30 @@ ftype_to_size = {blocks.GR_FILE_BYTE: gr.sizeof_char,
                  blocks.GR_FILE_FLOAT: gr.sizeof_float,
                  blocks.GR_FILE_DOUBLE: gr.sizeof_double}
 
+class MetadataError(Exception):
+    """Invalid or corrupt metadata header"""
+    pass
+
 def parse_header(p, VERBOSE=False):
+    try:
+        return header_to_dict(p, VERBOSE)
+    except MetadataError as e:
+        sys.stderr.write("{0}\n".format(e))
+        sys.exit(1)
+
+def header_to_dict(p, VERBOSE=False):
+    """
+    Decode a metadata header PMT into a dict.
+
+    Same as parse_header, but raises MetadataError for a bad header
+    instead of exiting.
+    """
     dump = pmt.PMT_NIL
 
     info = dict()
 
     if(pmt.is_dict(p) is False):
-        sys.stderr.write("Header is not a PMT dictionary: invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise MetadataError("Header is not a PMT dictionary: invalid or corrupt data file.")
 
     # GET FILE FORMAT VERSION NUMBER
     if(pmt.dict_has_key(p, pmt.string_to_symbol("version"))):
@@ -67,8 +83,7 @@ def parse_header(p, VERBOSE=False):
         if(VERBOSE):
             print "Version Number: {0}".format(version)
     else:
-        sys.stderr.write("Could not find key 'version': invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise MetadataError("Could not find key 'version': invalid or corrupt data file.")
 
     # EXTRACT SAMPLE RATE
     if(pmt.dict_has_key(p, pmt.string_to_symbol("rx_rate"))):
@@ -78,8 +93,7 @@ def parse_header(p, VERBOSE=False):
         if(VERBOSE):
             print "Sample Rate: {0:.2f} sps".format(samp_rate)
     else:
-        sys.stderr.write("Could not find key 'sr': invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise MetadataError("Could not find key 'sr': invalid or corrupt data file.")
 
     # EXTRACT TIME STAMP
     if(pmt.dict_has_key(p, pmt.string_to_symbol("rx_time"))):
@@ -93,8 +107,7 @@ def parse_header(p, VERBOSE=False):
         if(VERBOSE):
             print "Seconds: {0:.6f}".format(t)
     else:
-        sys.stderr.write("Could not find key 'time': invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise MetadataError("Could not find key 'time': invalid or corrupt data file.")
 
     # EXTRACT ITEM SIZE
     if(pmt.dict_has_key(p, pmt.string_to_symbol("size"))):
@@ -104,8 +117,7 @@ def parse_header(p, VERBOSE=False):
         if(VERBOSE):
             print "Item size: {0}".format(dsize)
     else:
-        sys.stderr.write("Could not find key 'size': invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise MetadataError("Could not find key 'size': invalid or corrupt data file.")
 
     # EXTRACT DATA TYPE
     if(pmt.dict_has_key(p, pmt.string_to_symbol("type"))):
@@ -116,8 +128,7 @@ def parse_header(p, VERBOSE=False):
         if(VERBOSE):
             print "Data Type: {0} ({1})".format(stype, dtype)
     else:
-        sys.stderr.write("Could not find key 'type': invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise MetadataError("Could not find key 'type': invalid or corrupt data file.")
 
     # EXTRACT COMPLEX
     if(pmt.dict_has_key(p, pmt.string_to_symbol("cplx"))):
@@ -127,8 +138,7 @@ def parse_header(p, VERBOSE=False):
         if(VERBOSE):
             print "Complex? {0}".format(cplx)
     else:
-        sys.stderr.write("Could not find key 'cplx': invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise MetadataError("Could not find key 'cplx': invalid or corrupt data file.")
 
     # EXTRACT WHERE CURRENT SEGMENT STARTS
     if(pmt.dict_has_key(p, pmt.string_to_symbol("strt"))):
@@ -142,8 +152,7 @@ def parse_header(p, VERBOSE=False):
             print "Extra Length:  {0}".format((info["extra_len"]))
             print "Extra Header?  {0}".format(info["has_extra"])
     else:
-        sys.stderr.write("Could not find key 'strt': invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise MetadataError("Could not find key 'strt': invalid or corrupt data file.")
 
     # EXTRACT SIZE OF DATA
     if(pmt.dict_has_key(p, pmt.string_to_symbol("bytes"))):
@@ -158,17 +167,28 @@ def parse_header(p, VERBOSE=False):
             print "Size of Data: {0} bytes".format(nbytes)
             print "              {0} items".format(nitems)
     else:
-        sys.stderr.write("Could not find key 'size': invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise MetadataError("Could not find key 'size': invalid or corrupt data file.")
 
     return info
 
 # IF THERE IS EXTRA DATA, PULL OUT THE DICTIONARY AND PARSE IT
 def parse_extra_dict(p, info, VERBOSE=False):
-    if(pmt.is_dict(p) is False):
-        sys.stderr.write("Extra header is not a PMT dictionary: invalid or corrupt data file.\n")
+    try:
+        return extra_dict_to_dict(p, info, VERBOSE)
+    except MetadataError as e:
+        sys.stderr.write("{0}\n".format(e))
         sys.exit(1)
 
+def extra_dict_to_dict(p, info, VERBOSE=False):
+    """
+    Add the entries of an extra header PMT dict to info.
+
+    Same as parse_extra_dict, but raises MetadataError for a bad header
+    instead of exiting.
+    """
+    if(pmt.is_dict(p) is False):
+        raise MetadataError("Extra header is not a PMT dictionary: invalid or corrupt data file.")
+
     items = pmt.dict_items(p)
     nitems = pmt.length(items)
     for i in xrange(nitems):
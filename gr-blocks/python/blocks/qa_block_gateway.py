@@ -19,6 +19,8 @@
 # Boston, MA 02110-1301, USA.
 #
 
+import threading
+import time
 import numpy
 
 import pmt
@@ -98,6 +100,48 @@ class interp2x(gr.interp_block):
         output_items[0][::2] = input_items[0]
         return len(output_items[0])
 
+class batch_copy(gr.sync_block):
+    def __init__(self, min_batch, max_batch_latency=0):
+        gr.sync_block.__init__(
+            self,
+            name = "batch copy",
+            in_sig = [numpy.float32],
+            out_sig = [numpy.float32],
+            min_batch = min_batch,
+            max_batch_latency = max_batch_latency,
+        )
+        self.call_sizes = []
+        self.call_times = []
+
+    def work(self, input_items, output_items):
+        self.call_sizes.append(len(output_items[0]))
+        self.call_times.append(time.time())
+        output_items[0][:] = input_items[0]
+        return len(output_items[0])
+
+class stalling_source(gr.sync_block):
+    """Produces a few items, then nothing until released"""
+    def __init__(self, nitems):
+        gr.sync_block.__init__(
+            self,
+            name = "stalling source",
+            in_sig = None,
+            out_sig = [numpy.float32],
+        )
+        self.nitems = nitems
+        self.sent_time = None
+        self.release = threading.Event()
+
+    def work(self, input_items, output_items):
+        if self.sent_time is None:
+            output_items[0][:self.nitems] = numpy.arange(self.nitems)
+            self.sent_time = time.time()
+            return self.nitems
+        self.release.wait(0.01)
+        if self.release.is_set():
+            return -1
+        return 0
+
 class tag_source(gr.sync_block):
     def __init__(self):
         gr.sync_block.__init__(
@@ -275,5 +319,53 @@ class test_block_gateway(gr_unittest.TestCase):
         tb.run()
         self.assertEqual(sink.data(), (1, 2, 3, 4, 5, 6, 7, 8, 9, 10))
 
+    def test_min_batch(self):
+        tb = gr.top_block()
+        data = range(1000)
+        src = blocks.vector_source_f(data, False)
+        op = batch_copy(64)
+        sink = blocks.vector_sink_f()
+        tb.connect(src, op, sink)
+        tb.run()
+        self.assertEqual(op.min_batch(), 64)
+        self.assertEqual(sink.data(), tuple(data))
+        for n in op.call_sizes[:-1]:
+            self.assertTrue(n >= 64)
+
+    def test_min_batch_latency(self):
+        tb = gr.top_block()
+        src = stalling_source(10)
+        op = batch_copy(64, max_batch_latency=0.05)
+        sink = blocks.vector_sink_f()
+        tb.connect(src, op, sink)
+        tb.start()
+        try:
+            # input stalls below min_batch, work runs at the deadline
+            for i in range(200):
+                if op.call_times:
+                    break
+                time.sleep(0.005)
+        finally:
+            src.release.set()
+            tb.wait()
+        self.assertEqual(op.call_sizes[0], 10)
+        self.assertTrue(op.call_times[0] - src.sent_time < 0.2)
+        self.assertEqual(sink.data(), tuple(range(10)))
+
+    def test_ndarray_view_cache(self):
+        from gnuradio.gr import gateway
+        buf = numpy.arange(8, dtype=numpy.float32)
+        addr = buf.__array_interface__['data'][0]
+        dtype = numpy.dtype(numpy.float32)
+        cache = gateway.ndarray_view_cache(max_entries=2)
+        v0 = cache(addr, dtype, 8)
+        self.assertTrue(v0 is cache(addr, dtype, 8))
+        self.assertEqual(tuple(v0), tuple(buf))
+        v0[0] = 42
+        self.assertEqual(buf[0], 42)
+        v1 = cache(addr, dtype, 4)
+        self.assertEqual(len(v1), 4)
+        self.assertFalse(v1 is v0)
+
 if __name__ == '__main__':
     gr_unittest.run(test_block_gateway, "test_block_gateway.xml")
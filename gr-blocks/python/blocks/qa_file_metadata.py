@@ -21,11 +21,13 @@
 #
 
 import os, math
+import numpy
 
 from gnuradio import gr, gr_unittest, blocks
 import pmt
 
 import parse_file_metadata
+import file_metadata_reader
 
 def sig_source_c(samp_rate, freq, amp, N):
     t = map(lambda x: float(x)/samp_rate, xrange(N))
@@ -202,5 +204,110 @@ class test_file_metadata(gr_unittest.TestCase):
 	os.remove(outfile)
 	os.remove(outfile_hdr)
 
+    def _write_segments(self, outfile, detached, data, samp_rate, extras_str=""):
+        fsnk = blocks.file_meta_sink(gr.sizeof_gr_complex, outfile,
+                                     samp_rate, 1,
+                                     blocks.GR_FILE_FLOAT, True,
+                                     100, extras_str, detached)
+        fsnk.set_unbuffered(True)
+        src = blocks.vector_source_c(data)
+        self.tb.connect(src, fsnk)
+        self.tb.run()
+        fsnk.close()
+
+    def _check_reader(self, reader, data, samp_rate):
+        self.assertEqual(len(reader), len(data))
+        self.assertEqual(reader.dtype, numpy.dtype(numpy.complex64))
+        self.assertTrue(len(reader.segments) >= 10)
+        self.assertEqual(reader.nitems[0], 100)
+        self.assertAlmostEqual(reader.times[1] - reader.times[0], 100.0/samp_rate)
+        self.assertComplexTuplesAlmostEqual(reader.read_items(0, len(data)), data, 5)
+        self.assertComplexTuplesAlmostEqual(reader.read_items(150, 420), data[150:420], 5)
+        self.assertComplexTuplesAlmostEqual(reader.segment_data(2), data[200:300], 5)
+        self.assertEqual(reader.segment_at(reader.times[3] + 1e-6), 3)
+        self.assertEqual(reader.segment_at(-1), -1)
+        t0 = reader.times[0]
+        self.assertComplexTuplesAlmostEqual(
+            reader.read_time(t0 + 250.0/samp_rate, t0 + 650.0/samp_rate),
+            data[250:650], 5)
+
+    def test_003(self):
+        N = 1000
+        outfile = "test_out_reader.dat"
+        samp_rate = 200000
+        data = sig_source_c(samp_rate, 1000, 1, N)
+        self._write_segments(outfile, False, data, samp_rate)
+
+        reader = file_metadata_reader.MetadataFileReader(outfile)
+        self._check_reader(reader, data, samp_rate)
+        self.assertEqual(reader.offsets[0], parse_file_metadata.HEADER_LENGTH)
+        reader.close()
+        os.remove(outfile)
+
+    def test_004(self):
+        N = 1000
+        outfile = "test_out_reader_detached.dat"
+        samp_rate = 200000
+        data = sig_source_c(samp_rate, 1000, 1, N)
+        self._write_segments(outfile, True, data, samp_rate)
+
+        with file_metadata_reader.MetadataFileReader(outfile, True) as reader:
+            self._check_reader(reader, data, samp_rate)
+            self.assertEqual(reader.offsets[1], 100*gr.sizeof_gr_complex)
+            segments = reader.segments
+
+        # the header file defaults to outfile + ".hdr"
+        idxfile = file_metadata_reader.write_index(segments, outfile, True)
+        self.assertEqual(len(file_metadata_reader.read_index(outfile, True)), len(segments))
+        os.remove(idxfile)
+        os.remove(outfile)
+        os.remove(outfile + ".hdr")
+
+    def test_005(self):
+        outfile = "test_out_corrupt.dat"
+        handle = open(outfile, "wb")
+        handle.write("x"*500)
+        handle.close()
+        self.assertRaises(parse_file_metadata.MetadataError,
+                          file_metadata_reader.MetadataFileReader, outfile)
+        os.remove(outfile)
+
+    def test_006(self):
+        N = 1000
+        outfile = "test_out_index.dat"
+        samp_rate = 200000
+        extras = pmt.dict_add(pmt.make_dict(), pmt.intern("samp_rate"),
+                              pmt.from_double(samp_rate))
+        data = sig_source_c(samp_rate, 1000, 1, N)
+        self._write_segments(outfile, False, data, samp_rate,
+                             pmt.serialize_str(extras))
+        idxfile = file_metadata_reader.index_filename(outfile)
+        self.assertEqual(file_metadata_reader.read_index(outfile), None)
+
+        reader = file_metadata_reader.MetadataFileReader(outfile, use_index=True)
+        segments = reader.segments
+        reader.close()
+        self.assertTrue(os.path.exists(idxfile))
+
+        cached = file_metadata_reader.read_index(outfile)
+        self.assertEqual(len(cached), len(segments))
+        for a, b in zip(cached, segments):
+            self.assertEqual(a["data_offset"], b["data_offset"])
+            self.assertEqual(a["rx_time"], b["rx_time"])
+            self.assertEqual(a["nitems"], b["nitems"])
+            self.assertEqual(pmt.to_double(a["samp_rate"]), samp_rate)
+
+        with file_metadata_reader.MetadataFileReader(outfile, use_index=True) as reader:
+            self._check_reader(reader, data, samp_rate)
+
+        # appending to the recording makes the index stale
+        handle = open(outfile, "ab")
+        handle.write("\0"*8)
+        handle.close()
+        self.assertEqual(file_metadata_reader.read_index(outfile), None)
+
+        os.remove(outfile)
+        os.remove(idxfile)
+
 if __name__ == '__main__':
     gr_unittest.run(test_file_metadata, "test_file_metadata.xml")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+"""
+Measure packet framing throughput.
+
+Builds frames from random payloads with packet_utils.make_packet, one
+call per frame, and with packet_utils.make_packets, one call per batch,
+and reports frames per second for each.
+"""
+
+import sys
+import time
+import numpy
+from gnuradio.digital import packet_utils
+from optparse import OptionParser
+
+def benchmark(payloads, batch_size, options):
+    start = time.time()
+    for p in payloads:
+        packet_utils.make_packet(p, options.sps, options.bps,
+                                 whitening=not options.no_whitening)
+    single = time.time() - start
+
+    start = time.time()
+    for i in xrange(0, len(payloads), batch_size):
+        packet_utils.make_packets(payloads[i:i+batch_size], options.sps, options.bps,
+                                  whitening=not options.no_whitening)
+    batch = time.time() - start
+
+    print "payload: %5d bytes  make_packet: %10.4g frames/sec  make_packets(%d): %10.4g frames/sec" % (
+        len(payloads[0]), len(payloads)/single, batch_size, len(payloads)/batch)
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-n", "--nframes", type="int", default=10000,
+                      help="frames per payload size [default=%default]")
+    parser.add_option("-b", "--batch-size", type="int", default=256,
+                      help="frames per make_packets call [default=%default]")
+    parser.add_option("", "--sps", type="int", default=2,
+                      help="samples per symbol [default=%default]")
+    parser.add_option("", "--bps", type="int", default=1,
+                      help="bits per symbol [default=%default]")
+    parser.add_option("", "--no-whitening", action="store_true", default=False,
+                      help="disable whitening")
+    (options, args) = parser.parse_args()
+    if len(args) != 0:
+        parser.print_help()
+        sys.exit(1)
+
+    for size in (16, 128, 1024, 4000):
+        payloads = [numpy.random.randint(0, 256, size).astype(numpy.uint8).tostring()
+                    for i in xrange(options.nframes)]
+        benchmark(payloads, options.batch_size, options)
+
+if __name__ == '__main__':
+    main()
@@ -52,6 +52,25 @@ namespace gr {
     DIGITAL_API unsigned int 
     crc32(const std::string buf);
 
+    /*!
+     * \brief check the CRC-32 of a batch of packets
+     * \ingroup packet_operators_blk
+     *
+     * \details
+     * Packet i occupies buf[offsets[i]..offsets[i+1]-1] and ends
+     * with the big endian CRC-32 of the bytes before it. Sets ok[i]
+     * to 1 when the CRC matches and to 0 otherwise, including for
+     * packets shorter than the CRC itself.
+     *
+     * \param buf contiguous packet data
+     * \param offsets npackets+1 increasing packet boundaries into buf
+     * \param npackets number of packets
+     * \param ok output flags, one per packet
+     */
+    DIGITAL_API void
+    check_crc32_packets(const unsigned char *buf, const int64_t *offsets,
+                        size_t npackets, unsigned char *ok);
+
   } /* namespace digital */
 } /* namespace gr */
 
@@ -132,5 +132,23 @@ namespace gr {
       return crc32((const unsigned char *) s.data(), s.size());
     }
 
+    void
+    check_crc32_packets(const unsigned char *buf, const int64_t *offsets,
+                        size_t npackets, unsigned char *ok)
+    {
+      for(size_t i = 0; i < npackets; i++) {
+        int64_t len = offsets[i+1] - offsets[i];
+        if(len < 4) {
+          ok[i] = 0;
+          continue;
+        }
+        const unsigned char *pkt = buf + offsets[i];
+        const unsigned char *tail = pkt + len - 4;
+        unsigned int expected = ((unsigned int)tail[0] << 24) | ((unsigned int)tail[1] << 16)
+          | ((unsigned int)tail[2] << 8) | (unsigned int)tail[3];
+        ok[i] = crc32(pkt, len - 4) == expected;
+      }
+    }
+
   } /* namespace digital */
 } /* namespace gr */
@@ -22,6 +22,7 @@
 from gnuradio import gru
 import digital_swig as digital
 import struct
+import numpy
 
 def gen_and_append_crc32(s):
     crc = digital.crc32(s)
@@ -36,3 +37,21 @@ def check_crc32(s):
     (expected,) = struct.unpack(">I", s[-4:])
     # print "actual =", hex(actual), "expected =", hex(expected)
     return (actual == expected, msg)
+
+def check_crc32_packets(buf, offsets):
+    """
+    Check the trailing CRC-32 of many packets held in one buffer.
+
+    Args:
+        buf: packet data (string or contiguous numpy uint8 array)
+        offsets: npackets+1 increasing packet boundaries into buf
+
+    Returns:
+        numpy bool array, True where the packet CRC matched.
+    """
+    offsets = numpy.ascontiguousarray(offsets, numpy.int64)
+    if len(offsets) == 0:
+        raise ValueError, "offsets must hold at least one boundary"
+    ok = numpy.zeros(len(offsets) - 1, numpy.uint8)
+    digital.check_crc32_buffer(buf, offsets, ok)
+    return ok.astype(bool)
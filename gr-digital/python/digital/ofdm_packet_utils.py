@@ -23,59 +23,8 @@ import struct
 import numpy
 from gnuradio import gru
 import crc
-
-def conv_packed_binary_string_to_1_0_string(s):
-    """
-    '\xAF' --> '10101111'
-    """
-    r = []
-    for ch in s:
-        x = ord(ch)
-        for i in range(7,-1,-1):
-            t = (x >> i) & 0x1
-            r.append(t)
-
-    return ''.join(map(lambda x: chr(x + ord('0')), r))
-
-def conv_1_0_string_to_packed_binary_string(s):
-    """
-    '10101111' -> ('\xAF', False)
-
-    Basically the inverse of conv_packed_binary_string_to_1_0_string,
-    but also returns a flag indicating if we had to pad with leading zeros
-    to get to a multiple of 8.
-    """
-    if not is_1_0_string(s):
-        raise ValueError, "Input must be a string containing only 0's and 1's"
-
-    # pad to multiple of 8
-    padded = False
-    rem = len(s) % 8
-    if rem != 0:
-        npad = 8 - rem
-        s = '0' * npad + s
-        padded = True
-
-    assert len(s) % 8 == 0
-
-    r = []
-    i = 0
-    while i < len(s):
-        t = 0
-        for j in range(8):
-            t = (t << 1) | (ord(s[i + j]) - ord('0'))
-        r.append(chr(t))
-        i += 8
-    return (''.join(r), padded)
-
-
-def is_1_0_string(s):
-    if not isinstance(s, str):
-        return False
-    for ch in s:
-        if not ch in ('0', '1'):
-            return False
-    return True
+from packet_utils import conv_packed_binary_string_to_1_0_string, \
+    conv_1_0_string_to_packed_binary_string, is_1_0_string
 
 def string_to_hex_list(s):
     return map(lambda x: hex(ord(x)), s)
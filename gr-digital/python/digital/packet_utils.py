@@ -28,14 +28,8 @@ def conv_packed_binary_string_to_1_0_string(s):
     """
     '\xAF' --> '10101111'
     """
-    r = []
-    for ch in s:
-        x = ord(ch)
-        for i in range(7,-1,-1):
-            t = (x >> i) & 0x1
-            r.append(t)
-
-    return ''.join(map(lambda x: chr(x + ord('0')), r))
+    bits = numpy.unpackbits(numpy.frombuffer(s, numpy.uint8))
+    return (bits + ord('0')).tostring()
 
 def conv_1_0_string_to_packed_binary_string(s):
     """
@@ -58,15 +52,8 @@ def conv_1_0_string_to_packed_binary_string(s):
 
     assert len(s) % 8 == 0
 
-    r = []
-    i = 0
-    while i < len(s):
-        t = 0
-        for j in range(8):
-            t = (t << 1) | (ord(s[i + j]) - ord('0'))
-        r.append(chr(t))
-        i += 8
-    return (''.join(r), padded)
+    bits = numpy.frombuffer(s, numpy.uint8) - ord('0')
+    return (numpy.packbits(bits).tostring(), padded)
 
 
 default_access_code = \
@@ -77,10 +64,7 @@ default_preamble = \
 def is_1_0_string(s):
     if not isinstance(s, str):
         return False
-    for ch in s:
-        if not ch in ('0', '1'):
-            return False
-    return True
+    return not s.translate(None, '01')
 
 def string_to_hex_list(s):
     return map(lambda x: hex(ord(x)), s)
@@ -122,41 +106,69 @@ def make_packet(payload, samples_per_symbol, bits_per_symbol,
     Packet will have access code at the beginning, followed by length, payload
     and finally CRC-32.
     """
+    return make_packets((payload,), samples_per_symbol, bits_per_symbol,
+                        preamble, access_code, pad_for_usrp,
+                        whitener_offset, whitening, calc_crc)[0]
+
+def make_packets(payloads, samples_per_symbol, bits_per_symbol,
+                 preamble=default_preamble, access_code=default_access_code,
+                 pad_for_usrp=True, whitener_offset=0, whitening=True,
+                 calc_crc=True):
+    """
+    Build a list of packets, one per payload.
+
+    Takes the same arguments as make_packet, with a sequence of
+    payloads in place of a single one. The preamble and access code
+    are packed once for the whole batch and all payloads are whitened
+    with a single XOR against the whitener table.
+
+    Returns:
+        list of packets, in the order of payloads.
+    """
     if not is_1_0_string(preamble):
         raise ValueError, "preamble must be a string containing only 0's and 1's (%r)" % (preamble,)
 
     if not is_1_0_string(access_code):
         raise ValueError, "access_code must be a string containing only 0's and 1's (%r)" % (access_code,)
 
-    if not whitener_offset >=0 and whitener_offset < 16:
+    if not (whitener_offset >= 0 and whitener_offset < 16):
         raise ValueError, "whitener_offset must be between 0 and 15, inclusive (%i)" % (whitener_offset,)
 
     (packed_access_code, padded) = conv_1_0_string_to_packed_binary_string(access_code)
     (packed_preamble, ignore) = conv_1_0_string_to_packed_binary_string(preamble)
+    prefix = packed_preamble + packed_access_code
 
     if(calc_crc):
-        payload_with_crc = crc.gen_and_append_crc32(payload)
-    else:
-        payload_with_crc = payload
-    #print "outbound crc =", string_to_hex_list(payload_with_crc[-4:])
+        payloads = [crc.gen_and_append_crc32(p) for p in payloads]
+    if not payloads:
+        return []
 
-    L = len(payload_with_crc)
+    lens = numpy.array([len(p) for p in payloads], numpy.int64)
     MAXLEN = len(random_mask_tuple)
-    if L > MAXLEN:
+    if lens.max() > MAXLEN:
         raise ValueError, "len(payload) must be in [0, %d]" % (MAXLEN,)
 
+    data = ''.join(payloads)
+    ends = numpy.cumsum(lens)
+    starts = ends - lens
     if whitening:
-        pkt = ''.join((packed_preamble, packed_access_code, make_header(L, whitener_offset),
-                       whiten(payload_with_crc, whitener_offset), '\x55'))
-    else:
-        pkt = ''.join((packed_preamble, packed_access_code, make_header(L, whitener_offset),
-                       (payload_with_crc), '\x55'))
-
-    if pad_for_usrp:
-        pkt = pkt + (_npadding_bytes(len(pkt), int(samples_per_symbol), bits_per_symbol) * '\x55')
-
-    #print "make_packet: len(pkt) =", len(pkt)
-    return pkt
+        # Index of every byte into the whitener table, restarting at
+        # whitener_offset for each payload.
+        idx = numpy.arange(len(data)) - numpy.repeat(starts, lens) + whitener_offset
+        data = (numpy.frombuffer(data, numpy.uint8) ^ random_mask_vec8[idx]).tostring()
+
+    pkts = []
+    npadding = {}
+    for L, s, e in zip(lens.tolist(), starts.tolist(), ends.tolist()):
+        pkt = ''.join((prefix, make_header(L, whitener_offset), data[s:e], '\x55'))
+        if pad_for_usrp:
+            n = len(pkt)
+            if n not in npadding:
+                npadding[n] = _npadding_bytes(n, int(samples_per_symbol), bits_per_symbol) * '\x55'
+            pkt = pkt + npadding[n]
+        pkts.append(pkt)
+
+    return pkts
 
 def _npadding_bytes(pkt_byte_len, samples_per_symbol, bits_per_symbol):
     """
@@ -213,6 +225,52 @@ def unmake_packet(whitened_payload_with_crc, whitener_offset=0,
 
     return ok, payload
 
+def unmake_packets(buf, offsets, whitener_offset=0,
+                   dewhitening=True, check_crc=True):
+    """
+    Return (ok, payloads) for a batch of received packets.
+
+    Packet i is buf[offsets[i]:offsets[i+1]]. All packets are
+    dewhitened with a single XOR and their CRCs checked in one native
+    call.
+
+    Args:
+        buf: whitened payloads with crc, back to back (string or numpy uint8 array)
+        offsets: npackets+1 increasing packet boundaries into buf
+        whitener_offset: integer offset into whitener table, or one per packet
+        dewhitening: True if we should run this through the dewhitener
+        check_crc: True if we should check the CRC of the packets
+
+    Returns:
+        ok: numpy bool array, one flag per packet
+        payloads: list of numpy uint8 views of the payloads, crc stripped
+    """
+    if isinstance(buf, str):
+        buf = numpy.frombuffer(buf, numpy.uint8)
+    offsets = numpy.asarray(offsets, numpy.int64)
+    lens = numpy.diff(offsets)
+    if len(offsets) == 0 or (lens < 0).any():
+        raise ValueError, "offsets must be increasing packet boundaries"
+    npkts = len(lens)
+
+    if dewhitening and npkts > 0:
+        start, end = offsets[0], offsets[-1]
+        wo = numpy.zeros(npkts, numpy.int64) + whitener_offset
+        idx = numpy.arange(end - start) - numpy.repeat(offsets[:-1] - start, lens) \
+              + numpy.repeat(wo, lens)
+        buf = buf[start:end] ^ random_mask_vec8[idx]
+        offsets = offsets - start
+
+    if check_crc:
+        ok = crc.check_crc32_packets(numpy.ascontiguousarray(buf), offsets)
+        ends = numpy.maximum(offsets[1:] - 4, offsets[:-1])
+    else:
+        ok = numpy.ones(npkts, bool)
+        ends = offsets[1:]
+
+    payloads = [buf[s:e] for s, e in zip(offsets[:-1].tolist(), ends.tolist())]
+    return ok, payloads
+
 
 # FYI, this PN code is the output of a 15-bit LFSR
 random_mask_tuple = (
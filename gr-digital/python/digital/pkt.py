@@ -20,6 +20,7 @@
 # 
 
 from math import pi
+import numpy
 from gnuradio import gr
 import gnuradio.gr.gr_threading as _threading
 import packet_utils
@@ -156,18 +157,27 @@ class demod_pkts(gr.hier_block2):
 
 
 class _queue_watcher_thread(_threading.Thread):
-    def __init__(self, rcvd_pktq, callback):
+    def __init__(self, rcvd_pktq, callback, max_burst=64):
         _threading.Thread.__init__(self)
         self.setDaemon(1)
         self.rcvd_pktq = rcvd_pktq
         self.callback = callback
+        self.max_burst = max_burst
         self.keep_running = True
         self.start()
 
 
     def run(self):
         while self.keep_running:
-            msg = self.rcvd_pktq.delete_head()
-            ok, payload = packet_utils.unmake_packet(msg.to_string(), int(msg.arg1()))
+            # Block for one packet, then take whatever else is already
+            # queued and deframe the burst in one call.
+            msgs = [self.rcvd_pktq.delete_head()]
+            while len(msgs) < self.max_burst and not self.rcvd_pktq.empty_p():
+                msgs.append(self.rcvd_pktq.delete_head_nowait())
+            pkts = [msg.to_string() for msg in msgs]
+            offsets = numpy.cumsum([0] + [len(pkt) for pkt in pkts])
+            ok, payloads = packet_utils.unmake_packets(
+                ''.join(pkts), offsets, [int(msg.arg1()) for msg in msgs])
             if self.callback:
-                self.callback(ok, payload)
+                for i in range(len(msgs)):
+                    self.callback(bool(ok[i]), payloads[i].tostring())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+import random
+import numpy
+from gnuradio import gr_unittest
+from gnuradio.digital.utils import alignment
+
+def scan_offsets(d1, d2, max_offset, indices):
+    # Reference: compare_sequences for every offset, 0, -1, 1, -2, ...
+    n = min(len(d1), max_offset, min(len(d2), max_offset) - 1)
+    results = []
+    for k in range(n):
+        for offset in (k, -k-1):
+            correct, compared = alignment.compare_sequences(d1, d2, offset, indices)
+            results.append((offset, correct, compared))
+    return results
+
+class test_alignment(gr_unittest.TestCase):
+
+    def setUp(self):
+        rndm = random.Random(1234)
+        self.ref = [rndm.randint(0, 1) for i in range(300)]
+        # reference preceded by 37 entries and with 10% errors
+        self.rx = ([rndm.randint(0, 1) for i in range(37)] +
+                   [b if rndm.random() > 0.1 else 1-b for b in self.ref])
+        self.max_direct_compares = alignment.def_max_direct_compares
+
+    def test_001_offset(self):
+        correct, overlap, offset, indices = alignment.align_sequences(self.ref, self.rx)
+        self.assertEqual(offset, -37)
+        self.assertEqual(overlap, len(self.ref))
+        self.assertTrue(correct > 0.8)
+
+    def tearDown(self):
+        alignment.def_max_direct_compares = self.max_direct_compares
+
+    def test_002_reference(self):
+        indices = alignment.random_sample(len(self.rx), 50, 1)
+        for cutoff in (0.8, 1.1):
+            results = scan_offsets(self.ref, self.rx, 100, indices)
+            above = [r for r in results if 1.0*r[1]/r[2] > cutoff]
+            if above:
+                expected = above[0]
+            else:
+                expected = max(results, key=lambda r: 1.0*r[1]/r[2])
+            for compares in (0, self.max_direct_compares):
+                # correlate the sequences and compare the samples directly
+                alignment.def_max_direct_compares = compares
+                correct, overlap, offset, ind = alignment.align_sequences(
+                    self.ref, self.rx, max_offset=100, correct_cutoff=cutoff,
+                    indices=indices, window_length=64)
+                self.assertEqual((offset, overlap), (expected[0], expected[2]))
+                self.assertAlmostEqual(correct, 1.0*expected[1]/expected[2])
+
+    def test_003_long(self):
+        rng = numpy.random.RandomState(0)
+        ref = rng.randint(0, 2, 200000)
+        rx = numpy.concatenate((rng.randint(0, 2, 1500), ref))
+        rx ^= rng.rand(len(rx)) < 0.05
+        correct, overlap, offset, indices = alignment.align_sequences(
+            ref, rx, num_samples=len(ref), max_offset=2000, window_length=2**14)
+        self.assertEqual(offset, -1500)
+        self.assertTrue(correct > 0.9)
+
+if __name__ == '__main__':
+    gr_unittest.run(test_alignment, "test_alignment.xml")
@@ -22,6 +22,8 @@
 
 import random
 import cmath
+import struct
+import numpy
 
 from gnuradio import gr, gr_unittest, digital
 
@@ -57,5 +59,15 @@ class test_crc32(gr_unittest.TestCase):
 
         self.assertEqual(expected_result, result)
 
+    def test04(self):
+        pkts = [100*"0", 100*"1", 10*"0123456789", "", "abc"]
+        data = ''.join(p + struct.pack(">I", digital.crc32(p)) for p in pkts)
+        data = data[:-2] + "xx" # corrupt the last crc
+        offsets = numpy.cumsum([0] + [len(p) + 4 for p in pkts] + [2]).astype(numpy.int64)
+        ok = numpy.zeros(len(offsets) - 1, numpy.uint8)
+        digital.check_crc32_buffer(data + "\x00\x01", offsets, ok)
+
+        self.assertEqual([1, 1, 1, 1, 0, 0], list(ok))
+
 if __name__ == '__main__':
     gr_unittest.run(test_crc32, "test_crc32.xml")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import random
+import numpy
+from gnuradio import gr_unittest
+from gnuradio.digital import packet_utils, ofdm_packet_utils
+
+def bits_to_string(s):
+    # Reference per-bit conversion
+    return ''.join(str((ord(ch) >> i) & 0x1) for ch in s for i in range(7, -1, -1))
+
+class test_packet_utils(gr_unittest.TestCase):
+
+    def test_001_conv_packed_binary_string(self):
+        data = ''.join(chr(x) for x in range(256))
+        bits = packet_utils.conv_packed_binary_string_to_1_0_string(data)
+        self.assertEqual(bits, bits_to_string(data))
+        self.assertEqual(packet_utils.conv_1_0_string_to_packed_binary_string(bits),
+                         (data, False))
+        self.assertEqual(packet_utils.conv_packed_binary_string_to_1_0_string(''), '')
+        self.assertEqual(packet_utils.conv_1_0_string_to_packed_binary_string(''),
+                         ('', False))
+
+    def test_002_conv_padding(self):
+        self.assertEqual(packet_utils.conv_1_0_string_to_packed_binary_string('101'),
+                         ('\x05', True))
+        self.assertEqual(packet_utils.conv_1_0_string_to_packed_binary_string('110101111'),
+                         ('\x01\xAF', True))
+        self.assertRaises(ValueError,
+                          packet_utils.conv_1_0_string_to_packed_binary_string, '0120')
+        self.assertFalse(packet_utils.is_1_0_string(u'0101'))
+        self.assertTrue(ofdm_packet_utils.conv_1_0_string_to_packed_binary_string is
+                        packet_utils.conv_1_0_string_to_packed_binary_string)
+
+    def test_003_make_packets(self):
+        # Frames built one at a time by the per-packet implementation
+        golden = (
+            (0, True, ['', 'a', 'hello world'], [
+                'a4f2acdda4e2f28c20fc00040004ff3f0010555555555555',
+                'a4f2acdda4e2f28c20fc000500059e26938b6b5555555555',
+                'a4f2acdda4e2f28c20fc000f000f975a6c7c6f2c776ab26f74453b132d555555']),
+            (15, True, [''.join(chr(i) for i in range(20)), 'hello world'], [
+                'a4f2acdda4e2f28c20fcf018f018c03e1213080903c2cb1a1bc6c0589bf03f110e139334a7945555',
+                'a4f2acdda4e2f28c20fcf00ff00fa85a7c7c632c72aab17f75893b46ed555555']),
+            (5, False, ['hello world', 'a'], [
+                'a4f2acdda4e2f28c20fc500f500f68656c6c6f20776f726c6444f71378555555',
+                'a4f2acdda4e2f28c20fc500550056119939b6b5555555555']),
+        )
+        for whitener_offset, whitening, payloads, frames in golden:
+            pkts = packet_utils.make_packets(payloads, 2, 1,
+                                             whitener_offset=whitener_offset,
+                                             whitening=whitening)
+            self.assertEqual([pkt.encode('hex') for pkt in pkts], frames)
+
+        random.seed(0)
+        payloads = [''.join(chr(random.randint(0, 255)) for i in range(n))
+                    for n in (0, 1, 17, 100, 1500, 4000)]
+        for whitener_offset in (0, 7):
+            for whitening in (True, False):
+                pkts = packet_utils.make_packets(payloads, 2, 1,
+                                                 whitener_offset=whitener_offset,
+                                                 whitening=whitening)
+                self.assertEqual(len(pkts), len(payloads))
+                for payload, pkt in zip(payloads, pkts):
+                    # Skip preamble (2), access code (8) and header (4)
+                    L = len(payload) + 4
+                    ok, rx = packet_utils.unmake_packet(pkt[14:14+L], whitener_offset,
+                                                        whitening)
+                    self.assertTrue(ok)
+                    self.assertEqual(rx, payload)
+        self.assertEqual(packet_utils.make_packets([], 2, 1), [])
+
+    def test_004_unmake_packets(self):
+        random.seed(0)
+        payloads = [''.join(chr(random.randint(0, 255)) for i in range(n))
+                    for n in (0, 1, 17, 100, 1500)]
+        whitener_offsets = [0, 3, 7, 15, 2]
+        bodies = []
+        for payload, whitener_offset in zip(payloads, whitener_offsets):
+            pkt = packet_utils.make_packet(payload, 2, 1, whitener_offset=whitener_offset)
+            bodies.append(pkt[14:14+len(payload)+4])
+        # Corrupt one packet and add one too short to hold a CRC
+        bodies[3] = bodies[3][:5] + chr(ord(bodies[3][5]) ^ 0x01) + bodies[3][6:]
+        bodies.append('\x01\x02')
+        whitener_offsets.append(0)
+
+        offsets = numpy.cumsum([0] + [len(b) for b in bodies])
+        ok, rx = packet_utils.unmake_packets(''.join(bodies), offsets, whitener_offsets)
+        self.assertEqual(list(ok), [True, True, True, False, True, False])
+        for i in (0, 1, 2, 4):
+            self.assertEqual(rx[i].tostring(), payloads[i])
+        for i in range(len(bodies)):
+            self.assertEqual(ok[i], packet_utils.unmake_packet(bodies[i], whitener_offsets[i])[0])
+
+        ok, rx = packet_utils.unmake_packets('', [0])
+        self.assertEqual((len(ok), rx), (0, []))
+        self.assertRaises(ValueError, packet_utils.unmake_packets, 'abcd', [4, 0])
+
+if __name__ == '__main__':
+    gr_unittest.run(test_packet_utils, "test_packet_utils.xml")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import os
+import shutil
+import tempfile
+import numpy
+
+from gnuradio import gr_unittest, digital
+
+class test_soft_dec_lut_gen(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.rng = numpy.random.RandomState(0)
+        # 16-QAM with a scrambled mapping
+        pts = numpy.array([-3, -1, 1, 3]) / 3.0
+        self.constel = list((pts[numpy.newaxis,:] + 1j*pts[:,numpy.newaxis]).ravel())
+        self.symbols = list(self.rng.permutation(16))
+
+    def scalar_soft_dec(self, sample, npwr):
+        # Reference: the log-likelihood ratios bit by bit
+        k = 4
+        s = []
+        for j in range(k-1, -1, -1):
+            p0 = p1 = 0.0
+            for c, sym in zip(self.constel, self.symbols):
+                d = numpy.exp(-abs(sample - c)/npwr)
+                if (sym >> j) & 1:
+                    p1 += d
+                else:
+                    p0 += d
+            s.append(numpy.log(p1) - numpy.log(p0))
+        return s
+
+    def test_001_calc_soft_dec(self):
+        samples = self.rng.randn(50) + 1j*self.rng.randn(50)
+        result = digital.calc_soft_dec(samples, self.constel, self.symbols, 0.5)
+        self.assertEqual(result.shape, (50, 4))
+        for sample, decs in zip(samples, result):
+            expected = self.scalar_soft_dec(sample, 0.5)
+            self.assertFloatTuplesAlmostEqual(expected, decs, 5)
+            single = digital.calc_soft_dec(sample, self.constel, self.symbols, 0.5)
+            self.assertTrue(isinstance(single, list))
+            self.assertFloatTuplesAlmostEqual(expected, single, 5)
+
+    def test_002_table(self):
+        prec = 4
+        npts = 2**prec
+        table = digital.soft_dec_table(self.constel, self.symbols, prec, 0.7)
+        self.assertEqual(len(table), npts*npts)
+        rng = numpy.linspace(-1, 1, npts)
+        for i in (0, 5, npts+3, npts*npts-1):
+            pt = complex(rng[i % npts], rng[i // npts])
+            self.assertFloatTuplesAlmostEqual(self.scalar_soft_dec(pt, 0.7), table[i], 5)
+
+    def test_003_table_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            table = digital.soft_dec_table(self.constel, self.symbols, 3, 0.7,
+                                           cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            cached = digital.soft_dec_table(self.constel, self.symbols, 3, 0.7,
+                                            cache_dir=cache_dir)
+            self.assertEqual(table, cached)
+            # a different noise power is a different table
+            digital.soft_dec_table(self.constel, self.symbols, 3, 0.8,
+                                   cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_004_calc_soft_dec_from_table(self):
+        prec = 4
+        table = digital.soft_dec_table(self.constel, self.symbols, prec, 0.7)
+        samples = 2*(self.rng.randn(200) + 1j*self.rng.randn(200))
+        result = digital.calc_soft_dec_from_table(samples, table, prec, 1.0)
+        self.assertEqual(result.shape, (200, 4))
+        for sample, decs in zip(samples, result):
+            expected = digital.calc_soft_dec_from_table(sample, table, prec, 1.0)
+            self.assertFloatTuplesAlmostEqual(expected, decs, 5)
+
+if __name__ == '__main__':
+    gr_unittest.run(test_soft_dec_lut_gen, "test_soft_dec_lut_gen.xml")
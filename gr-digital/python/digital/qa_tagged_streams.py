@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+import numpy
+import pmt
+from gnuradio import gr, gr_unittest
+from gnuradio.digital.utils import tagged_streams
+
+def make_tag(offset, length, key='len'):
+    tag = gr.tag_t()
+    tag.offset = offset
+    tag.key = pmt.string_to_symbol(key)
+    tag.value = pmt.from_long(length)
+    return tag
+
+class test_tagged_streams(gr_unittest.TestCase):
+
+    def test_001_packets_to_arrays(self):
+        packets = [range(3), [], range(5), range(1)]
+        data, offsets, lengths = tagged_streams.packets_to_arrays(packets)
+        self.assertEqual(data.tolist(), range(3) + range(5) + range(1))
+        self.assertEqual(data.dtype.kind, 'i')
+        self.assertEqual(offsets.tolist(), [0, 3, 3, 8])
+        self.assertEqual(lengths.tolist(), [3, 0, 5, 1])
+        data, tags = tagged_streams.packets_to_vectors(packets, 'len')
+        self.assertEqual(data, range(3) + range(5) + range(1))
+        self.assertEqual([t.offset for t in tags], [0, 3, 3, 8])
+        self.assertEqual([pmt.to_long(t.value) for t in tags], [3, 0, 5, 1])
+        # lists keep the types of their items
+        data, tags = tagged_streams.packets_to_vectors([[1, 2.5], [3]], 'len')
+        self.assertEqual([type(d) for d in data], [int, float, int])
+
+    def test_002_arrays_to_packets(self):
+        data = numpy.arange(10)
+        packets = tagged_streams.arrays_to_packets(data, [0, 4, 5], [4, 1, 5])
+        self.assertEqual([p.tolist() for p in packets], [range(4), [4], range(5, 10)])
+        # tags within packets and beyond the data are skipped
+        tags = [make_tag(5, 5), make_tag(0, 4), make_tag(2, 1), make_tag(4, 1),
+                make_tag(10, 3), make_tag(1, 2, 'other')]
+        self.assertEqual(tagged_streams.vectors_to_packets(range(10), tags, 'len'),
+                         [range(4), [4], range(5, 10)])
+        packets = tagged_streams.vectors_to_packets(data, tags, 'len')
+        self.assertTrue(all(isinstance(p, numpy.ndarray) for p in packets))
+        self.assertEqual([p.tolist() for p in packets], [range(4), [4], range(5, 10)])
+        self.assertRaises(ValueError, tagged_streams.vectors_to_packets,
+                          range(9), tags, 'len')
+        # no data, the same for lists and arrays
+        self.assertEqual(tagged_streams.arrays_to_packets([], [0], [4]), [])
+        self.assertEqual(tagged_streams.vectors_to_packets([], tags, 'len'), [])
+        self.assertEqual(tagged_streams.vectors_to_packets(numpy.array([]), tags, 'len'), [])
+        self.assertRaises(ValueError, tagged_streams.arrays_to_packets,
+                          data, [1, 5], [4, 5])
+        self.assertRaises(ValueError, tagged_streams.lengthtags_to_arrays,
+                          [make_tag(0, 4), make_tag(0, 3)], 'len')
+
+    def test_003_count_bursts(self):
+        # bursts: 0-5, 7-8, 12-13
+        offsets = [0, 2, 7, 12]
+        lengths = [2, 4, 2, 2]
+        self.assertEqual(tagged_streams.count_bursts_arrays(15, offsets, lengths), 3)
+        self.assertEqual(tagged_streams.count_bursts_arrays(12, offsets, lengths), 2)
+        self.assertEqual(tagged_streams.count_bursts_arrays(0, offsets, lengths), 0)
+        tags = [make_tag(o, l) for o, l in zip(offsets, lengths)]
+        self.assertEqual(tagged_streams.count_bursts(range(15), tags, 'len'), 3)
+        self.assertRaises(StandardError, tagged_streams.count_bursts_arrays,
+                          15, [0, 3], [4, 2])
+
+    def test_004_strings(self):
+        s = ''.join(chr(i) for i in range(256))
+        v = tagged_streams.string_to_vector(s)
+        self.assertEqual(v, range(256))
+        self.assertEqual(tagged_streams.vector_to_string(v), s)
+        self.assertEqual(tagged_streams.array_to_string(tagged_streams.string_to_array(s)), s)
+        self.assertRaises(ValueError, tagged_streams.array_to_string, [256])
+        data, tags = tagged_streams.strings_to_vectors(['ab', 'cde'], 'len')
+        self.assertEqual(tagged_streams.vectors_to_strings(data, tags, 'len'), ['ab', 'cde'])
+
+if __name__ == '__main__':
+    gr_unittest.run(test_tagged_streams, "test_tagged_streams.xml")
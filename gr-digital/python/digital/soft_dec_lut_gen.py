@@ -20,8 +20,14 @@
 # Boston, MA 02110-1301, USA.
 #
 
+import hashlib
+import os
+import tempfile
 import numpy
 
+# Version of the cached table files
+SOFT_DEC_CACHE_VERSION = 1
+
 def soft_dec_table_generator(soft_dec_gen, prec, Es=1):
     '''
     | Builds a LUT that is a list of tuples. The tuple represents the
@@ -94,7 +100,7 @@ def soft_dec_table_generator(soft_dec_gen, prec, Es=1):
             table.append(decs)
     return table
 
-def soft_dec_table(constel, symbols, prec, npwr=1):
+def soft_dec_table(constel, symbols, prec, npwr=1, cache_dir=None):
     '''
     Similar in nature to soft_dec_table_generator above. Instead, this
     takes in the constellation and symbol points along with the noise
@@ -110,25 +116,74 @@ def soft_dec_table(constel, symbols, prec, npwr=1):
 
     Because this uses the calc_soft_dec function, it can be quite
     a bit more expensive to generate the LUT, though it should be
-    one-time work.
+    one-time work. The soft decisions of all points are calculated
+    at once, in blocks of rows to bound the memory use.
+
+    If cache_dir is given, the table is stored there and later calls
+    with the same constellation, symbols, precision and noise power
+    load it instead of calculating it again.
     '''
 
-    re_min = min(numpy.array(constel).real)
-    im_min = min(numpy.array(constel).imag)
-    re_max = max(numpy.array(constel).real)
-    im_max = max(numpy.array(constel).imag)
+    if cache_dir is not None:
+        cache_file = os.path.join(cache_dir, _soft_dec_cache_name(constel, symbols, prec, npwr))
+        try:
+            return numpy.load(cache_file).tolist()
+        except (IOError, ValueError):
+            pass  # not cached yet or unreadable, calculate again
 
-    npts = 2.0**prec
+    constel = numpy.asarray(constel, dtype=numpy.complex128)
+    re_min = min(constel.real)
+    im_min = min(constel.imag)
+    re_max = max(constel.real)
+    im_max = max(constel.imag)
+
+    npts = int(2**prec)
     yrng = numpy.linspace(im_min, im_max, npts)
     xrng = numpy.linspace(re_min, re_max, npts)
 
-    table = []
-    for y in yrng:
-        for x in xrng:
-            pt = complex(x, y)
-            decs = calc_soft_dec(pt, constel, symbols, npwr)
-            table.append(decs)
-    return table
+    # Index y*npts + x as in soft_dec_table_generator
+    k = int(numpy.log2(len(constel)))
+    table = numpy.empty((npts*npts, k))
+    rows = max(1, 2**20 // (npts*len(constel)))
+    for y0 in range(0, npts, rows):
+        pts = (xrng[numpy.newaxis,:] + 1j*yrng[y0:y0+rows,numpy.newaxis]).ravel()
+        table[y0*npts:y0*npts+len(pts)] = calc_soft_dec(pts, constel, symbols, npwr)
+
+    if cache_dir is not None:
+        _save_soft_dec_table(cache_file, table)
+    return table.tolist()
+
+def _soft_dec_cache_name(constel, symbols, prec, npwr):
+    '''
+    File name of a cached soft decision table, from a hash of
+    everything the table depends on.
+    '''
+    h = hashlib.sha1()
+    h.update(numpy.asarray(constel, dtype=numpy.complex128).tostring())
+    h.update(numpy.asarray(symbols, dtype=numpy.int64).tostring())
+    h.update(repr((int(prec), float(npwr), SOFT_DEC_CACHE_VERSION)))
+    return "soft_dec_table_{0}.npy".format(h.hexdigest())
+
+def _save_soft_dec_table(cache_file, table):
+    '''
+    Writes a table to the cache, through a temporary file so that
+    readers never see a partial table. Failures are only reported,
+    the table is still usable.
+    '''
+    try:
+        path = os.path.dirname(cache_file)
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        fd, tmp_file = tempfile.mkstemp(suffix=".tmp", dir=path)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                numpy.save(f, table)
+            os.rename(tmp_file, cache_file)
+        except:
+            os.remove(tmp_file)
+            raise
+    except (IOError, OSError) as e:
+        print "Warning: could not cache soft decision table {0}: {1}".format(cache_file, e)
 
 def calc_soft_dec_from_table(sample, table, prec, Es=1.0):
     '''
@@ -138,7 +193,9 @@ def calc_soft_dec_from_table(sample, table, prec, Es=1.0):
     decisions tuple at that index.
 
     sample: the complex sample to calculate the soft decisions
-    from.
+    from. For an array of N samples, an (N, k) array of the soft
+    decisions is returned. Passing the table as a numpy array saves
+    converting it on every call.
 
     table: the LUT.
 
@@ -158,6 +215,21 @@ def calc_soft_dec_from_table(sample, table, prec, Es=1.0):
     scale = (lut_scale) / (2.0*maxd)
 
     alpha = 0.99 # to keep index within bounds
+    if numpy.ndim(sample) > 0:
+        sample = numpy.asarray(sample).ravel()
+        xre = ((maxd + numpy.clip(sample.real, -alpha*maxd, alpha*maxd)) * scale)
+        xim = ((maxd + numpy.clip(sample.imag, -alpha*maxd, alpha*maxd)) * scale)
+        index = xre.astype(int) + int(lut_scale)*xim.astype(int)
+        # same wrap around as below
+        max_index = int(lut_scale**2)
+        index = numpy.where(index >= max_index,
+                            index - int(lut_scale)*((index - max_index) // int(lut_scale) + 1),
+                            index)
+        index = numpy.where(index < 0,
+                            index + int(lut_scale)*((-index - 1) // int(lut_scale) + 1),
+                            index)
+        return numpy.asarray(table)[index]
+
     xre = sample.real
     xim = sample.imag
     xre = ((maxd + min(alpha*maxd, max(-alpha*maxd, xre))) * scale)
@@ -192,40 +264,35 @@ def calc_soft_dec(sample, constel, symbols, npwr=1):
     The function returns a vector of k soft decisions. Decisions less
     than 0 are more likely to indicate a '0' bit and decisions greater
     than 0 are more likely to indicate a '1' bit.
+
+    sample may also be an array of N samples, the soft decisions are
+    then returned as an (N, k) array.
     '''
 
+    constel = numpy.asarray(constel)
     M = len(constel)
     k = int(numpy.log2(M))
-    tmp = 2*k*[0,]
-    s = k*[0,]
-
-    for i in range(M):
-        # Calculate the distance between the sample and the current
-        # constellation point.
-        dist = abs(sample - constel[i])
-
-        # Calculate the probability factor from the distance and the
-        # scaled noise power.
-        d = numpy.exp(-dist/npwr)
-
-        for j in range(k):
-            # Get the bit at the jth index
-            mask = 1<<j
-            bit = (symbols[i] & mask) >> j
-
-            # If the bit is a 0, add to the probability of a zero
-            if(bit == 0):
-                tmp[2*j+0] += d
-            # else, add to the probability of a one
-            else:
-                tmp[2*j+1] += d
+
+    # bits[i, j] is bit k-1-j of symbols[i], the order of the soft decisions
+    shifts = numpy.arange(k-1, -1, -1)
+    bits = (numpy.asarray(symbols)[:,numpy.newaxis] >> shifts) & 1
+
+    samples = numpy.atleast_1d(numpy.asarray(sample))
+
+    # Calculate the distance between the samples and all constellation
+    # points and the probability factors from the distance and the
+    # scaled noise power.
+    dist = abs(samples[:,numpy.newaxis] - constel[numpy.newaxis,:])
+    d = numpy.exp(-dist/npwr)
 
     # Calculate the log-likelihood ratio for all bits based on the
-    # probability of ones (tmp[2*i+1]) over the probability of a zero
-    # (tmp[2*i+0]).
-    for i in range(k):
-        s[k-1-i] = (numpy.log(tmp[2*i+1]) - numpy.log(tmp[2*i+0]))
+    # probability of ones over the probability of a zero.
+    p1 = numpy.dot(d, bits)
+    p0 = numpy.dot(d, 1 - bits)
+    s = numpy.log(p1) - numpy.log(p0)
 
+    if numpy.ndim(sample) == 0:
+        return s[0].tolist()
     return s
 
 
@@ -27,7 +27,7 @@ This module contains functions for aligning sequences.
 >>> rndm.seed(1234)
 >>> ran_seq = [rndm.randint(0,1) for i in range(0, 100)]
 >>> offset_seq = [0] * 20 + ran_seq
->>> correct, overlap, offset = align_sequences(ran_seq, offset_seq)
+>>> correct, overlap, offset, indices = align_sequences(ran_seq, offset_seq)
 >>> print(correct, overlap, offset)
 (1.0, 100, -20)
 >>> offset_err_seq = []
@@ -36,13 +36,14 @@ This module contains functions for aligning sequences.
 ...         offset_err_seq.append(rndm.randint(0,1))
 ...     else:
 ...         offset_err_seq.append(bit)
->>> correct, overlap, offset = align_sequences(ran_seq, offset_err_seq)
+>>> correct, overlap, offset, indices = align_sequences(ran_seq, offset_err_seq)
 >>> print(overlap, offset)
 (100, -20)
 
 """
 
 import random
+import numpy
 
 # DEFAULT PARAMETERS
 # If the fraction of matching bits between two sequences is greater than
@@ -52,6 +53,11 @@ def_correct_cutoff = 0.9
 def_max_offset = 500
 # The maximum number of samples to take from two sequences to check alignment.
 def_num_samples = 1000
+# Longer sequences are correlated in windows of this many entries of d1.
+def_window_length = 2**20
+# Up to this number of sampled entries times offsets the samples are
+# compared directly instead of correlating the sequences.
+def_max_direct_compares = 2**22
 
 def compare_sequences(d1, d2, offset, sample_indices=None):
     """
@@ -94,47 +100,123 @@ def random_sample(size, num_samples=def_num_samples, seed=None):
     indices.sort()
     return indices
 
+def correlate(x, y, min_lag, max_lag, window_length=def_window_length):
+    """
+    Returns the cross-correlation c[k] = sum(x[i]*y[i-k]) of two real
+    arrays for the lags k from min_lag to max_lag, calculated with FFTs.
+    x is split into windows of window_length entries which are correlated
+    with the part of y they overlap for these lags, so the length of the
+    FFTs depends on the window length and the range of lags only.
+    """
+    c = numpy.zeros(max_lag - min_lag + 1)
+    for start in range(0, len(x), window_length):
+        xw = x[start:start+window_length]
+        # y[j] overlaps xw for the lags if j = i-k
+        y_start = max(0, start - max_lag)
+        yw = y[y_start:max(y_start, start + len(xw) - min_lag)]
+        if not len(yw):
+            continue
+        nfft = 1 << int(len(xw) + len(yw) - 1).bit_length()
+        cw = numpy.fft.irfft(numpy.fft.rfft(xw, nfft) *
+                             numpy.conj(numpy.fft.rfft(yw, nfft)), nfft)
+        # cw[l] is the lag l + start - y_start, negative l wrap around
+        lags = numpy.arange(min_lag, max_lag + 1) - start + y_start
+        valid = (lags > -len(yw)) & (lags < len(xw))
+        c[valid] += cw[lags[valid] % nfft]
+    return c
+
 def align_sequences(d1, d2,
                     num_samples=def_num_samples,
                     max_offset=def_max_offset,
                     correct_cutoff=def_correct_cutoff,
                     seed=None,
-                    indices=None):
+                    indices=None,
+                    window_length=def_window_length):
     """
     Takes two sequences and finds the offset and which the two sequences best
     match.  It returns the fraction correct, the number of entries compared,
     the offset.
     d1 & d2 -- sequences to compare
     num_samples -- the maximum number of entries to compare
-    max_offset -- the maximum offset between the sequences that is checked
+    max_offset -- the maximum offset between the sequences that is checked,
+                  None checks all offsets
     correct_cutoff -- If the fraction of bits correct is greater than this then
                       the offset is assumed to optimum.
     seed -- a random number seed
     indices -- an explicit list of the indices used to compare the two sequences
+    window_length -- d1 is correlated in windows of this length
+
+    The matches at all offsets are counted at once by cross-correlating
+    the sequences mapped to +/-1, with the entries of d1 weighted by how
+    often they are sampled. Sequences that are not binary are correlated
+    once for every value in d1. Few samples are compared directly, for
+    all offsets at once. The offset closest to 0 with a fraction
+    correct above correct_cutoff is returned, else the best one. As with
+    compare_sequences, d2 wraps around at positive offsets.
     """
     max_overlap = max(len(d1), len(d2))
     if indices is None:
         indices = random_sample(max_overlap, num_samples, seed)
-    max_frac_correct = 0
-    best_offset = None
-    best_compared = None
-    best_correct = None
-    pos_range = range(0, min(len(d1), max_offset))
-    neg_range = range(-1, -min(len(d2), max_offset), -1)
-    # Interleave the positive and negative offsets.
-    int_range = [item for items in zip(pos_range, neg_range) for item in items]
-    for offset in int_range:
-        correct, compared = compare_sequences(d1, d2, offset, indices)
-        frac_correct = 1.0*correct/compared
-        if frac_correct > max_frac_correct:
-            max_frac_correct = frac_correct
-            best_offset = offset
-            best_compared = compared
-            best_correct = correct
-            if frac_correct > correct_cutoff:
-                break
-    return max_frac_correct, best_compared, best_offset, indices
-    
+    a1 = numpy.asarray(d1)
+    a2 = numpy.asarray(d2)
+    if max_offset is None:
+        max_offset = max_overlap
+    # Offsets 0, -1, 1, -2, 2, ... as many of each sign
+    num_offsets = min(len(a1), max_offset, min(len(a2), max_offset) - 1)
+    if num_offsets <= 0:
+        return 0, None, None, indices
+    min_lag = -num_offsets
+    max_lag = num_offsets - 1
+
+    # How often every entry of d1 is sampled
+    sample_indices = numpy.asarray(indices, dtype=numpy.int64)
+    sample_indices = sample_indices[(sample_indices >= 0) & (sample_indices < len(a1))]
+    weights = numpy.bincount(sample_indices, minlength=len(a1)).astype(numpy.float64)
+
+    # Number of sampled entries that are compared, for every lag
+    lags = numpy.arange(min_lag, max_lag + 1)
+    cum_weights = numpy.concatenate(([0], numpy.cumsum(weights)))
+    compared = cum_weights[numpy.minimum(len(a1), len(a2) + lags)]
+
+    # d2 twice, d2[i-k] is at i-k+len(d2) also for negative i-k
+    a2 = numpy.concatenate((a2, a2))
+    ext_lags = (min_lag - len(d2), max_lag - len(d2), window_length)
+    values = numpy.union1d(a1, a2)
+    if len(sample_indices)*len(lags) <= def_max_direct_compares:
+        i = sample_indices[:,numpy.newaxis]
+        overlaps = i < len(d2) + lags
+        matches = a1[i] == a2[numpy.where(overlaps, i - lags + len(d2), 0)]
+        correct = (matches & overlaps).sum(axis=0)
+    elif len(values) <= 2:
+        # products of +/-1 are 1 for matches and -1 otherwise
+        s1 = numpy.where(a1 == values[0], -1.0, 1.0)
+        s2 = numpy.where(a2 == values[0], -1.0, 1.0)
+        correct = (correlate(weights*s1, s2, *ext_lags) + compared)/2
+    else:
+        correct = numpy.zeros(len(lags))
+        for value in numpy.unique(a1):
+            correct += correlate(weights*(a1 == value),
+                                 (a2 == value).astype(numpy.float64), *ext_lags)
+    correct = numpy.rint(correct).astype(numpy.int64)
+    compared = numpy.rint(compared).astype(numpy.int64)
+
+    # Check the offsets in the order 0, -1, 1, -2, 2, ...
+    order = numpy.argsort(numpy.where(lags < 0, -2*lags - 1, 2*lags))
+    correct = correct[order]
+    compared = compared[order]
+    frac_correct = numpy.zeros(len(order))
+    checked = compared > 0
+    frac_correct[checked] = 1.0*correct[checked]/compared[checked]
+    above = numpy.flatnonzero(frac_correct > correct_cutoff)
+    if len(above):
+        best = above[0]
+    else:
+        best = numpy.argmax(frac_correct)
+    if frac_correct[best] == 0:
+        return 0, None, None, indices
+    return (float(frac_correct[best]), int(compared[best]),
+            int(lags[order[best]]), indices)
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
@@ -23,6 +23,7 @@
 # DEPRECATED -- Marked for removal in 3.8
 
 from gnuradio import gr
+import numpy
 import pmt
 
 def make_lengthtags(lengths, offsets, tagname='length', vlen=1):
@@ -36,27 +37,22 @@ def make_lengthtags(lengths, offsets, tagname='length', vlen=1):
         tags.append(tag)
     return tags
 
-def string_to_vector(string):
-    v = []
-    for s in string:
-        v.append(ord(s))
-    return v
-
-def strings_to_vectors(strings, lengthtagname):
-    vs = [string_to_vector(string) for string in strings]
-    return packets_to_vectors(vs, lengthtagname)
-
-def vector_to_string(v):
-    s = []
-    for d in v:
-        s.append(chr(d))
-    return ''.join(s)
+def string_to_array(string):
+    """
+    Returns the characters of a string as a uint8 array.
+    """
+    return numpy.fromstring(string, dtype=numpy.uint8)
 
-def vectors_to_strings(data, tags, lengthtagname):
-    packets = vectors_to_packets(data, tags, lengthtagname)
-    return [vector_to_string(packet) for packet in packets]
+def array_to_string(v):
+    """
+    Returns the string with the characters in the array v.
+    """
+    v = numpy.asarray(v)
+    if v.size and (v.min() < 0 or v.max() > 255):
+        raise ValueError("Characters must be in range(256).")
+    return v.astype(numpy.uint8).tostring()
 
-def count_bursts(data, tags, lengthtagname, vlen=1):
+def _lengthtags_to_dict(tags, lengthtagname, vlen=1):
     lengthtags = [t for t in tags
                   if pmt.symbol_to_string(t.key) == lengthtagname]
     lengths = {}
@@ -66,47 +62,18 @@ def count_bursts(data, tags, lengthtagname, vlen=1):
                 "More than one tags with key {0} with the same offset={1}."
                 .format(lengthtagname, tag.offset))
         lengths[tag.offset] = pmt.to_long(tag.value)*vlen
-    in_burst = False
-    in_packet = False
-    packet_length = None
-    packet_pos = None
-    burst_count = 0
-    for pos in range(len(data)):
-        if pos in lengths:
-            if in_packet:
-                print("Got tag at pos {0} current packet_pos is {1}".format(pos, packet_pos))
-                raise StandardError("Received packet tag while in packet.")
-            packet_pos = -1
-            packet_length = lengths[pos]
-            in_packet = True
-            if not in_burst:
-                burst_count += 1
-            in_burst = True
-        elif not in_packet:
-            in_burst = False
-        if in_packet:
-            packet_pos += 1
-            if packet_pos == packet_length-1:
-                in_packet = False
-                packet_pos = None
-    return burst_count
+    return lengths
 
-def vectors_to_packets(data, tags, lengthtagname, vlen=1):
-    lengthtags = [t for t in tags
-                  if pmt.symbol_to_string(t.key) == lengthtagname]
-    lengths = {}
-    for tag in lengthtags:
-        if tag.offset in lengths:
-            raise ValueError(
-                "More than one tags with key {0} with the same offset={1}."
-                .format(lengthtagname, tag.offset))
-        lengths[tag.offset] = pmt.to_long(tag.value)*vlen
+def _follow_packets(lengths, data_len, lengthtagname):
+    """
+    Yields the offsets and lengths of the packets that make up
+    data_len items, following the dict of lengths from offset 0.
+    """
     if 0 not in lengths:
         raise ValueError("There is no tag with key {0} and an offset of 0"
                          .format(lengthtagname))
     pos = 0
-    packets = []
-    while pos < len(data):
+    while pos < data_len:
         if pos not in lengths:
             raise ValueError("There is no tag with key {0} and an offset of {1}."
                              "We were expecting one."
@@ -114,11 +81,123 @@ def vectors_to_packets(data, tags, lengthtagname, vlen=1):
         length = lengths[pos]
         if length == 0:
             raise ValueError("Packets cannot have zero length.")
-        if pos+length > len(data):
+        if pos+length > data_len:
             raise ValueError("The final packet is incomplete.")
-        packets.append(data[pos: pos+length])
+        yield pos, length
         pos += length
-    return packets
+
+def lengthtags_to_arrays(tags, lengthtagname, vlen=1):
+    """
+    Returns the offsets and the lengths (times vlen) of the length tags
+    among tags as two arrays, sorted by offset.
+    """
+    lengths = _lengthtags_to_dict(tags, lengthtagname, vlen)
+    offsets = numpy.array(sorted(lengths), dtype=numpy.int64)
+    return offsets, numpy.array([lengths[o] for o in offsets.tolist()], dtype=numpy.int64)
+
+def packets_to_arrays(packets, dtype=None):
+    """
+    Joins packets into one array.
+
+    Returns the data and the offsets and lengths of the packets in it.
+    """
+    lengths = numpy.array([len(packet) for packet in packets], dtype=numpy.int64)
+    offsets = numpy.cumsum(lengths) - lengths
+    # empty packets would make the data float
+    packets = [packet for packet in packets if len(packet)]
+    if len(packets):
+        data = numpy.concatenate(packets)
+        if dtype is not None:
+            data = data.astype(dtype, copy=False)
+    else:
+        data = numpy.array([], dtype=dtype)
+    return data, offsets, lengths
+
+def packet_arrays(offsets, lengths, data_len, lengthtagname='length'):
+    """
+    Returns the offsets and lengths of the packets that make up
+    data_len items, starting with the packet at offset 0 and each
+    following where the previous one ends.
+
+    offsets must be sorted, as returned by lengthtags_to_arrays.
+    Packets between these, e.g. at offsets beyond data_len, are
+    dropped.
+    """
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    lengths = numpy.asarray(lengths, dtype=numpy.int64)
+    n = numpy.searchsorted(offsets, data_len)
+    if (n and offsets[0] == 0 and offsets[n-1] + lengths[n-1] == data_len and
+            (lengths[:n] > 0).all() and
+            (offsets[1:n] == offsets[:n-1] + lengths[:n-1]).all()):
+        return offsets[:n], lengths[:n]
+    # Not a plain sequence of packets, follow the packets one by one
+    packets = list(_follow_packets(dict(zip(offsets.tolist(), lengths.tolist())),
+                                   data_len, lengthtagname))
+    packets = numpy.array(packets, dtype=numpy.int64).reshape(-1, 2)
+    return packets[:,0], packets[:,1]
+
+def arrays_to_packets(data, offsets, lengths, lengthtagname='length'):
+    """
+    Splits data into packets, see packet_arrays.
+
+    Returns a list of views into data.
+    """
+    data = numpy.asarray(data)
+    offsets, lengths = packet_arrays(offsets, lengths, len(data), lengthtagname)
+    if not len(offsets):
+        # numpy.split always returns at least one piece
+        return []
+    return numpy.split(data, offsets[1:])
+
+def count_bursts_arrays(data_len, offsets, lengths):
+    """
+    Counts the bursts in data_len items, a burst being a sequence of
+    packets without gaps between them.
+
+    offsets must be sorted, as returned by lengthtags_to_arrays.
+    """
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    lengths = numpy.asarray(lengths, dtype=numpy.int64)
+    n = numpy.searchsorted(offsets, data_len)
+    offsets = offsets[:n]
+    # a packet without a positive length lasts until the end
+    ends = numpy.where(lengths[:n] > 0, offsets + lengths[:n], data_len)
+    overlaps = numpy.flatnonzero(offsets[1:] < ends[:-1])
+    if len(overlaps):
+        raise StandardError("Received packet tag while in packet: tag at pos {0}, "
+                            "packet started at pos {1}."
+                            .format(offsets[overlaps[0]+1], offsets[overlaps[0]]))
+    if not n:
+        return 0
+    return 1 + int(numpy.count_nonzero(offsets[1:] > ends[:-1]))
+
+def string_to_vector(string):
+    return map(ord, string)
+
+def strings_to_vectors(strings, lengthtagname):
+    vs = [string_to_vector(string) for string in strings]
+    return packets_to_vectors(vs, lengthtagname)
+
+def vector_to_string(v):
+    if isinstance(v, numpy.ndarray):
+        return array_to_string(v)
+    return ''.join(map(chr, v))
+
+def vectors_to_strings(data, tags, lengthtagname):
+    packets = vectors_to_packets(data, tags, lengthtagname)
+    return [vector_to_string(packet) for packet in packets]
+
+def count_bursts(data, tags, lengthtagname, vlen=1):
+    offsets, lengths = lengthtags_to_arrays(tags, lengthtagname, vlen)
+    return count_bursts_arrays(len(data), offsets, lengths)
+
+def vectors_to_packets(data, tags, lengthtagname, vlen=1):
+    if isinstance(data, numpy.ndarray):
+        offsets, lengths = lengthtags_to_arrays(tags, lengthtagname, vlen)
+        return arrays_to_packets(data, offsets, lengths, lengthtagname)
+    lengths = _lengthtags_to_dict(tags, lengthtagname, vlen)
+    return [data[pos: pos+length]
+            for pos, length in _follow_packets(lengths, len(data), lengthtagname)]
 
 def packets_to_vectors(packets, lengthtagname, vlen=1):
     tags = []
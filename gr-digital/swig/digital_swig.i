@@ -151,6 +151,7 @@
 %include "gnuradio/digital/correlate_and_sync_cc.h"
 %include "gnuradio/digital/costas_loop_cc.h"
 %include "gnuradio/digital/cpmmod_bc.h"
+%ignore gr::digital::check_crc32_packets;
 %include "gnuradio/digital/crc32.h"
 %include "gnuradio/digital/crc32_bb.h"
 %include "gnuradio/digital/crc32_async_bb.h"
@@ -286,3 +287,31 @@ GR_SWIG_BLOCK_MAGIC_FACTORY(digital, cpmmod_bc, gmskmod_bc);
 %include "constellation.i"
 %include "packet_header.i"
 %include "ofdm_equalizer.i"
+
+// Batch CRC-32 check over python buffers (strings, numpy arrays).
+%include <buffer_typemaps.i>
+%apply (const void *BUF, size_t BUFLEN) { (const void *OFFS, size_t OFFSLEN) };
+
+%inline %{
+namespace gr {
+  namespace digital {
+    //! Run check_crc32_packets on packets in BUF bounded by the
+    //! int64 offsets in OFFS, writing one flag byte per packet to WBUF
+    void check_crc32_buffer(const void *BUF, size_t BUFLEN,
+                            const void *OFFS, size_t OFFSLEN,
+                            void *WBUF, size_t WBUFLEN)
+    {
+      const int64_t *offsets = (const int64_t *)OFFS;
+      size_t noffsets = OFFSLEN / sizeof(int64_t);
+      if(noffsets == 0 || WBUFLEN != noffsets - 1)
+        throw std::invalid_argument("check_crc32_buffer: need one flag per packet");
+      for(size_t i = 0; i < noffsets; i++) {
+        if(offsets[i] < 0 || offsets[i] > (int64_t)BUFLEN || (i > 0 && offsets[i] < offsets[i-1]))
+          throw std::invalid_argument("check_crc32_buffer: invalid packet offsets");
+      }
+      check_crc32_packets((const unsigned char *)BUF, offsets, WBUFLEN,
+                          (unsigned char *)WBUF);
+    }
+  }
+}
+%}
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from numpy import *
+
+class GF2_matrix:
+  """
+  Matrix over GF(2) with every row stored as a bitset.
+
+  Rows are packed eight columns per byte, first column in the most
+  significant bit, and padded to whole 64 bit words so that adding
+  rows XORs a word at a time. Columns keep their original order;
+  elimination routines report row and column permutations instead
+  of moving data around.
+  """
+  def __init__(self, H):
+    H = asarray(H)
+    self.numRows = H.shape[0]
+    self.numCols = H.shape[1]
+    numWords = (self.numCols + 63) // 64
+    self.bits = zeros((self.numRows, 8 * numWords), dtype=uint8)
+    if self.numRows and self.numCols:
+      packed = packbits((H % 2) != 0, axis=1)
+      self.bits[:, 0:packed.shape[1]] = packed
+    self.words = self.bits.view(uint64)
+
+  def copy(self):
+    other = GF2_matrix(zeros((0, 0)))
+    other.numRows = self.numRows
+    other.numCols = self.numCols
+    other.bits = self.bits.copy()
+    other.words = other.bits.view(uint64)
+    return other
+
+  def column(self, j):
+    """ Returns column j as a boolean array. """
+    return ((self.bits[:, j >> 3] >> (7 - (j & 7))) & 1).astype(bool)
+
+  def row_support(self, i):
+    """ Returns the columns of the nonzero entries in row i. """
+    return unpackbits(self.bits[i])[0:self.numCols].nonzero()[0]
+
+  def add_row(self, i, rows):
+    """ Adds (mod 2) row i to the rows selected by index or mask. """
+    self.words[rows] ^= self.words[i]
+
+  def add_row_from(self, other, i, rows):
+    """ Same as add_row, with row i taken from another matrix. """
+    self.words[rows] ^= other.words[i]
+
+  def swap_rows(self, a, b):
+    self.words[[a, b]] = self.words[[b, a]]
+
+  def dense(self, dtype=float):
+    return unpackbits(self.bits, axis=1)[:, 0:self.numCols].astype(dtype)
+
+  def systematic_reduce(self):
+    """
+    In-place Gauss-Jordan elimination with the pivot rule of
+    getSystematicGmatrix: the pivot for row i is the first nonzero
+    at or after column i, which is swapped into column i. Rows
+    without a pivot are rotated to the bottom.
+
+    Returns [rowOrder, columnOrder, rank]. Row i of the reduced
+    matrix is stored row rowOrder[i] and column j is original
+    column columnOrder[j].
+    """
+    rowOrder = range(self.numRows)
+    columnOrder = arange(self.numCols)
+    # position[c] is the current column index of original column c
+    position = arange(self.numCols)
+    limit = self.numRows
+    i = 0
+    while i < limit:
+      row = rowOrder[i]
+      candidates = position[self.row_support(row)]
+      candidates = candidates[candidates >= i]
+      if candidates.size:
+        j = candidates.min()
+        a = columnOrder[i]
+        b = columnOrder[j]
+        columnOrder[i] = b
+        columnOrder[j] = a
+        position[b] = i
+        position[a] = j
+        rows = self.column(b)
+        rows[row] = False
+        self.add_row(row, rows)
+        i = i + 1
+      else:
+        rowOrder.append(rowOrder.pop(i))
+        limit -= 1
+    return [rowOrder, columnOrder, i]
+
+  def rank(self):
+    """ Returns the rank over GF(2). The matrix is left unchanged. """
+    work = self.copy()
+    rank = 0
+    active = ones(self.numRows, dtype=bool)
+    for j in arange(self.numCols):
+      rows = work.column(j) & active
+      if not rows.any():
+        continue
+      pivot = rows.nonzero()[0][0]
+      rows[pivot] = False
+      work.add_row(pivot, rows)
+      active[pivot] = False
+      rank = rank + 1
+      if rank == self.numRows:
+        break
+    return rank
+
+  def inverse(self):
+    """
+    Returns the inverse of a square matrix as a dense array. Raises
+    linalg.LinAlgError if the matrix is singular over GF(2).
+    """
+    t = self.numRows
+    work = GF2_matrix(concatenate((self.dense(uint8), identity(t, dtype=uint8)), axis=1))
+    for j in arange(t):
+      rows = work.column(j)
+      rows[0:j] = False
+      if not rows.any():
+        raise linalg.LinAlgError('Matrix is singular over GF(2)')
+      pivot = rows.nonzero()[0][0]
+      if pivot != j:
+        work.swap_rows(pivot, j)
+      rows = work.column(j)
+      rows[j] = False
+      work.add_row(j, rows)
+    return work.dense()[:, t:2*t]
+
+def mul_inv_upper_triangular(E, T):
+  """
+  Returns E * inv(T) (mod 2) as a boolean array, for T upper
+  triangular with ones on the diagonal. Solves X * T = E one column
+  at a time, for all rows of E at once.
+  """
+  rest = GF2_matrix(E)
+  Tm = GF2_matrix(T)
+  X = zeros(E.shape, dtype=bool)
+  for i in arange(Tm.numRows):
+    rows = rest.column(i)
+    if rows.any():
+      X[:, i] = rows
+      rest.add_row_from(Tm, i, rows)
+  return X
@@ -21,13 +21,64 @@
 #
 
 import string, sys
+from itertools import islice
 from numpy import *
 from numpy.random import shuffle, randint
 from numpy.linalg import inv, det
+from GF2_matrix import GF2_matrix, mul_inv_upper_triangular
 
 # 0 gives no debug output, 1 gives a little, 2 gives a lot
 #verbose = 1 #######################################################
 
+def _read_alist_integers(myfile, count, indices=False, linesPerRead=1):
+  """
+  Reads whitespace separated integers from myfile until count
+  values have been found and returns them as an array. Line breaks
+  are not significant. For index lists zeros are dropped: MacKay's
+  alist files pad every list up to the maximum weight with zeros,
+  while the files written by the C++ alist class do not. Lines are
+  read linesPerRead at a time, so a larger value must only be used
+  when nothing after the values is needed.
+  """
+  chunks = []
+  found = 0
+  while found < count:
+    lines = list(islice(myfile, linesPerRead))
+    if not lines:
+      raise ValueError, 'alist file ended early'
+    values = fromstring(''.join(lines), dtype=int, sep=' ')
+    if indices:
+      values = values[values != 0]
+    chunks.append(values)
+    found += values.shape[0]
+  return concatenate(chunks + [zeros(0, dtype=int)])[0:count]
+
+def read_alist_indices(filename):
+  """
+  This function reads in an alist file without creating the
+  dense parity check matrix. It returns
+  [numRows, numCols, rowIndices, colPointers] where
+  rowIndices[colPointers[j]:colPointers[j+1]] are the rows (counted
+  from 0) of the nonzero entries in column j. The row lists at the
+  end of the file repeat the same information and are not read.
+  """
+  myfile = open(filename, 'r')
+  try:
+    [numCols, numRows] = _read_alist_integers(myfile, 2)
+    # maximum column and row weights
+    _read_alist_integers(myfile, 2)
+    colWeights = _read_alist_integers(myfile, numCols)
+    # row weights
+    _read_alist_integers(myfile, numRows)
+    colPointers = concatenate(([0], cumsum(colWeights)))
+    rowIndices = _read_alist_integers(myfile, colPointers[-1], True, 4096) - 1
+  finally:
+    myfile.close()
+
+  if rowIndices.shape[0] and rowIndices.max() >= numRows:
+    raise ValueError, 'alist file has a row index larger than the number of rows'
+  return [numRows, numCols, rowIndices, colPointers]
+
 def read_alist_file(filename):
   """
   This function reads in an alist file and creates the
@@ -36,27 +87,29 @@ def read_alist_file(filename):
   http://www.inference.phy.cam.ac.uk/mackay/codes/alist.html
   """
 
-  myfile    = open(filename,'r')
-  data      = myfile.readlines()
-  size      = string.split(data[0])
-  numCols   = int(size[0])
-  numRows   = int(size[1])
+  [numRows, numCols, rowIndices, colPointers] = \
+      read_alist_indices(filename)
   H = zeros((numRows,numCols))
-  for lineNumber in arange(4,4+numCols):
-    indices = string.split(data[lineNumber])
-    for index in indices:
-      H[int(index)-1,lineNumber-4] = 1
-  # The subsequent lines in the file list the indices for where
-  # the 1s are in the rows, but this is redundant
-  # information.
+  H[rowIndices, repeat(arange(numCols), diff(colPointers))] = 1
 
   return H
 
-def write_alist_file(filename, H, verbose=0):
+def _write_alist_lines(myfile, indices, pointers, linesPerWrite=4096):
+  # one line per list, every index followed by a space
+  numLists = pointers.shape[0] - 1
+  for first in xrange(0, numLists, linesPerWrite):
+    last = min(first + linesPerWrite, numLists)
+    lines = [''.join(['%d ' % (index + 1) for index in
+                      indices[pointers[i]:pointers[i+1]]])
+             for i in xrange(first, last)]
+    myfile.write('\n'.join(lines) + '\n')
+
+def write_alist_indices(filename, numRows, numCols, rowIndices,
+                        colPointers):
   """
-  This function writes an alist file for the parity check
-  matrix. The format of alist files is desribed at:
-  http://www.inference.phy.cam.ac.uk/mackay/codes/alist.html
+  This function writes an alist file for a parity check matrix
+  given in the form returned by read_alist_indices, without
+  creating the dense matrix. The file is written list by list.
   """
 
   try:
@@ -65,56 +118,50 @@ def write_alist_file(filename, H, verbose=0):
     sys.stderr.write("Could not open output file '{0}'".format(filename))
     sys.exit(1)
 
-  numRows = H.shape[0]
-  numCols = H.shape[1]
-
-  tempstring = `numCols` + ' ' + `numRows` + '\n'
-  myfile.write(tempstring)
-
-  tempstring1 = ''
-  tempstring2 = ''
-  maxRowWeight = 0
-  for rowNum in arange(numRows):
-    nonzeros = array(H[rowNum,:].nonzero())
-    rowWeight = nonzeros.shape[1]
-    if rowWeight > maxRowWeight:
-      maxRowWeight = rowWeight
-    tempstring1 = tempstring1 + `rowWeight` + ' '
-    for tempArray in nonzeros:
-      for index in tempArray:
-        tempstring2 = tempstring2 + `index+1` + ' '
-      tempstring2 = tempstring2 + '\n'
-  tempstring1 = tempstring1 + '\n'
-
-  tempstring3 = ''
-  tempstring4 = ''
-  maxColWeight = 0
-  for colNum in arange(numCols):
-    nonzeros = array(H[:,colNum].nonzero())
-    colWeight = nonzeros.shape[1]
-    if colWeight > maxColWeight:
-      maxColWeight = colWeight
-    tempstring3 = tempstring3 + `colWeight` + ' '
-    for tempArray in nonzeros:
-      for index in tempArray:
-        tempstring4 = tempstring4 + `index+1` + ' '
-      tempstring4 = tempstring4 + '\n'
-  tempstring3 = tempstring3 + '\n'
-
-  tempstring = `maxColWeight` + ' ' + `maxRowWeight` + '\n'
+  rowIndices = asarray(rowIndices)
+  colPointers = asarray(colPointers)
+  colWeights = diff(colPointers)
+  colIndices = repeat(arange(numCols), colWeights)
+  # Sort the nonzero entries by row. The sort is stable, so the
+  # columns in each row stay in increasing order.
+  order = argsort(rowIndices, kind='mergesort')
+  rowWeights = bincount(rowIndices, minlength=numRows)
+  rowPointers = concatenate(([0], cumsum(rowWeights)))
+
+  myfile.write('%d %d\n' % (numCols, numRows))
   # write out max column and row weights
-  myfile.write(tempstring)
+  maxColWeight = maxRowWeight = 0
+  if numCols:
+    maxColWeight = colWeights.max()
+  if numRows:
+    maxRowWeight = rowWeights.max()
+  myfile.write('%d %d\n' % (maxColWeight, maxRowWeight))
   # write out all of the column weights
-  myfile.write(tempstring3)
+  myfile.write(''.join(['%d ' % w for w in colWeights]) + '\n')
   # write out all of the row weights
-  myfile.write(tempstring1)
+  myfile.write(''.join(['%d ' % w for w in rowWeights]) + '\n')
   # write out the nonzero indices for each column
-  myfile.write(tempstring4)
+  _write_alist_lines(myfile, rowIndices, colPointers)
   # write out the nonzero indices for each row
-  myfile.write(tempstring2)
+  _write_alist_lines(myfile, colIndices[order], rowPointers)
   # close the file
   myfile.close()
 
+def write_alist_file(filename, H, verbose=0):
+  """
+  This function writes an alist file for the parity check
+  matrix. The format of alist files is desribed at:
+  http://www.inference.phy.cam.ac.uk/mackay/codes/alist.html
+  """
+
+  numRows = H.shape[0]
+  numCols = H.shape[1]
+  # nonzero() of the transpose lists the entries column by column
+  [colIndices, rowIndices] = asarray(H).T.nonzero()
+  colPointers = concatenate(([0], cumsum(bincount(colIndices,
+                                                  minlength=numCols))))
+  write_alist_indices(filename, numRows, numCols, rowIndices,
+                      colPointers)
 
 class LDPC_matrix:
   """ Class for a LDPC parity check matrix """
@@ -122,7 +169,7 @@ class LDPC_matrix:
              n_p_q = None,
              H_matrix = None):
     if (alist_filename != None):
-      self.H = self.read_alist_file(alist_filename)
+      self.H = read_alist_file(alist_filename)
     elif (n_p_q != None):
       self.H = self.regular_LDPC_code_contructor(n_p_q)
     elif (H_matrix != None):
@@ -209,6 +256,19 @@ class LDPC_matrix:
 
     return H
 
+def _is_full_rank(H, verbose=0):
+  """
+  Checks that H has full row rank over GF(2), which greedy upper
+  triangulation requires.
+  """
+  rank = GF2_matrix(H).rank()
+  if rank != H.shape[0]:
+    print 'Rank of H:', rank
+    print 'H has', H.shape[0], 'rows'
+    print 'Error: H must be full rank.'
+    return False
+  return True
+
 def greedy_upper_triangulation(H, verbose=0):
   """
   This function performs row/column permutations to bring
@@ -216,44 +276,38 @@ def greedy_upper_triangulation(H, verbose=0):
   upper triangulation method outlined in Modern Coding
   Theory Appendix 1, Section A.2
   """
-  H_t  = H.copy()
-
   # Per email from Dr. Urbanke, author of this textbook, this
   # algorithm requires H to be full rank
-  if linalg.matrix_rank(H_t) != H_t.shape[0]:
-      print 'Rank of H:', linalg.matrix_rank(tempArray)
-      print 'H has', H_t.shape[0], 'rows'
-      print 'Error: H must be full rank.'
-      return
-
-  size = H_t.shape
+  if not _is_full_rank(H, verbose):
+    return
+  return _greedy_upper_triangulation(H, verbose)
+
+def _greedy_upper_triangulation(H, verbose=0):
+  # Rows and columns are only permuted, so keep track of the
+  # permutations and read entries from H directly. The residual
+  # degree of every column is updated as rows leave the residual
+  # matrix instead of being recounted.
+  Hbits = (asarray(H) % 2) != 0
+  size = H.shape
   n = size[1]
   k = n - size[0]
+  m = n - k
+  rowOrder = range(m)
+  columnOrder = arange(n)
+  # residual degrees, indexed by original column
+  degrees = Hbits.sum(axis=0)
   g = t = 0
 
   while t != (n-k-g):
-    H_residual = H_t[t:n-k-g,t:n]
-    size       = H_residual.shape
-    numRows    = size[0]
-    numCols    = size[1]
-
-    minResidualDegrees = zeros((1,numCols))
-
-    for colNum in arange(numCols):
-      nonZeroElements = array(H_residual[:,colNum].nonzero())
-      minResidualDegrees[0,colNum] = nonZeroElements.shape[1]
+    minResidualDegrees = degrees[columnOrder[t:n]]
 
     # Find the minimum nonzero residual degree
-    nonZeroElementIndices = minResidualDegrees.nonzero()
-    nonZeroElements = minResidualDegrees[nonZeroElementIndices[0],
-                                         nonZeroElementIndices[1]]
-    minimumResidualDegree = nonZeroElements.min()
+    minimumResidualDegree = minResidualDegrees[minResidualDegrees.nonzero()].min()
 
     # Get indices of all of the columns in H_t that have degree
     # equal to the min positive residual degree, then pick a
     # random column c.
-    indices = (minResidualDegrees == minimumResidualDegree)\
-                                     .nonzero()[1]
+    indices = (minResidualDegrees == minimumResidualDegree).nonzero()[0]
     indices = indices + t
     if indices.shape[0] == 1:
       columnC = indices[0]
@@ -261,68 +315,31 @@ def greedy_upper_triangulation(H, verbose=0):
       randomIndex = randint(0,indices.shape[0],(1,1))[0][0]
       columnC = indices[randomIndex]
 
-    Htemp = H_t.copy()
-
-    if minimumResidualDegree == 1:
-      # This is the 'extend' case
-      rowThatContainsNonZero = H_residual[:,columnC-t].nonzero()[0][0]
-
-      # Swap column c with column t. (Book says t+1 but we
-      # index from 0, not 1.)
-      Htemp[:,columnC] = H_t[:,t]
-      Htemp[:,t] = H_t[:,columnC]
-      H_t = Htemp.copy()
-      Htemp = H_t.copy()
-      # Swap row r with row t. (Book says t+1 but we index from
-      # 0, not 1.)
-      Htemp[rowThatContainsNonZero + t,:] = H_t[t,:]
-      Htemp[t,:] = H_t[rowThatContainsNonZero + t,:]
-      H_t = Htemp.copy()
-      Htemp = H_t.copy()
-    else:
-      # This is the 'choose' case.
-      rowsThatContainNonZeros = H_residual[:,columnC-t]\
-                                          .nonzero()[0]
-
-      # Swap column c with column t. (Book says t+1 but we
-      # index from 0, not 1.)
-      Htemp[:,columnC] = H_t[:,t]
-      Htemp[:,t] = H_t[:,columnC]
-      H_t = Htemp.copy()
-      Htemp = H_t.copy()
-
-      # Swap row r1 with row t
-      r1 = rowsThatContainNonZeros[0]
-      Htemp[r1+t,:] = H_t[t,:]
-      Htemp[t,:] = H_t[r1+t,:]
-      numRowsLeft = rowsThatContainNonZeros.shape[0]-1
-      H_t = Htemp.copy()
-      Htemp = H_t.copy()
-
-      # Move the other rows that contain nonZero entries to the
-      # bottom of the matrix. We can't just swap them,
-      # otherwise we will be pulling up rows that we pushed
-      # down before. So, use a rotation method.
-      for index in arange (1,numRowsLeft+1):
-        rowInH_residual = rowsThatContainNonZeros[index]
-        rowInH_t = rowInH_residual + t - index +1
-        m = n-k
-        # Move the row with the nonzero element to the
-        # bottom; don't update H_t.
-        Htemp[m-1,:] = H_t[rowInH_t,:]
-        # Now rotate the bottom rows up.
-        sub_index = 1
-        while sub_index < (m - rowInH_t):
-          Htemp[m-sub_index-1,:] = H_t[m-sub_index,:]
-          sub_index = sub_index+1
-        H_t = Htemp.copy()
-        Htemp = H_t.copy()
-
-      # Save temp H as new H_t.
-      H_t = Htemp.copy()
-      Htemp = H_t.copy()
-      g = g + (minimumResidualDegree - 1)
-
+    rowsThatContainNonZeros = \
+        Hbits[rowOrder[t:n-k-g], columnOrder[columnC]].nonzero()[0]
+
+    # Swap column c with column t. (Book says t+1 but we index
+    # from 0, not 1.)
+    columnOrder[[columnC, t]] = columnOrder[[t, columnC]]
+
+    # Swap row r1 with row t. With a residual degree of 1 this is
+    # the 'extend' case, otherwise the 'choose' case.
+    r1 = rowsThatContainNonZeros[0]
+    rowOrder[t], rowOrder[r1+t] = rowOrder[r1+t], rowOrder[t]
+    leavingRows = [rowOrder[t]]
+
+    # Move the other rows that contain nonZero entries to the
+    # bottom of the matrix. We can't just swap them, otherwise we
+    # will be pulling up rows that we pushed down before. So, use
+    # a rotation method.
+    numRowsLeft = rowsThatContainNonZeros.shape[0]-1
+    for index in arange(1,numRowsLeft+1):
+      rowInH_t = rowsThatContainNonZeros[index] + t - index + 1
+      rowOrder.append(rowOrder.pop(rowInH_t))
+      leavingRows.append(rowOrder[-1])
+    g = g + (minimumResidualDegree - 1)
+
+    degrees = degrees - Hbits[leavingRows].sum(axis=0)
     t = t + 1
 
   if g == 0:
@@ -330,16 +347,18 @@ def greedy_upper_triangulation(H, verbose=0):
       print 'Error: gap is 0.'
     return
 
-  # We need to ensure phi is nonsingular.
+  H_t = asarray(H)[rowOrder][:, columnOrder]
+
+  # We need to ensure phi is nonsingular. T is upper triangular with
+  # ones on the diagonal, so E * inv(T) is found by substitution.
   T = H_t[0:t, 0:t]
   E = H_t[t:t+g,0:t]
   A = H_t[0:t,t:t+g]
   C = H_t[t:t+g,t:t+g]
   D = H_t[t:t+g,t+g:n]
 
-  invTmod2array = inv_mod2(T)
-  temp1  = dot(E,invTmod2array) % 2
-  temp2  = dot(temp1,A) % 2
+  ET = mul_inv_upper_triangular(E, T).astype(int)
+  temp2  = dot(ET,A.astype(int)) % 2
   phi    = (C - temp2) % 2
   if phi.any():
     try:
@@ -375,37 +394,25 @@ def greedy_upper_triangulation(H, verbose=0):
   iterationCount = 0
   columnsToShuffle = arange(t,n)
   rowsToShuffle = arange(t,t+g)
+  # The shuffles accumulate. Only T is left alone, so keep the
+  # current order of the other rows and columns and rebuild phi
+  # from E * inv(T), which does not change.
+  currentColumns = arange(t,n)
+  currentRows = arange(t,t+g)
 
   while iterationCount < maxIterations:
     if verbose > 1:
       print 'iterationCount:', iterationCount
-    tempH = H_t.copy()
 
     shuffle(columnsToShuffle)
     shuffle(rowsToShuffle)
-    index = 0
-    for newDestinationColumnNumber in arange(t,n):
-      oldColumnNumber = columnsToShuffle[index]
-      tempH[:,newDestinationColumnNumber] = \
-                                         H_t[:,oldColumnNumber]
-      index +=1
-
-    tempH2 = tempH.copy()
-    index = 0
-    for newDesinationRowNumber in arange(t,t+g):
-      oldRowNumber = rowsToShuffle[index]
-      tempH[newDesinationRowNumber,:] = tempH2[oldRowNumber,:]
-      index +=1
+    currentColumns = currentColumns[columnsToShuffle - t]
+    currentRows = currentRows[rowsToShuffle - t]
 
     # Now test this new H matrix.
-    H_t = tempH.copy()
-    T = H_t[0:t, 0:t]
-    E = H_t[t:t+g,0:t]
-    A = H_t[0:t,t:t+g]
-    C = H_t[t:t+g,t:t+g]
-    invTmod2array = inv_mod2(T)
-    temp1  = dot(E,invTmod2array) % 2
-    temp2  = dot(temp1,A) % 2
+    A = H_t[0:t][:, currentColumns[0:g]]
+    C = H_t[currentRows][:, currentColumns[0:g]]
+    temp2  = dot(ET[currentRows - t],A.astype(int)) % 2
     phi    = (C - temp2) % 2
     if phi.any():
       try:
@@ -420,7 +427,9 @@ def greedy_upper_triangulation(H, verbose=0):
         if verbose:
           print 'Found a nonsingular phi on',
           print 'iterationCount = ', iterationCount
-        return [H_t, g, t]
+        rows = concatenate((arange(t), currentRows))
+        columns = concatenate((arange(t), currentColumns))
+        return [H_t[rows][:, columns], g, t]
     else:
       if verbose > 1:
         print 'phi is all zeros'
@@ -437,50 +446,17 @@ def inv_mod2(squareMatrix, verbose=0):
   Calculates the mod 2 inverse of a matrix.
   """
   A = squareMatrix.copy()
-  t = A.shape[0]
 
   # Special case for one element array [1]
   if A.size == 1 and A[0] == 1:
     return array([1])
 
-  Ainverse = inv(A)
-  B = det(A)*Ainverse
-  C = B % 2
-
-  # Encountered lots of rounding errors with this function.
-  # Previously tried floor, C.astype(int), and casting with (int)
-  # and none of that works correctly, so doing it the tedious way.
-
-  test = dot(A,C) % 2
-  tempTest = zeros_like(test)
-  for colNum in arange(test.shape[1]):
-    for rowNum in arange(test.shape[0]):
-      value = test[rowNum,colNum]
-      if (abs(1-value)) < 0.01:
-        # this is a 1
-        tempTest[rowNum,colNum] = 1
-      elif (abs(2-value)) < 0.01:
-        # there shouldn't be any 2s after B % 2, but I'm
-        # seeing them!
-        tempTest[rowNum,colNum] = 0
-      elif (abs(0-value)) < 0.01:
-        # this is a 0
-        tempTest[rowNum,colNum] = 0
-      else:
-        if verbose > 1:
-          print 'In inv_mod2. Rounding error on this',
-          print 'value? Mod 2 has already been done.',
-          print 'value:', value
-
-  test = tempTest.copy()
-
-  if (test - eye(t,t) % 2).any():
+  try:
+    return GF2_matrix(A).inverse()
+  except linalg.linalg.LinAlgError:
     if verbose:
       print 'Error in inv_mod2: did not find inverse.'
-    # TODO is this the most appropriate error to raise?
-    raise linalg.linalg.LinAlgError
-  else:
-    return C
+    raise
 
 def swap_columns(a,b,arrayIn):
   """
@@ -517,75 +493,16 @@ def get_full_rank_H_matrix(H, verbose=False):
   already full rank, will determine which rows are dependent and
   remove them. The updated matrix will be returned.
   """
-  tempArray = H.copy()
-  if linalg.matrix_rank(tempArray) == tempArray.shape[0]:
+  tempArray = GF2_matrix(H)
+  [rowOrder, columnOrder, rank] = tempArray.systematic_reduce()
+  if rank == H.shape[0]:
     if verbose:
       print 'Returning H; it is already full rank.'
-    return tempArray
-
-  numRows = tempArray.shape[0]
-  numColumns = tempArray.shape[1]
-  limit = numRows
-  rank = 0
-  i = 0
+    return H.copy()
 
-  # Create an array to save the column permutations.
-  columnOrder = arange(numColumns).reshape(1,numColumns)
-
-  # Create an array to save the row permutations. We just need
-  # this to know which dependent rows to delete.
-  rowOrder = arange(numRows).reshape(numRows,1)
-
-  while i < limit:
-    if verbose:
-      print 'In get_full_rank_H_matrix; i:', i
-    # Flag indicating that the row contains a non-zero entry
-    found  = False
-    for j in arange(i, numColumns):
-      if tempArray[i, j] == 1:
-        # Encountered a non-zero entry at (i, j)
-        found =  True
-        # Increment rank by 1
-        rank = rank + 1
-        # Make the entry at (i,i) be 1
-        tempArray = swap_columns(j,i,tempArray)
-        # Keep track of the column swapping
-        columnOrder = swap_columns(j,i,columnOrder)
-        break
-    if found == True:
-      for k in arange(0,numRows):
-        if k == i: continue
-        # Checking for 1's
-        if tempArray[k, i] == 1:
-          # Add row i to row k
-          tempArray[k,:] = tempArray[k,:] + tempArray[i,:]
-          # Addition is mod2
-          tempArray = tempArray.copy() % 2
-          # All the entries above & below (i, i) are now 0
-      i = i + 1
-    if found == False:
-      # Push the row of 0s to the bottom, and move the bottom
-      # rows up (sort of a rotation thing).
-      tempArray = move_row_to_bottom(i,tempArray)
-      # Decrease limit since we just found a row of 0s
-      limit -= 1
-      # Keep track of row swapping
-      rowOrder = move_row_to_bottom(i,rowOrder)
-
-  # Don't need the dependent rows
-  finalRowOrder = rowOrder[0:i]
-
-  # Reorder H, per the permutations taken above .
-  # First, put rows in order, omitting the dependent rows.
-  newNumberOfRowsForH = finalRowOrder.shape[0]
-  newH = zeros((newNumberOfRowsForH, numColumns))
-  for index in arange(newNumberOfRowsForH):
-    newH[index,:] = H[finalRowOrder[index],:]
-
-  # Next, put the columns in order.
-  tempHarray = newH.copy()
-  for index in arange(numColumns):
-    newH[:,index] = tempHarray[:,columnOrder[0,index]]
+  # Reorder H, per the permutations found by the reduction, omitting
+  # the dependent rows.
+  newH = H[rowOrder[0:rank]][:, columnOrder]
 
   if verbose:
     print 'original H.shape:', H.shape
@@ -600,6 +517,11 @@ def get_best_matrix(H, numIterations=100, verbose=False):
   The submatrices returned are those needed for real-time encoding.
   """
 
+  # The rank of H does not change between iterations, so only check
+  # it once.
+  if not _is_full_rank(H, verbose):
+    return
+
   hadFirstJoy = 0
   index = 1
   while index <= numIterations:
@@ -607,7 +529,7 @@ def get_best_matrix(H, numIterations=100, verbose=False):
       print '--- In get_best_matrix, iteration:', index
     index += 1
     try:
-      ret = greedy_upper_triangulation(H, verbose)
+      ret = _greedy_upper_triangulation(H, verbose)
     except ValueError, e:
       if verbose > 1:
         print 'greedy_upper_triangulation error: ', e
@@ -647,43 +569,10 @@ def getSystematicGmatrix(GenMatrix):
   generator matrix format. Use the function getSystematicGmatrixFromH
   for that purpose.
   """
-  tempArray = GenMatrix.copy()
-  numRows = tempArray.shape[0]
-  numColumns = tempArray.shape[1]
-  limit = numRows
-  rank = 0
-  i = 0
-  while i < limit:
-    # Flag indicating that the row contains a non-zero entry
-    found = False
-    for j in arange(i, numColumns):
-      if tempArray[i, j] == 1:
-        # Encountered a non-zero entry at (i, j)
-        found = True
-        # Increment rank by 1
-        rank = rank + 1
-        # make the entry at (i,i) be 1
-        tempArray = swap_columns(j,i,tempArray)
-        break
-    if found == True:
-      for k in arange(0,numRows):
-        if k == i: continue
-        # Checking for 1's
-        if tempArray[k, i] == 1:
-          # add row i to row k
-          tempArray[k,:] = tempArray[k,:] + tempArray[i,:]
-          # Addition is mod2
-          tempArray = tempArray.copy() % 2
-          # All the entries above & below (i, i) are now 0
-      i = i + 1
-    if found == False:
-      # push the row of 0s to the bottom, and move the bottom
-      # rows up (sort of a rotation thing)
-      tempArray = move_row_to_bottom(i,tempArray)
-      # decrease limit since we just found a row of 0s
-      limit -= 1
-  # the rows below i are the dependent rows, which we discard
-  G = tempArray[0:i,:]
+  tempArray = GF2_matrix(GenMatrix)
+  [rowOrder, columnOrder, rank] = tempArray.systematic_reduce()
+  # the rows below rank are the dependent rows, which we discard
+  G = tempArray.dense(GenMatrix.dtype)[rowOrder[0:rank]][:, columnOrder]
   return G
 
 def getSystematicGmatrixFromH(H, verbose=False):
@@ -45,3 +45,4 @@ from extended_tagged_decoder import extended_tagged_decoder
 
 from fec_test import fec_test
 from bercurve_generator import bercurve_generator
+from ber_sweep import ber_sweep
@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, blocks
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+import zlib
+import numpy
+
+from fec_test import fec_test
+
+
+def confidence_errors(confidence, rel_error):
+    '''
+    Number of bit errors after which the BER estimate lies within
+    +/- rel_error (relative) of the true BER with the given confidence.
+    Bit errors are rare events, so their count is treated as Poisson
+    distributed and the normal approximation is used.
+    '''
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("confidence must be between 0 and 1")
+    if not rel_error > 0.0:
+        raise ValueError("rel_error must be positive")
+    # invert erf(z / sqrt(2)) = confidence by bisection
+    lo, hi = 0.0, 40.0
+    for i in range(100):
+        z = (lo + hi) / 2.0
+        if math.erf(z / math.sqrt(2.0)) < confidence:
+            lo = z
+        else:
+            hi = z
+    return int(math.ceil((hi / rel_error) ** 2))
+
+
+def _run_chunk(job):
+    '''
+    Runs one chunk of a BER point in its own flowgraph and returns
+    the number of bit errors and compared bits. The data and the noise
+    depend on the seeds and the chunk number only, so a chunk gives the
+    same result no matter which process runs it or when.
+    '''
+    (point, chunk, make_encoder, make_decoder, esno,
+     chunk_bytes, threading, puncpat, seed, point_seed) = job
+    rng = numpy.random.RandomState([seed, point_seed, chunk])
+    data = rng.randint(0, 256, chunk_bytes)
+    noise_seed = int(rng.randint(1, 2**31 - 1))
+
+    tb = gr.top_block()
+    src = blocks.vector_source_b(map(int, data), False)
+    test = fec_test(generic_encoder=make_encoder(),
+                    generic_decoder=make_decoder(),
+                    esno=esno, threading=threading,
+                    puncpat=puncpat, seed=noise_seed)
+    snk_decoded = blocks.vector_sink_b()
+    snk_sent = blocks.vector_sink_b()
+    tb.connect(src, test)
+    tb.connect((test, 0), snk_decoded)
+    tb.connect((test, 1), snk_sent)
+    tb.run()
+
+    decoded = numpy.array(snk_decoded.data(), dtype=numpy.uint8)
+    sent = numpy.array(snk_sent.data(), dtype=numpy.uint8)
+    # the decoder only emits whole frames
+    nbytes = min(decoded.shape[0], sent.shape[0])
+    errors = numpy.unpackbits(decoded[:nbytes] ^ sent[:nbytes]).sum()
+    return (point, int(errors), 8 * nbytes)
+
+
+class ber_sweep:
+    '''
+    BER curve measurement over a process pool.
+
+    Every (variant, Es/N0) point is measured in chunks of chunk_bytes
+    random bytes, each chunk in its own fec_test flowgraph. Chunks of
+    all points are spread over the worker processes, and a point stops
+    after target_errors bit errors, after enough errors for the
+    confidence/rel_error interval, or after max_bits bits, whichever
+    comes first. Without target_errors and confidence, points stop
+    after 100 errors.
+
+    variants is a list of (name, make_encoder, make_decoder) tuples.
+    The factories are called without arguments in the worker process
+    and must return objects accepted by fec_test, e.g.
+    functools.partial(fec.cc_encoder_make, 2048, 7, 2, [79, 109]).
+    They are pickled, so module level functions or partials of them
+    have to be used. chunk_bytes should be a multiple of the frame
+    size, bits of an incomplete frame at the end of a chunk are not
+    counted.
+
+    If checkpoint names a file, the error and bit counts are written
+    there after every chunk. Running the same sweep again resumes
+    from the file, points are identified by the variant name and the
+    Es/N0 value.
+    '''
+
+    def __init__(self, variants, esno=numpy.arange(0.0, 3.0, .25),
+                 target_errors=None, confidence=None, rel_error=None,
+                 max_bits=10**8, chunk_bytes=8192, threading=None,
+                 puncpat='11', seed=0, processes=None, checkpoint=None):
+        self.variants = variants
+        self.esno = [float(e) for e in esno]
+        self.target_errors = target_errors
+        if confidence is not None:
+            required = confidence_errors(confidence, rel_error)
+            if target_errors is None or required < target_errors:
+                self.target_errors = required
+        if self.target_errors is None:
+            self.target_errors = 100
+        self.max_bits = max_bits
+        self.chunk_bytes = chunk_bytes
+        self.threading = threading
+        self.puncpat = puncpat
+        self.seed = seed
+        self.processes = processes
+        self.checkpoint = checkpoint
+
+        self.points = []
+        for (name, make_encoder, make_decoder) in variants:
+            for esno in self.esno:
+                self.points.append({'variant': name, 'esno': esno,
+                                    'errors': 0, 'bits': 0, 'chunks': 0,
+                                    'make_encoder': make_encoder,
+                                    'make_decoder': make_decoder})
+        self._load_checkpoint()
+
+    def _key(self, p):
+        return "%s %r" % (p['variant'], p['esno'])
+
+    def _is_done(self, p):
+        return p['errors'] >= self.target_errors or p['bits'] >= self.max_bits
+
+    def _load_checkpoint(self):
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return
+        with open(self.checkpoint, 'r') as f:
+            saved = json.load(f)
+        for p in self.points:
+            counts = saved.get(self._key(p))
+            if counts is not None:
+                p['errors'] = counts['errors']
+                p['bits'] = counts['bits']
+                p['chunks'] = counts['chunks']
+
+    def _save_checkpoint(self):
+        if self.checkpoint is None:
+            return
+        saved = {}
+        for p in self.points:
+            saved[self._key(p)] = {'variant': p['variant'], 'esno': p['esno'],
+                                   'errors': p['errors'], 'bits': p['bits'],
+                                   'chunks': p['chunks']}
+        path = os.path.dirname(os.path.abspath(self.checkpoint))
+        # write to a temporary file first, an interrupted write never
+        # damages the previous checkpoint
+        fd, tmp_file = tempfile.mkstemp(suffix=".tmp", dir=path)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(saved, f, indent=1, sort_keys=True)
+            os.rename(tmp_file, self.checkpoint)
+        except:
+            os.remove(tmp_file)
+            raise
+
+    def _job(self, i):
+        p = self.points[i]
+        return (i, p['chunks'], p['make_encoder'], p['make_decoder'],
+                p['esno'], self.chunk_bytes, self.threading, self.puncpat,
+                self.seed, zlib.crc32(self._key(p)) & 0xffffffff)
+
+    def run(self):
+        '''
+        Measures all points that are not done yet and returns a dict
+        mapping each variant name to an array of BERs, one per Es/N0.
+        '''
+        processes = self.processes
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        todo = [i for i in range(len(self.points))
+                if not self._is_done(self.points[i])]
+
+        if processes > 1 and len(todo) > 0:
+            pool = multiprocessing.Pool(processes)
+            try:
+                # keep at most one chunk of every point in flight, so
+                # that a point never runs far past its stop condition
+                inflight = [pool.apply_async(_run_chunk, (self._job(i),))
+                            for i in todo]
+                while len(inflight) > 0:
+                    ready = [r for r in inflight if r.ready()]
+                    if len(ready) == 0:
+                        # a timeout keeps the wait interruptible with Ctrl-C
+                        inflight[0].wait(0.1)
+                        continue
+                    for r in ready:
+                        inflight.remove(r)
+                        # get() raises the worker's exception, if any
+                        i = self._add_result(r.get())
+                        if not self._is_done(self.points[i]):
+                            inflight.append(pool.apply_async(_run_chunk, (self._job(i),)))
+                pool.close()
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            for i in todo:
+                while not self._is_done(self.points[i]):
+                    self._add_result(_run_chunk(self._job(i)))
+
+        return self.ber()
+
+    def _add_result(self, result):
+        (i, errors, bits) = result
+        if bits == 0:
+            raise ValueError("no decoded frame in a chunk, chunk_bytes must be at least one frame")
+        p = self.points[i]
+        p['errors'] += errors
+        p['bits'] += bits
+        p['chunks'] += 1
+        self._save_checkpoint()
+        return i
+
+    def ber(self):
+        '''
+        Returns the current BER estimates as a dict mapping each
+        variant name to an array with one value per Es/N0. Points
+        without any measured bits are NaN.
+        '''
+        curves = {}
+        for (name, make_encoder, make_decoder) in self.variants:
+            curves[name] = numpy.zeros(len(self.esno))
+        for p in self.points:
+            ber = float('nan')
+            if p['bits'] > 0:
+                ber = float(p['errors']) / p['bits']
+            curves[p['variant']][self.esno.index(p['esno'])] = ber
+        return curves
@@ -29,9 +29,14 @@ from channel_construction_bec import design_snr_to_bec_eta
 from channel_construction_bec import bhattacharyya_bounds
 from channel_construction_awgn import tal_vardy_tpm_algorithm
 from helper_functions import *
+import contextlib
+import os
+import tempfile
 
-
-Z_PARAM_FIRST_HEADER_LINE = "Bhattacharyya parameters (Z-parameters) for a polar code"
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 def get_frozen_bit_indices_from_capacities(chan_caps, nfrozen):
@@ -74,13 +79,12 @@ def frozen_bit_positions(block_size, info_size, design_snr=0.0):
 
 def generate_filename(block_size, design_snr, mu):
     filename = "polar_code_z_parameters_N" + str(int(block_size))
-    filename += "_SNR" + str(float(design_snr)) + "_MU" + str(int(mu)) + ".polar"
+    filename += "_SNR" + str(float(design_snr)) + "_MU" + str(int(mu)) + ".npy"
     return filename
 
 
 def default_dir():
     dir_def = "~/.gnuradio/polar/"
-    import os
     path = os.path.expanduser(dir_def)
 
     try:
@@ -91,27 +95,67 @@ def default_dir():
     return path
 
 
-def save_z_parameters(z_params, block_size, design_snr, mu, alt_construction_method='Tal-Vardy algorithm'):
+@contextlib.contextmanager
+def _cache_lock(full_file):
+    # serialize construction of one parameter set across processes.
+    # Without fcntl (Windows) concurrent builds may run twice, the atomic
+    # rename in save_z_parameters still keeps readers safe.
+    lock_name = full_file + ".lock"
+    while True:
+        lock_file = open(lock_name, 'a')
+        if fcntl is None:
+            break
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        # The holder before may have removed the file while we waited,
+        # the lock then guards nothing. Retry on the current file.
+        try:
+            if os.path.samestat(os.fstat(lock_file.fileno()), os.stat(lock_name)):
+                break
+        except OSError:
+            pass
+        lock_file.close()
+    try:
+        yield
+    finally:
+        # Remove the lock file while still holding the lock. Processes
+        # waiting on it notice and lock a new file, where they find the
+        # finished cache file.
+        try:
+            os.remove(lock_name)
+        except OSError:
+            pass
+        lock_file.close()
+
+
+def save_z_parameters(z_params, block_size, design_snr, mu):
     path = default_dir()
     filename = generate_filename(block_size, design_snr, mu)
-    header = Z_PARAM_FIRST_HEADER_LINE + "\n"
-    header += "Channel construction method: " + alt_construction_method + "\n"
-    header += "Parameters:\n"
-    header += "block_size=" + str(block_size) + "\n"
-    header += "design_snr=" + str(design_snr) + "\n"
-    header += "mu=" + str(mu)
-    np.savetxt(path + filename, z_params, header=header)
+    # write to a temporary file first, readers only ever see complete files
+    fd, tmp_file = tempfile.mkstemp(suffix=".tmp", prefix=filename, dir=path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.asarray(z_params, dtype=float))
+        os.rename(tmp_file, path + filename)
+    except:
+        os.remove(tmp_file)
+        raise
 
 
-def load_z_parameters(block_size, design_snr, mu):
+def load_z_parameters(block_size, design_snr, mu, processes=1):
     path = default_dir()
     filename = generate_filename(block_size, design_snr, mu)
     full_file = path + filename
-    import os
     if not os.path.isfile(full_file):
-        z_params = tal_vardy_tpm_algorithm(block_size, design_snr, mu)
-        save_z_parameters(z_params, block_size, design_snr, mu)
-    z_params = np.loadtxt(full_file)
+        with _cache_lock(full_file):
+            # another process might have finished it while we waited
+            if not os.path.isfile(full_file):
+                legacy_file = os.path.splitext(full_file)[0] + ".polar"
+                if os.path.isfile(legacy_file):
+                    z_params = np.loadtxt(legacy_file)
+                else:
+                    z_params = tal_vardy_tpm_algorithm(block_size, design_snr, mu, processes)
+                save_z_parameters(z_params, block_size, design_snr, mu)
+    z_params = np.load(full_file)
     return z_params
 
 
@@ -28,6 +28,9 @@ for an overview of different approaches
 '''
 
 
+import heapq
+import math
+import multiprocessing
 from scipy.optimize import fsolve
 from scipy.special import erfc
 from helper_functions import *
@@ -106,29 +109,68 @@ def capacity_delta_callable():
     return lambda a, b, at, bt: c(a, b) + c(at, bt) - c(a + at, b + bt)
 
 
+def _instant_capacity_delta(a, b):
+    # scalar version of instant_capacity_delta_callable(), nan for empty outputs
+    if not (a > 0. and b > 0.):
+        return np.nan
+    return -1. * (a + b) * math.log((a + b) / 2, 2) + a * math.log(a, 2) + b * math.log(b, 2)
+
+
+def _capacity_delta(a, b, at, bt):
+    return _instant_capacity_delta(a, b) + _instant_capacity_delta(at, bt) - _instant_capacity_delta(a + at, b + bt)
+
+
+def _heap_key(delta, pos):
+    # np.argmin picks the first nan, so nan sorts before everything else
+    if delta != delta:
+        delta = -np.inf
+    return delta, pos
+
+
 def quantize_to_size(tpm, mu):
     # This is a degrading merge, compare [1]
-    calculate_delta_I = capacity_delta_callable()
     L = np.shape(tpm)[1]
     if not mu < L:
         print('WARNING: This channel gets too small!')
-
-    # lambda works on vectors just fine. Use Numpy vector awesomeness.
-    delta_i_vec = calculate_delta_I(tpm[0, 0:-1], tpm[1, 0:-1], tpm[0, 1:], tpm[1, 1:])
-
+    if L <= mu:
+        return tpm
+
+    # Always merge the adjacent pair that loses the least capacity. Pairs
+    # live in a heap keyed by (delta, position) with a linked list of
+    # surviving outputs, stale heap entries are skipped by version.
+    a = tpm[0].tolist()
+    b = tpm[1].tolist()
+    nxt = range(1, L) + [-1]
+    prv = [-1] + range(L - 1)
+    version = [0] * L
+    heap = [_heap_key(_capacity_delta(a[i], b[i], a[i + 1], b[i + 1]), i) + (0, ) for i in range(L - 1)]
+    heapq.heapify(heap)
     for i in range(L - mu):
-        d = np.argmin(delta_i_vec)
-        ap = tpm[0, d] + tpm[0, d + 1]
-        bp = tpm[1, d] + tpm[1, d + 1]
-        if d > 0:
-            delta_i_vec[d - 1] = calculate_delta_I(tpm[0, d - 1], tpm[1, d - 1], ap, bp)
-        if d < delta_i_vec.size - 1:
-            delta_i_vec[d + 1] = calculate_delta_I(ap, bp, tpm[0, d + 1], tpm[1, d + 1])
-        delta_i_vec = np.delete(delta_i_vec, d)
-        tpm = np.delete(tpm, d, axis=1)
-        tpm[0, d] = ap
-        tpm[1, d] = bp
-    return tpm
+        while True:
+            delta, d, v = heapq.heappop(heap)
+            if v == version[d] and nxt[d] >= 0:
+                break
+        e = nxt[d]
+        ap = a[d] + a[e]
+        bp = b[d] + b[e]
+        p = prv[d]
+        if p >= 0:
+            version[p] += 1
+            heapq.heappush(heap, _heap_key(_capacity_delta(a[p], b[p], ap, bp), p) + (version[p], ))
+        version[d] += 1
+        if nxt[e] >= 0:
+            # same neighbour update as the reference implementation
+            heapq.heappush(heap, _heap_key(_capacity_delta(ap, bp, a[e], b[e]), d) + (version[d], ))
+            prv[nxt[e]] = d
+        nxt[d] = nxt[e]
+        version[e] += 1
+        a[d] = ap
+        b[d] = bp
+
+    keep = [0]
+    while nxt[keep[-1]] >= 0:
+        keep.append(nxt[keep[-1]])
+    return np.array((np.take(a, keep), np.take(b, keep)))
 
 
 def upper_bound_z_params(z, block_size, design_snr):
@@ -137,7 +179,15 @@ def upper_bound_z_params(z, block_size, design_snr):
     return z
 
 
-def tal_vardy_tpm_algorithm(block_size, design_snr, mu):
+def _construct_channel_pair(args):
+    # split one channel into its upper and lower child, compare [1] Alg. C
+    tpm, mu = args
+    ch1 = upper_convolve(tpm, mu)
+    ch2 = lower_convolve(tpm, mu)
+    return quantize_to_size(ch1, mu), quantize_to_size(ch2, mu)
+
+
+def tal_vardy_tpm_algorithm(block_size, design_snr, mu, processes=1):
     mu = mu // 2  # make sure algorithm uses only as many bins as specified.
     block_power = power_of_2_int(block_size)
     channels = np.zeros((block_size, 2, mu))
@@ -145,16 +195,31 @@ def tal_vardy_tpm_algorithm(block_size, design_snr, mu):
 
     print('Constructing polar code with Tal-Vardy algorithm')
     print('(block_size = {0}, design SNR = {1}, mu = {2}'.format(block_size, design_snr, 2 * mu))
+    # all channels of one level are independent. Spread them over a process
+    # pool if asked to, processes=None uses all CPUs.
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    pool = None
+    # daemonic pool workers may not fork again, construct serially there.
+    if processes > 1 and block_size > processes and not multiprocessing.current_process().daemon:
+        pool = multiprocessing.Pool(processes)
     show_progress_bar(0, block_size)
-    for j in range(0, block_power):
-        u = 2 ** j
-        for t in range(u):
-            show_progress_bar(u + t, block_size)
-            # print("(u={0}, t={1}) = {2}".format(u, t, u + t))
-            ch1 = upper_convolve(channels[t], mu)
-            ch2 = lower_convolve(channels[t], mu)
-            channels[t] = quantize_to_size(ch1, mu)
-            channels[u + t] = quantize_to_size(ch2, mu)
+    try:
+        for j in range(0, block_power):
+            u = 2 ** j
+            jobs = [(channels[t], mu) for t in range(u)]
+            if pool is not None and u >= processes:
+                results = pool.map(_construct_channel_pair, jobs, max(1, u // (4 * processes)))
+            else:
+                results = map(_construct_channel_pair, jobs)
+            for t, (ch1, ch2) in enumerate(results):
+                channels[t] = ch1
+                channels[u + t] = ch2
+            show_progress_bar(2 * u, block_size)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
 
     z = np.zeros(block_size)
     for i in range(block_size):
@@ -162,7 +227,6 @@ def tal_vardy_tpm_algorithm(block_size, design_snr, mu):
 
     z = z[bit_reverse_vector(np.arange(block_size), block_power)]
     z = upper_bound_z_params(z, block_size, design_snr)
-    show_progress_bar(block_size, block_size)
     print('')
     print('channel construction DONE')
     return z
@@ -170,68 +234,52 @@ def tal_vardy_tpm_algorithm(block_size, design_snr, mu):
 
 def merge_lr_based(q, mu):
     lrs = q[0] / q[1]
-    vals, indices, inv_indices = np.unique(lrs, return_index=True, return_inverse=True)
+    vals, inv_indices = np.unique(lrs, return_inverse=True)
     # compare [1] (20). Ordering of representatives according to LRs.
-    temp = np.zeros((2, len(indices)), dtype=float)
     if vals.size < mu:
         return q
-    for i in range(len(indices)):
-        merge_pos = np.where(inv_indices == i)[0]
-        sum_items = q[:, merge_pos]
-        if merge_pos.size > 1:
-            sum_items = np.sum(q[:, merge_pos], axis=1)
-        temp[0, i] = sum_items[0]
-        temp[1, i] = sum_items[1]
+    temp = np.zeros((2, vals.size), dtype=float)
+    temp[0] = np.bincount(inv_indices, weights=q[0], minlength=vals.size)
+    temp[1] = np.bincount(inv_indices, weights=q[1], minlength=vals.size)
     return temp
 
 
+def _ordered_outputs(q):
+    # every output symbol is paired with its complement, keep the larger probability first
+    return np.vstack((np.maximum(q[0], q[1]), np.minimum(q[0], q[1])))
+
+
 def upper_convolve(tpm, mu):
-    q = np.zeros((2, mu ** 2))
-    idx = -1
-    for i in range(mu):
-        idx += 1
-        q[0, idx] = (tpm[0, i] ** 2 + tpm[1, i] ** 2) / 2
-        q[1, idx] = tpm[0, i] * tpm[1, i]
-        for j in range(i + 1, mu):
-            idx += 1
-            q[0, idx] = tpm[0, i] * tpm[0, j] + tpm[1, i] * tpm[1, j]
-            q[1, idx] = tpm[0, i] * tpm[1, j] + tpm[1, i] * tpm[0, j]
-            if q[0, idx] < q[1, idx]:
-                q[0, idx], q[1, idx] = swap_values(q[0, idx], q[1, idx])
-
-    idx += 1
-    q = np.delete(q, np.arange(idx, np.shape(q)[1]), axis=1)
+    # all output pairs (i, j) with j >= i, in the order of [1] (23)
+    a = tpm[0, :mu]
+    b = tpm[1, :mu]
+    i, j = np.triu_indices(mu)
+    q0 = a[i] * a[j] + b[i] * b[j]
+    q1 = a[i] * b[j] + b[i] * a[j]
+    diag = i == j
+    q0[diag] /= 2
+    q1[diag] /= 2
+    q = _ordered_outputs((q0, q1))
     q = merge_lr_based(q, mu)
     q = normalize_q(q, tpm)
     return q
 
 
 def lower_convolve(tpm, mu):
-    q = np.zeros((2, mu * (mu + 1)))
-    idx = -1
-    for i in range(0, mu):
-        idx += 1
-        q[0, idx] = (tpm[0, i] ** 2) / 2
-        q[1, idx] = (tpm[1, i] ** 2) / 2
-        if q[0, idx] < q[1, idx]:
-            q[0, idx], q[1, idx] = swap_values(q[0, idx], q[1, idx])
-        idx += 1
-        q[0, idx] = tpm[0, i] * tpm[1, i]
-        q[1, idx] = q[0, idx]
-
-        for j in range(i + 1, mu):
-            idx += 1
-            q[0, idx] = tpm[0, i] * tpm[0, j]
-            q[1, idx] = tpm[1, i] * tpm[1, j]
-            if q[0, idx] < q[1, idx]:
-                q[0, idx], q[1, idx] = swap_values(q[0, idx], q[1, idx])
-            idx += 1
-            q[0, idx] = tpm[0, i] * tpm[1, j]
-            q[1, idx] = tpm[1, i] * tpm[0, j]
-            if q[0, idx] < q[1, idx]:
-                q[0, idx], q[1, idx] = swap_values(q[0, idx], q[1, idx])
-    idx += 1
-    q = np.delete(q, np.arange(idx, np.shape(q)[1]), axis=1)
+    # outputs (i, j) with j >= i and both sign combinations, in the order of [1] (24)
+    a = tpm[0, :mu]
+    b = tpm[1, :mu]
+    q = np.empty((2, mu, mu, 2))
+    q[0, :, :, 0] = np.outer(a, a)
+    q[1, :, :, 0] = np.outer(b, b)
+    q[0, :, :, 1] = np.outer(a, b)
+    q[1, :, :, 1] = np.outer(b, a)
+    diag = np.arange(mu)
+    q[:, diag, diag, 0] /= 2
+    q[1, diag, diag, 1] = q[0, diag, diag, 1]
+    i, j = np.triu_indices(mu)
+    q = q[:, i, j, :].reshape((2, -1))
+    q = _ordered_outputs(q)
     q = merge_lr_based(q, mu)
     q = normalize_q(q, tpm)
     return q
@@ -23,7 +23,6 @@ from common import PolarCommon
 
 # for dev
 from encoder import PolarEncoder
-from matplotlib import pyplot as plt
 
 
 class PolarDecoder(PolarCommon):
@@ -33,6 +32,7 @@ class PolarDecoder(PolarCommon):
         self.error_probability = 0.1  # this is kind of a dummy value. usually chosen individually.
         self.lrs = ((1 - self.error_probability) / self.error_probability, self.error_probability / (1 - self.error_probability))
         self.llrs = np.log(self.lrs)
+        self._init_fast_decoder()
 
     def _llr_bit(self, bit):
         return self.llrs[bit]
@@ -215,6 +215,191 @@ class PolarDecoder(PolarCommon):
         data = self._extract_info_bits_reversed(data)
         return data
 
+    # Batch decoders. Codewords are rows of a (batch, N) LLR array. Since
+    # the bit-reversal permutation commutes with the polar transform, the
+    # received LLRs are bit-reversed once and the code tree is then walked
+    # in natural order, with every f/g update vectorized over the batch
+    # and the whole width of a tree node.
+
+    _RATE_0 = 0
+    _RATE_1 = 1
+    _MIXED = 2
+
+    def _init_fast_decoder(self):
+        self.frozen_mask = np.zeros(self.N, dtype=bool)
+        self.frozen_mask[self.frozen_bit_position] = True
+        self._frozen_u = np.zeros(self.N, dtype=np.uint8)
+        self._frozen_u[self.frozen_bit_position] = self.frozenbits
+        # node types and rate-0 codewords per tree level
+        self._node_types = []
+        self._frozen_codewords = []
+        for d in range(self.power + 1):
+            mask = self.frozen_mask.reshape((-1, 2 ** d))
+            types = np.full(mask.shape[0], self._MIXED, dtype=int)
+            types[mask.all(axis=1)] = self._RATE_0
+            types[~mask.any(axis=1)] = self._RATE_1
+            self._node_types.append(types)
+            self._frozen_codewords.append(self._polar_transform(self._frozen_u.reshape((-1, 2 ** d))))
+
+    def _polar_transform(self, u):
+        # u * F^(xm) for every row of u, with 2 ** m columns
+        x = u.copy()
+        rows, size = x.shape
+        half = 1
+        while half < size:
+            blocks = x.reshape((rows, -1, 2, half))
+            blocks[:, :, 0, :] ^= blocks[:, :, 1, :]
+            half *= 2
+        return x
+
+    def _f_batch(self, la, lb, out):
+        # min-sum check node update, same approximation as _llr_odd
+        np.multiply(np.sign(la) * np.sign(lb), np.minimum(np.abs(la), np.abs(lb)), out=out)
+
+    def _g_batch(self, la, lb, ca, out):
+        np.add(np.where(ca, -la, la), lb, out=out)
+
+    def _prepare_llrs(self, data, is_llr):
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data[np.newaxis, :]
+        if not data.shape[1] == self.N:
+            raise ValueError("codeword length={0} is not equal to n={1}!".format(data.shape[1], self.N))
+        if is_llr:
+            llrs = data.astype(float)
+        else:
+            llrs = self.llrs[data.astype(int)]
+        return llrs[:, self.bit_reverse_positions]
+
+    def _fast_sc_node(self, d, j, llr_buf, c, u):
+        size = 2 ** d
+        lo = j * size
+        node_type = self._node_types[d][j]
+        llr = llr_buf[d]
+        if node_type == self._RATE_0:
+            u[:, lo:lo + size] = self._frozen_u[lo:lo + size]
+            c[:] = self._frozen_codewords[d][j]
+            return
+        if node_type == self._RATE_1:
+            c[:] = llr < 0.0
+            u[:, lo:lo + size] = self._polar_transform(c)
+            return
+        half = size // 2
+        la = llr[:, :half]
+        lb = llr[:, half:]
+        # children reuse the preallocated buffer one level down
+        self._f_batch(la, lb, llr_buf[d - 1])
+        self._fast_sc_node(d - 1, 2 * j, llr_buf, c[:, :half], u)
+        self._g_batch(la, lb, c[:, :half], llr_buf[d - 1])
+        self._fast_sc_node(d - 1, 2 * j + 1, llr_buf, c[:, half:], u)
+        c[:, :half] ^= c[:, half:]
+
+    def _fast_sc_decoder(self, llrs):
+        # SC decoding that skips all-frozen (rate-0) and all-info (rate-1)
+        # subtrees. The latter are decided directly on the node LLRs.
+        nframes = llrs.shape[0]
+        llr_buf = [np.empty((nframes, 2 ** d), dtype=float) for d in range(self.power + 1)]
+        llr_buf[self.power][:] = llrs
+        c = np.empty((nframes, self.N), dtype=np.uint8)
+        u = np.empty((nframes, self.N), dtype=np.uint8)
+        self._fast_sc_node(self.power, 0, llr_buf, c, u)
+        return u
+
+    def _scl_decoder(self, llrs, list_size):
+        # SC list decoding with the LLR based approximate path metric.
+        # Decisions and surviving parents are recorded per bit and the
+        # best path is traced back at the end.
+        nframes = llrs.shape[0]
+        n = self.power
+        rows = np.arange(nframes)[:, np.newaxis]
+        paths = np.arange(list_size)
+        llr_buf = [np.empty((nframes, list_size, 2 ** d), dtype=float) for d in range(n + 1)]
+        llr_buf[n][:] = llrs[:, np.newaxis, :]
+        # codewords of finished left children, per level
+        c_buf = [np.empty((nframes, list_size, 2 ** d), dtype=np.uint8) for d in range(n)]
+        metrics = np.full((nframes, list_size), np.inf)
+        metrics[:, 0] = 0.0
+        decisions = np.empty((self.N, nframes, list_size), dtype=np.uint8)
+        parents = np.empty((self.N, nframes, list_size), dtype=int)
+        parents[:] = paths
+
+        for i in range(self.N):
+            if i == 0:
+                start = n
+            else:
+                # descend from the lowest common ancestor of bits i-1 and i
+                top = 1
+                while not (i >> (top - 1)) & 1:
+                    top += 1
+                half = 2 ** (top - 1)
+                llr = llr_buf[top]
+                self._g_batch(llr[..., :half], llr[..., half:], c_buf[top - 1], llr_buf[top - 1])
+                start = top - 1
+            for d in range(start, 0, -1):
+                half = 2 ** (d - 1)
+                llr = llr_buf[d]
+                self._f_batch(llr[..., :half], llr[..., half:], llr_buf[d - 1])
+
+            leaf = llr_buf[0][..., 0]
+            hard = leaf < 0.0
+            if self.frozen_mask[i]:
+                ui = self._frozen_u[i]
+                metrics += np.where(hard != ui, np.abs(leaf), 0.0)
+                decisions[i] = ui
+            else:
+                # hard decisions first, so ties keep the SC decision
+                candidates = np.hstack((metrics, metrics + np.abs(leaf)))
+                order = np.argsort(candidates, axis=1, kind='mergesort')[:, :list_size]
+                metrics = candidates[rows, order]
+                parent = order % list_size
+                decisions[i] = hard[rows, parent] ^ (order >= list_size)
+                parents[i] = parent
+                if not (parent == paths).all():
+                    for d in range(1, n + 1):
+                        if not (i >> (d - 1)) & 1:
+                            llr_buf[d][:] = llr_buf[d][rows, parent]
+                    for d in range(n):
+                        if (i >> d) & 1:
+                            c_buf[d][:] = c_buf[d][rows, parent]
+
+            # propagate partial sums up to the next unfinished left child
+            c = decisions[i][..., np.newaxis]
+            d = 0
+            while d < n and (i >> d) & 1:
+                c = np.concatenate((c_buf[d] ^ c, c), axis=2)
+                d += 1
+            if d < n:
+                c_buf[d][:] = c
+
+        u = np.empty((nframes, self.N), dtype=np.uint8)
+        path = np.argmin(metrics, axis=1)[:, np.newaxis]
+        for i in range(self.N - 1, -1, -1):
+            u[:, i] = decisions[i][rows, path][:, 0]
+            path = parents[i][rows, path]
+        return u
+
+    def decode_batch(self, data, list_size=1, is_llr=False):
+        """
+        Decode a batch of codewords at once.
+
+        data holds one codeword per row, either as hard bits like decode()
+        or as LLRs (positive for 0) if is_llr is set. list_size=1 runs the
+        Fast-SC decoder, larger values run SC list decoding. Returns the
+        info bits of every codeword, one row per codeword.
+
+        Fast-SC takes the same decisions as the SC decoder except where
+        LLRs inside an all-info subtree tie at zero, which mostly happens
+        with hard decision input.
+        """
+        if list_size < 1:
+            raise ValueError("list_size={0} MUST be >= 1!".format(list_size))
+        llrs = self._prepare_llrs(data, is_llr)
+        if list_size == 1:
+            u = self._fast_sc_decoder(llrs)
+        else:
+            u = self._scl_decoder(llrs, list_size)
+        return u[:, self.info_bit_position].astype(int)
+
 
 def test_systematic_decoder():
     ntests = 1000
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr, gr_unittest
+import fec_swig as fec
+import numpy as np
+import os
+import tempfile
+
+from ber_sweep import ber_sweep, confidence_errors
+
+FRAME_BITS = 240
+
+
+def make_encoder():
+    return fec.dummy_encoder_make(FRAME_BITS)
+
+
+def make_decoder():
+    return fec.dummy_decoder.make(FRAME_BITS)
+
+
+class test_ber_sweep(gr_unittest.TestCase):
+
+    def setUp(self):
+        (fd, self.checkpoint) = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        os.remove(self.checkpoint)
+        self.variants = [('dummy', make_encoder, make_decoder)]
+
+    def tearDown(self):
+        if os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+
+    def test_001_confidence_errors(self):
+        self.assertEqual(confidence_errors(0.95, 0.1), 385)
+        self.assertRaises(ValueError, confidence_errors, 1.5, 0.1)
+
+    def test_002_uncoded_ber(self):
+        # without coding the BER at Es/N0 = 0 dB is Q(sqrt(2)) = 0.0786
+        sweep = ber_sweep(self.variants, esno=[0.0], target_errors=2000,
+                          chunk_bytes=30 * FRAME_BITS / 8, processes=1)
+        ber = sweep.run()['dummy']
+        self.assertTrue(abs(ber[0] - 0.0786) < 0.01)
+
+    def test_003_resume(self):
+        esno = [0.0, 2.0, 4.0]
+        reference = ber_sweep(self.variants, esno=esno, target_errors=200,
+                              chunk_bytes=300, processes=1).run()
+
+        # stop early, then continue from the checkpoint in two processes
+        partial = ber_sweep(self.variants, esno=esno, target_errors=200,
+                            max_bits=4800, chunk_bytes=300, processes=1,
+                            checkpoint=self.checkpoint)
+        partial.run()
+        resumed = ber_sweep(self.variants, esno=esno, target_errors=200,
+                            chunk_bytes=300, processes=2,
+                            checkpoint=self.checkpoint)
+        self.assertEqual([p['bits'] for p in resumed.points],
+                         [p['bits'] for p in partial.points])
+        ber = resumed.run()
+        self.assertFloatTuplesAlmostEqual(reference['dummy'], ber['dummy'])
+
+
+if __name__ == '__main__':
+    gr_unittest.run(test_ber_sweep, "test_ber_sweep.xml")
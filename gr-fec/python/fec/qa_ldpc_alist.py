@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+import numpy as np
+import os
+import tempfile
+
+from LDPC.Generate_LDPC_matrix_functions import *
+
+# Get location of the alist files. If run in 'ctest' or 'make test',
+# the shell script sets srcdir. Otherwise, we assume we're running
+# from the current directory and know where to go.
+LDPC_ALIST_DIR = os.getenv('srcdir', '.') + "/../../ldpc_alist/"
+
+
+class test_ldpc_alist(gr_unittest.TestCase):
+
+    def setUp(self):
+        (fd, self.filename) = tempfile.mkstemp(suffix='.alist')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def write_text(self, text):
+        f = open(self.filename, 'w')
+        f.write(text)
+        f.close()
+
+    def test_001_round_trip(self):
+        H = LDPC_matrix(alist_filename=LDPC_ALIST_DIR + "n_0100_k_0027_gap_04.alist").H
+        self.assertEqual(H.shape, (73, 100))
+        write_alist_file(self.filename, H)
+        self.assertTrue((read_alist_file(self.filename) == H).all())
+
+        [numRows, numCols, rowIndices, colPointers] = read_alist_indices(self.filename)
+        self.assertEqual((numRows, numCols), H.shape)
+        for j in range(numCols):
+            self.assertEqual(list(rowIndices[colPointers[j]:colPointers[j+1]]),
+                             list(H[:, j].nonzero()[0]))
+
+    def test_002_write_indices(self):
+        # one empty column and one empty row
+        H = np.array([[1, 0, 1, 0],
+                      [0, 0, 1, 1],
+                      [0, 0, 0, 0]])
+        write_alist_indices(self.filename, 3, 4, [0, 0, 1, 1], [0, 1, 1, 3, 4])
+        expected = ("4 3\n2 2\n1 0 2 1 \n2 2 0 \n"
+                    "1 \n\n1 2 \n2 \n"
+                    "1 3 \n3 4 \n\n")
+        self.assertEqual(open(self.filename).read(), expected)
+        self.assertTrue((read_alist_file(self.filename) == H).all())
+
+    def test_003_variants(self):
+        H = np.array([[1, 1, 0],
+                      [0, 1, 1]])
+        # zero padded lists, as written by MacKay's tools
+        self.write_text("3 2\n2 2\n1 2 1\n2 2\n1 0\n1 2\n2 0\n1 2\n2 3\n")
+        self.assertTrue((read_alist_file(self.filename) == H).all())
+        # tab separated lists without trailing spaces, as written by
+        # the C++ alist class
+        self.write_text("3 2\n2 2\n1 2 1\n2 2\n1\n1\t2\n2\n1\t2\n2\t3\n")
+        self.assertTrue((read_alist_file(self.filename) == H).all())
+        # truncated file
+        self.write_text("3 2\n2 2\n1 2 1\n2 2\n1\n1\t2\n")
+        self.assertRaises(ValueError, read_alist_file, self.filename)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(test_ldpc_alist, "test_ldpc_alist.xml")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+import numpy as np
+
+from LDPC.GF2_matrix import GF2_matrix, mul_inv_upper_triangular
+from LDPC.Generate_LDPC_matrix_functions import *
+
+
+def rank_mod2(H):
+    # dense reference elimination
+    H = H.copy() % 2
+    rank = 0
+    for j in range(H.shape[1]):
+        rows = np.nonzero(H[rank:, j])[0]
+        if rows.size == 0:
+            continue
+        H[[rank, rows[0] + rank]] = H[[rows[0] + rank, rank]]
+        others = np.nonzero(H[:, j])[0]
+        others = others[others != rank]
+        H[others] = (H[others] + H[rank]) % 2
+        rank += 1
+        if rank == H.shape[0]:
+            break
+    return rank
+
+
+def bits(rows):
+    return np.array([[int(b) for b in row] for row in rows])
+
+
+class test_ldpc_gf2(gr_unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(1)
+
+    def test_001_rank(self):
+        for rows, cols in ((4, 4), (10, 20), (33, 70), (70, 130)):
+            H = (np.random.rand(rows, cols) < 0.2).astype(int)
+            H[-1] = H[0] ^ H[1]
+            self.assertEqual(GF2_matrix(H).rank(), rank_mod2(H))
+
+        # full rank over the reals, singular over GF(2)
+        H = np.array([[1, 1, 0], [0, 1, 1], [1, 0, 1]])
+        self.assertEqual(GF2_matrix(H).rank(), 2)
+
+    def test_002_inverse(self):
+        n = 0
+        while n < 10:
+            A = (np.random.rand(13, 13) < 0.5).astype(int)
+            if rank_mod2(A) < 13:
+                self.assertRaises(np.linalg.LinAlgError, inv_mod2, A)
+                continue
+            invA = inv_mod2(A)
+            self.assertTrue((np.dot(A, invA) % 2 == np.identity(13)).all())
+            n += 1
+
+        T = np.triu((np.random.rand(20, 20) < 0.3).astype(int), 1) + np.identity(20, dtype=int)
+        E = (np.random.rand(6, 20) < 0.3).astype(int)
+        X = mul_inv_upper_triangular(E, T)
+        self.assertTrue((np.dot(X, T) % 2 == E).all())
+
+    def test_003_full_rank_and_generator(self):
+        H = LDPC_matrix(n_p_q=[60, 3, 6]).H
+        newH = get_full_rank_H_matrix(H)
+        self.assertEqual(newH.shape, (30 - 3 + 1, 60))
+        self.assertEqual(rank_mod2(newH), newH.shape[0])
+
+        G = getSystematicGmatrix(newH)
+        self.assertTrue((G[:, 0:newH.shape[0]] == np.identity(newH.shape[0])).all())
+        # same row space as the permuted input
+        self.assertEqual(rank_mod2(np.concatenate((G, G))), G.shape[0])
+
+    def test_004_greedy_upper_triangulation(self):
+        H = get_full_rank_H_matrix(LDPC_matrix(n_p_q=[60, 3, 6]).H)
+        ret = get_best_matrix(H, 10)
+        self.assertTrue(ret is not None)
+        [bestH, gap] = ret
+        t = H.shape[0] - gap
+        # rows and columns are only permuted
+        self.assertEqual(sorted(bestH.sum(axis=0)), sorted(H.sum(axis=0)))
+        self.assertEqual(sorted(bestH.sum(axis=1)), sorted(H.sum(axis=1)))
+        self.assertEqual(rank_mod2(bestH), H.shape[0])
+        T = bestH[0:t, 0:t]
+        self.assertTrue((np.tril(T) == np.identity(t)).all())
+
+    def test_005_reference_outputs(self):
+        # expected matrices were produced by the dense implementation
+        H = bits([
+            '11110000000000000000', '00001111000000000000',
+            '00000000111100000000', '00000000000011110000',
+            '00000000000000001111', '01000000010000001100',
+            '00000010101001000000', '00011000000010010000',
+            '00000001000100000011', '10100100000000100000',
+            '01010001000000010000', '00000000100001100001',
+            '00000100001110000000', '10100010000000000010',
+            '00001000010000001100'])
+        full_rank = bits([
+            '10000000000101001000', '01000011100000000000',
+            '00100100011000000000', '00010000000010110000',
+            '00001000000000000111', '00001100000000001100',
+            '00100010001010000000', '01010000000100010000',
+            '00000001010000000011', '00000001000100011000',
+            '00100000000010100001', '00010000111000000000',
+            '10000010000001000010'])
+        best = bits([
+            '10000000010011000000', '01000000000000000111',
+            '00111000000000010000', '00011100000000001000',
+            '00001111000000000000', '00000101101000000000',
+            '00000010000100101000', '00000001010010100000',
+            '00000000101001000001', '00000000010000001011',
+            '00000000001111000000', '11010000000000000100',
+            '00100000000100010010'])
+        G = bits([
+            '10000001000000000000', '01000001011001101010',
+            '00100001010001010111', '00010001111011111101',
+            '00001000000100000000', '00000101011110110011',
+            '00000010010110001100'])
+
+        newH = get_full_rank_H_matrix(H)
+        self.assertTrue((newH == full_rank).all())
+        self.assertTrue((getSystematicGmatrixFromH(newH) == G).all())
+
+        np.random.seed(5)
+        [bestH, gap] = get_best_matrix(newH, 5)
+        self.assertEqual(gap, 2)
+        self.assertTrue((bestH == best).all())
+
+
+if __name__ == '__main__':
+    gr_unittest.run(test_ldpc_gf2, "test_ldpc_gf2.xml")
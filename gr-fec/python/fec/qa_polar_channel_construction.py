@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+
+from gnuradio import gr_unittest
+import polar.channel_construction as cc
+import polar.channel_construction_awgn as cca
+
+
+class test_polar_channel_construction(gr_unittest.TestCase):
+
+    def setUp(self):
+        # a channel with 2 output pairs, sums to 1
+        self.tpm = np.array([[0.4, 0.3], [0.2, 0.1]])
+        # seeded channel with 4 output pairs
+        rng = np.random.RandomState(42)
+        tpm = rng.rand(2, 4)
+        tpm /= tpm.sum()
+        self.tpm4 = np.vstack((tpm.max(0), tpm.min(0)))
+        # keep the Z-parameter cache in a temporary home directory
+        self.home = os.environ.get('HOME')
+        self.tmp_home = tempfile.mkdtemp()
+        os.environ['HOME'] = self.tmp_home
+
+    def tearDown(self):
+        if self.home is None:
+            del os.environ['HOME']
+        else:
+            os.environ['HOME'] = self.home
+        shutil.rmtree(self.tmp_home)
+
+    def assertArrayAlmostEqual(self, expected, actual, places=12):
+        expected = np.asarray(expected)
+        actual = np.asarray(actual)
+        self.assertEqual(expected.shape, actual.shape)
+        self.assertFloatTuplesAlmostEqual(expected.flatten(), actual.flatten(), places)
+
+    def test_001_upper_convolve(self):
+        # outputs (0, 0), (0, 1), (1, 1), halved on the diagonal,
+        # normalized from a total of 0.5 to 1
+        expected = 2 * np.array([[0.20 / 2, 0.14, 0.10 / 2],
+                                 [0.16 / 2, 0.10, 0.06 / 2]])
+        self.assertArrayAlmostEqual(expected, cca.upper_convolve(self.tpm, 2))
+
+    def test_002_lower_convolve(self):
+        # outputs with equal likelihood ratios merged, sorted by ratio
+        expected = np.array([[0.08 + 0.03, 0.06, 0.08, 0.12, 0.045],
+                             [0.08 + 0.03, 0.04, 0.02, 0.02, 0.005]]) / 0.61
+        self.assertArrayAlmostEqual(expected, cca.lower_convolve(self.tpm, 2))
+
+    def test_003_merge_lr_based(self):
+        q = np.array([[0.3, 0.2, 0.1, 0.15, 0.05], [0.1, 0.05, 0.02, 0.02, 0.01]])
+        expected = np.array([[0.3, 0.2, 0.15, 0.15], [0.1, 0.05, 0.03, 0.02]])
+        self.assertArrayAlmostEqual(expected, cca.merge_lr_based(q, 2))
+        # fewer distinct ratios than mu, unchanged
+        self.assertArrayAlmostEqual(q, cca.merge_lr_based(q, 5))
+
+    def test_004_quantize_to_size(self):
+        # reference values of the loop based merge
+        expected = np.array([[0.11891440324143374, 0.47557187600202006, 0.20257096925944412],
+                             [0.10823609685375915, 0.09087357258456785, 0.00383308205877506]])
+        q = cca.quantize_to_size(cca.lower_convolve(self.tpm4, 4), 3)
+        self.assertArrayAlmostEqual(expected, q)
+        self.assertArrayAlmostEqual(self.tpm4, cca.quantize_to_size(self.tpm4, 4))
+
+    def test_005_tal_vardy(self):
+        # reference values of the loop based construction
+        expected = np.array([9.9567886625318114e-01, 9.1658177213572523e-01,
+                             8.9941267726633367e-01, 4.9867484081971170e-01,
+                             8.2907981333993208e-01, 3.4934083461627213e-01,
+                             2.4304149553241966e-01, 1.6891259252522176e-02,
+                             6.8754901276386882e-01, 1.9450467862174844e-01,
+                             1.2331049325640520e-01, 4.0555256959424451e-03,
+                             7.1274244101760253e-02, 1.3173861973714543e-03,
+                             6.7081272063030458e-04, 1.1253517471925916e-07])
+        z = cca.tal_vardy_tpm_algorithm(16, 0.0, 8)
+        self.assertArrayAlmostEqual(expected, z)
+        z = cca.tal_vardy_tpm_algorithm(16, 0.0, 8, processes=2)
+        self.assertArrayAlmostEqual(expected, z)
+
+    def test_006_cache_round_trip(self):
+        path = cc.default_dir()
+        z = np.linspace(0.0, 1.0, 16)
+        cc.save_z_parameters(z, 16, 0.0, 8)
+        self.assertEqual(os.listdir(path), [cc.generate_filename(16, 0.0, 8)])
+        self.assertEqual(list(z), list(cc.load_z_parameters(16, 0.0, 8)))
+
+    def test_007_cache_legacy_file(self):
+        path = cc.default_dir()
+        z = np.linspace(1.0, 0.0, 32)
+        filename = cc.generate_filename(32, 1.0, 4)
+        legacy_file = os.path.join(path, os.path.splitext(filename)[0] + ".polar")
+        np.savetxt(legacy_file, z)
+        # converted from the text file instead of constructing the code,
+        # no lock file is left behind
+        self.assertFloatTuplesAlmostEqual(z, cc.load_z_parameters(32, 1.0, 4), 12)
+        self.assertEqual(sorted(os.listdir(path)),
+                         sorted([filename, os.path.basename(legacy_file)]))
+        os.remove(legacy_file)
+        self.assertFloatTuplesAlmostEqual(z, cc.load_z_parameters(32, 1.0, 4), 12)
+
+    def test_008_cache_construct(self):
+        path = cc.default_dir()
+        z = cc.load_z_parameters(16, 0.0, 8)
+        self.assertEqual(os.listdir(path), [cc.generate_filename(16, 0.0, 8)])
+        self.assertArrayAlmostEqual(cca.tal_vardy_tpm_algorithm(16, 0.0, 8), z)
+
+    def test_009_cache_lock(self):
+        # each holder removes the lock file, the waiters must not end up
+        # holding locks on removed files side by side
+        full_file = os.path.join(cc.default_dir(), cc.generate_filename(16, 0.0, 8))
+        holders = []
+        overlaps = []
+
+        def build():
+            for i in range(20):
+                with cc._cache_lock(full_file):
+                    holders.append(None)
+                    time.sleep(0.001)
+                    if len(holders) != 1:
+                        overlaps.append(len(holders))
+                    holders.pop()
+
+        threads = [threading.Thread(target=build) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual([], overlaps)
+        self.assertEqual([], os.listdir(cc.default_dir()))
+
+
+if __name__ == '__main__':
+    gr_unittest.run(test_polar_channel_construction, "test_polar_channel_construction.xml")
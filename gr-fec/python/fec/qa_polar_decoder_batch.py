@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr_unittest
+import numpy as np
+
+from polar.encoder import PolarEncoder
+from polar.decoder import PolarDecoder
+import polar.channel_construction as cc
+
+
+class test_polar_decoder_batch(gr_unittest.TestCase):
+
+    def setup_code(self, expo, frozen_bit_values=None):
+        block_size = 2 ** expo
+        num_info_bits = 2 ** (expo - 1)
+        frozen_bit_positions = cc.frozen_bit_positions(block_size, num_info_bits, 0.0)
+        if frozen_bit_values is None:
+            frozen_bit_values = np.zeros(block_size - num_info_bits, dtype=int)
+        encoder = PolarEncoder(block_size, num_info_bits, frozen_bit_positions, frozen_bit_values)
+        decoder = PolarDecoder(block_size, num_info_bits, frozen_bit_positions, frozen_bit_values)
+        return encoder, decoder
+
+    def encode_frames(self, encoder, nframes):
+        bits = np.random.randint(2, size=(nframes, encoder.K))
+        return bits, np.array([encoder.encode(b) for b in bits])
+
+    def test_001_noiseless(self):
+        np.random.seed(1)
+        encoder, decoder = self.setup_code(8, np.random.randint(2, size=2 ** 7))
+        bits, data = self.encode_frames(encoder, 10)
+        for list_size in (1, 4):
+            res = decoder.decode_batch(data, list_size=list_size)
+            self.assertTupleEqual(res.shape, bits.shape)
+            self.assertTrue((res == bits).all())
+        self.assertTrue((decoder.decode_batch(data[0]) == bits[0]).all())
+
+    def test_002_compare_sc(self):
+        np.random.seed(2)
+        for expo in (4, 6, 8):
+            encoder, decoder = self.setup_code(expo)
+            bits, data = self.encode_frames(encoder, 20)
+            data ^= np.random.rand(*data.shape) < 0.05
+            ref = np.array([decoder.decode(d) for d in data])
+            # SC list decoding with one path is plain SC decoding
+            llrs = decoder._prepare_llrs(data, False)
+            res = decoder._scl_decoder(llrs, 1)[:, decoder.info_bit_position]
+            self.assertTrue((res == ref).all())
+
+    def test_003_fast_sc_soft(self):
+        np.random.seed(3)
+        encoder, decoder = self.setup_code(9)
+        bits, data = self.encode_frames(encoder, 20)
+        llrs = 2.0 * (1.0 - 2.0 * data) + np.random.randn(*data.shape)
+        # skipping rate-0/rate-1 nodes must not change any decision
+        res = decoder.decode_batch(llrs, is_llr=True)
+        ref = decoder._scl_decoder(decoder._prepare_llrs(llrs, True), 1)
+        self.assertTrue((res == ref[:, decoder.info_bit_position]).all())
+
+    def test_004_list(self):
+        np.random.seed(4)
+        encoder, decoder = self.setup_code(8)
+        bits, data = self.encode_frames(encoder, 50)
+        llrs = 2.0 * (1.0 - 2.0 * data) + 1.5 * np.random.randn(*data.shape)
+        sc_errors = (decoder.decode_batch(llrs, is_llr=True) != bits).any(axis=1).sum()
+        scl_errors = (decoder.decode_batch(llrs, list_size=8, is_llr=True) != bits).any(axis=1).sum()
+        self.assertLessEqual(scl_errors, sc_errors)
+        self.assertRaises(ValueError, decoder.decode_batch, data, 0)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(test_polar_decoder_batch, "test_polar_decoder_batch.xml")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import imp
+import os
+import shutil
+import tempfile
+
+# The hier block library and the block cache are read when grc is imported
+tmp_dir = tempfile.mkdtemp()
+os.environ['GRC_HIER_PATH'] = os.path.join(tmp_dir, 'hier')
+os.environ['GRC_CACHE_FILE'] = os.path.join(tmp_dir, 'cache', 'block_cache.pickle')
+
+from gnuradio import gr_unittest
+
+grcc = imp.load_source('grcc', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grcc'))
+
+
+def param(key, value):
+    return '<param><key>{0}</key><value>{1}</value></param>'.format(key, value)
+
+
+def block(key, *params):
+    return '<block><key>{0}</key>{1}</block>'.format(key, ''.join(params))
+
+
+def connection(src, sink):
+    return ('<connection><source_block_id>{0}</source_block_id>'
+            '<sink_block_id>{1}</sink_block_id>'
+            '<source_key>0</source_key><sink_key>0</sink_key></connection>').format(src, sink)
+
+
+def flow_graph(fg_id, generate_options, blocks, description=''):
+    return ("<?xml version='1.0' encoding='utf-8'?>\n<flow_graph>{0}{1}</flow_graph>\n".format(
+        block('options', param('id', fg_id), param('generate_options', generate_options),
+              param('description', description)),
+        ''.join(blocks)))
+
+
+def hier_block(fg_id, inner_key=None, description=''):
+    blocks = [block('pad_source', param('id', 'src'), param('type', 'float')),
+              block('pad_sink', param('id', 'snk'), param('type', 'float'))]
+    if inner_key is None:
+        blocks.append(connection('src', 'snk'))
+    else:
+        blocks += [block(inner_key, param('id', 'inner')),
+                   connection('src', 'inner'), connection('inner', 'snk')]
+    return flow_graph(fg_id, 'hb', blocks, description)
+
+
+def top_block(fg_id, mid_key, *mid_params):
+    return flow_graph(fg_id, 'no_gui', [
+        block('blocks_null_source', param('id', 'src'), param('type', 'float')),
+        block(mid_key, param('id', 'mid'), *mid_params),
+        block('blocks_null_sink', param('id', 'snk'), param('type', 'float')),
+        connection('src', 'mid'), connection('mid', 'snk')])
+
+
+class test_grcc(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.out_dir = os.path.join(tmp_dir, 'out')
+        os.makedirs(self.out_dir)
+        self.files = {}
+        self.write('top', top_block('top', 'hier_b'))
+        self.write('plain', top_block('plain', 'blocks_copy', param('type', 'float')))
+        self.write('hier_b', hier_block('hier_b', 'hier_a'))
+        self.write('hier_a', hier_block('hier_a'))
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+        shutil.rmtree(os.environ['GRC_HIER_PATH'], ignore_errors=True)
+
+    def write(self, name, data):
+        self.files[name] = os.path.join(self.out_dir, name + '.grc')
+        with open(self.files[name], 'w') as fp:
+            fp.write(data)
+
+    def run_batch(self):
+        # listed before the hier blocks they use
+        batch = grcc.GRCCBatch([self.files[name] for name in ('top', 'plain', 'hier_b', 'hier_a')],
+                               self.out_dir + '/', processes=1)
+        self.assertTrue(batch.run(), batch.failed)
+        return sorted(os.path.basename(f)[:-4] for f in batch.skipped)
+
+    def test_001_skip_unchanged(self):
+        self.assertEqual(self.run_batch(), [])
+        self.assertTrue(os.path.exists(os.path.join(self.out_dir, 'top.py')))
+        # a second run over unchanged inputs compiles nothing
+        self.assertEqual(self.run_batch(), ['hier_a', 'hier_b', 'plain', 'top'])
+        self.assertEqual(self.run_batch(), ['hier_a', 'hier_b', 'plain', 'top'])
+
+    def test_002_nested_hier_block_changed(self):
+        self.run_batch()
+        self.write('hier_a', hier_block('hier_a', description='changed'))
+        # hier_b uses hier_a, its block description and top stay the same
+        self.assertEqual(self.run_batch(), ['plain', 'top'])
+        self.assertEqual(self.run_batch(), ['hier_a', 'hier_b', 'plain', 'top'])
+
+
+if __name__ == '__main__':
+    try:
+        gr_unittest.run(test_grcc, "test_grcc.xml")
+    finally:
+        shutil.rmtree(tmp_dir)
@@ -23,28 +23,124 @@ import zmq
 import threading
 import numpy
 
+
+class probe_interface():
+    """
+    A subscribed probe socket with its delivery settings and counters
+    of the received and dropped bytes and messages.
+    """
+    def __init__(self, socket, address, data_type, callback_func, conflate, decimation):
+        self.socket = socket
+        self.address = address
+        self.dtype = numpy.dtype(data_type)
+        self.callback_func = callback_func
+        self.conflate = conflate
+        self.decimation = max(1, int(decimation))
+        self.received_msgs = 0
+        self.received_bytes = 0
+        self.dropped_msgs = 0
+        self.dropped_bytes = 0
+
+
 class probe_manager():
+    """
+    Receives the data of probe (PUB) sockets and passes it to callback
+    functions as numpy arrays.
+
+    The arrays are read-only views of the received messages, copy them
+    to modify the data. Either call watcher() periodically, e.g. from a
+    GUI timer, or let start_watcher() call it in a background thread,
+    in which case the callbacks run in that thread. Each call delivers
+    every message that arrived since the last one.
+    """
     def __init__(self):
         self.zmq_context = zmq.Context()
         self.poller = zmq.Poller()
         self.interfaces = []
+        self.keep_running = False
+        self.watcher_thread = None
+
+    def add_socket(self, address, data_type, callback_func, conflate=False, decimation=1):
+        """
+        Subscribe to a probe socket.
 
-    def add_socket(self, address, data_type, callback_func):
+        With decimation N, only every Nth message is passed on. With
+        conflate, a watcher() call passes on only the newest message,
+        e.g. for displays that cannot keep up with the stream. Skipped
+        messages are counted as dropped.
+        """
         socket = self.zmq_context.socket(zmq.SUB)
         socket.setsockopt(zmq.SUBSCRIBE, "")
         socket.connect(address)
-        # use a tuple to store interface elements
-        self.interfaces.append((socket, data_type, callback_func))
+        self.interfaces.append(probe_interface(socket, address, data_type, callback_func,
+                                               conflate, decimation))
         self.poller.register(socket, zmq.POLLIN)
 
-    def watcher(self):
-        poll = dict(self.poller.poll(0))
+    def watcher(self, timeout=0):
+        """
+        Wait up to timeout milliseconds for data and deliver all
+        messages waiting on any socket.
+        """
+        poll = dict(self.poller.poll(timeout))
         for i in self.interfaces:
-            # i = (socket, data_type, callback_func)
-            if poll.get(i[0]) == zmq.POLLIN:
-                # receive data
-                msg_packed = i[0].recv()
-                # use numpy to unpack the data
-                msg_unpacked = numpy.fromstring(msg_packed, numpy.dtype(i[1]))
-                # invoke callback function
-                i[2](msg_unpacked)
+            if poll.get(i.socket) == zmq.POLLIN:
+                self._drain(i)
+
+    def _drain(self, i):
+        newest = None
+        while True:
+            try:
+                # no copy, the numpy array is a view of the message
+                msg = i.socket.recv(zmq.NOBLOCK, copy=False)
+            except zmq.Again:
+                break
+            nbytes = len(msg)
+            i.received_msgs += 1
+            i.received_bytes += nbytes
+            if i.received_msgs % i.decimation:
+                i.dropped_msgs += 1
+                i.dropped_bytes += nbytes
+                continue
+            if i.conflate:
+                if newest is not None:
+                    i.dropped_msgs += 1
+                    i.dropped_bytes += len(newest)
+                newest = msg
+                continue
+            i.callback_func(numpy.frombuffer(msg, i.dtype))
+        if newest is not None:
+            i.callback_func(numpy.frombuffer(newest, i.dtype))
+
+    def _watch(self):
+        while self.keep_running:
+            # a timeout so stop_watcher is noticed
+            self.watcher(10)
+
+    def start_watcher(self):
+        """
+        Receive in a background thread. Add all sockets before.
+        """
+        self.keep_running = True
+        self.watcher_thread = threading.Thread(target=self._watch, args=())
+        self.watcher_thread.daemon = True
+        self.watcher_thread.start()
+
+    def stop_watcher(self):
+        self.keep_running = False
+        if self.watcher_thread is not None:
+            self.watcher_thread.join()
+            self.watcher_thread = None
+
+    def statistics(self):
+        """
+        Returns a list with a dict of the address and the received and
+        dropped messages and bytes of each socket, in the order they
+        were added. Messages dropped by ZeroMQ itself, e.g. at the high
+        water mark, are not counted.
+        """
+        return [dict(address=i.address,
+                     received_msgs=i.received_msgs,
+                     received_bytes=i.received_bytes,
+                     dropped_msgs=i.dropped_msgs,
+                     dropped_bytes=i.dropped_bytes)
+                for i in self.interfaces]
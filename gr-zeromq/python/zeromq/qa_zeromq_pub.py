@@ -24,6 +24,9 @@
 from gnuradio import gr, gr_unittest
 from gnuradio import blocks, zeromq
 from gnuradio import eng_notation
+import numpy
+import time
+import zmq
 
 class qa_zeromq_pub (gr_unittest.TestCase):
 
@@ -49,6 +52,32 @@ class qa_zeromq_pub (gr_unittest.TestCase):
     def recv_data (self, data):
         self.rx_data = data
 
+    def test_002_conflate_decimate (self):
+        pub = zmq.Context.instance().socket(zmq.PUB)
+        pub.bind("tcp://127.0.0.1:5556")
+        rx_all = []
+        rx_conflated = []
+        rx_decimated = []
+        self.probe_manager = zeromq.probe_manager()
+        self.probe_manager.add_socket("tcp://127.0.0.1:5556", 'float32', rx_all.append)
+        self.probe_manager.add_socket("tcp://127.0.0.1:5556", 'float32', rx_conflated.append, conflate=True)
+        self.probe_manager.add_socket("tcp://127.0.0.1:5556", 'float32', rx_decimated.append, decimation=4)
+        time.sleep(0.5) # let the subscriptions arrive
+        for i in range(10):
+            pub.send(numpy.arange(i, i + 5, dtype=numpy.float32).tostring())
+        time.sleep(0.2)
+        self.probe_manager.watcher(1000)
+        self.assertEqual(len(rx_all), 10)
+        self.assertFloatTuplesAlmostEqual(rx_all[3], range(3, 8))
+        self.assertEqual(len(rx_conflated), 1)
+        self.assertFloatTuplesAlmostEqual(rx_conflated[0], range(9, 14))
+        self.assertEqual([x[0] for x in rx_decimated], [3, 7])
+        stats = self.probe_manager.statistics()
+        self.assertEqual([x['received_msgs'] for x in stats], [10, 10, 10])
+        self.assertEqual([x['dropped_msgs'] for x in stats], [0, 9, 8])
+        self.assertEqual(stats[1]['dropped_bytes'], 9 * 5 * 4)
+        pub.close()
+
 
 if __name__ == '__main__':
     gr_unittest.run(qa_zeromq_pub)
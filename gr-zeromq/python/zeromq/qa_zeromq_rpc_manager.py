@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr_unittest
+from gnuradio import zeromq
+import threading
+import time
+
+class qa_zeromq_rpc_manager (gr_unittest.TestCase):
+
+    def setUp (self):
+        self.server = zeromq.rpc_manager(workers=4)
+        self.server.set_reply_socket("tcp://127.0.0.1:5559")
+        self.server.add_interface("echo", lambda x: x)
+        self.server.add_interface("slow", lambda t, x: (time.sleep(t), x)[1])
+        self.server.add_interface("no_pmt", lambda: object())
+        self.server.start_watcher()
+        self.client = zeromq.rpc_manager()
+        self.client.set_request_socket("tcp://127.0.0.1:5559")
+
+    def tearDown (self):
+        self.client.close()
+        self.server.close()
+
+    def test_001_concurrent (self):
+        # the slow calls run in parallel in the worker threads
+        start = time.time()
+        futures = [self.client.request_async("slow", [0.2, i]) for i in range(4)]
+        self.assertEqual([f.result(2.0) for f in futures], range(4))
+        self.assertTrue(time.time() - start < 0.6)
+        # requests from several threads get their own replies
+        results = {}
+        def call(i):
+            results[i] = self.client.request("echo", [i])
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, dict((i, i) for i in range(10)))
+
+    def test_002_timeout (self):
+        self.assertEqual(self.client.request("slow", [0.5, 1], timeout=0.1), None)
+        # the late reply is not taken for the reply of the next request
+        self.assertEqual(self.client.request("echo", [2]), 2)
+        time.sleep(0.5)
+        self.assertEqual(self.client.request("echo", [3]), 3)
+
+    def test_003_failed_calls (self):
+        # replies that cannot be converted to a PMT become None and
+        # do not stop the workers
+        for i in range(5):
+            self.assertEqual(self.client.request("no_pmt"), None)
+        self.assertEqual(self.client.request("not_there"), None)
+        self.assertEqual(self.client.request("echo", [4]), 4)
+
+    def test_004_stop_client (self):
+        self.assertEqual(self.client.request("echo", [5]), 5)
+        self.client.stop_client()
+        self.assertEqual(self.client._client_thread, None)
+        # the request side can be set up again
+        self.client.set_request_socket("tcp://127.0.0.1:5559")
+        self.assertEqual(self.client.request("echo", [6]), 6)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_zeromq_rpc_manager)
@@ -22,32 +22,103 @@
 import zmq
 import pmt
 import threading
+import itertools
+import struct
+import Queue
+
+
+class rpc_timeout(Exception):
+    pass
+
+
+class rpc_future():
+    """
+    The pending reply of a request. The reply is deserialized by the
+    thread that calls result().
+    """
+    def __init__(self, manager, req_id):
+        self._manager = manager
+        self._req_id = req_id
+        self._event = threading.Event()
+        self._msg = None
+
+    def done(self):
+        return self._event.is_set()
+
+    def _set_msg(self, msg):
+        self._msg = msg
+        self._event.set()
+
+    def result(self, timeout=None):
+        """
+        Wait for the reply, at most timeout seconds, and return it.
+        Raises rpc_timeout if there is no reply in time, a late reply
+        is discarded.
+        """
+        if not self._event.wait(timeout):
+            self._manager._discard(self._req_id)
+            raise rpc_timeout("no reply within %s s" % timeout)
+        return pmt.to_python(pmt.deserialize_str(self._msg))
 
 
 class rpc_manager():
-    def __init__(self):
+    """
+    Calls functions of remote rpc_managers.
+
+    The reply socket is a ROUTER socket. Its I/O thread (the watcher)
+    only moves messages, a pool of worker threads deserializes the
+    requests, runs the callbacks and serializes the replies, so a slow
+    callback does not block other clients. Callbacks may run
+    concurrently. REQ clients are served as well.
+
+    The request socket is a DEALER socket. Every request carries an id
+    in its envelope, so any number of requests can be in flight, from
+    any number of threads. REP servers echo the id as well.
+
+    close() stops all threads and closes the sockets.
+    """
+    def __init__(self, workers=4):
         self.zmq_context = zmq.Context()
-        self.poller_rep = zmq.Poller()
-        self.poller_req_out = zmq.Poller()
-        self.poller_req_in = zmq.Poller()
+        self.workers = workers
         self.interfaces = dict()
+        self.keep_running = False
+        self.watcher_thread = None
+        self.rep_socket = None
+        self.req_socket = None
+        # requests of the watcher to the worker threads
+        self._calls = Queue.Queue()
+        self._worker_threads = []
+        # pending requests by id and the client I/O thread
+        self._pending = dict()
+        self._pending_lock = threading.Lock()
+        self._req_ids = itertools.count()
+        self._client_thread = None
+        self._client_local = threading.local()
+        self._client_sockets = []
+        self._inproc = "inproc://rpc_manager-%x" % id(self)
 
     def __del__(self):
         self.stop_watcher()
-        self.watcher_thread.join()
 
     def set_reply_socket(self, address):
-        self.rep_socket = self.zmq_context.socket(zmq.REP)
+        self.rep_socket = self.zmq_context.socket(zmq.ROUTER)
         self.rep_socket.bind(address)
         print "[RPC] reply socket bound to: ", address
-        self.poller_rep.register(self.rep_socket, zmq.POLLIN)
+        # replies of the worker threads to the watcher
+        self.replies_socket = self.zmq_context.socket(zmq.PULL)
+        self.replies_socket.bind(self._inproc + "-replies")
 
     def set_request_socket(self, address):
-        self.req_socket = self.zmq_context.socket(zmq.REQ)
+        self.req_socket = self.zmq_context.socket(zmq.DEALER)
+        self.req_socket.setsockopt(zmq.LINGER, 0)
         self.req_socket.connect(address)
         print "[RPC] request socket connected to: ", address
-        self.poller_req_out.register(self.req_socket, zmq.POLLOUT)
-        self.poller_req_in.register(self.req_socket, zmq.POLLIN)
+        # requests of the calling threads to the client I/O thread
+        self.requests_socket = self.zmq_context.socket(zmq.PULL)
+        self.requests_socket.bind(self._inproc + "-requests")
+        self._client_thread = threading.Thread(target=self._client_io, args=())
+        self._client_thread.daemon = True
+        self._client_thread.start()
 
     def add_interface(self, id_str, callback_func):
         if not self.interfaces.has_key(id_str):
@@ -57,36 +128,174 @@ class rpc_manager():
             print "[RPC] ERROR: duplicate id_str:", id_str
 
     def watcher(self):
-        self.keep_running = True
+        poller = zmq.Poller()
+        poller.register(self.rep_socket, zmq.POLLIN)
+        poller.register(self.replies_socket, zmq.POLLIN)
         while self.keep_running:
-            # poll for calls
-            socks = dict(self.poller_rep.poll(10))
+            # the timeout only bounds the time to notice stop_watcher
+            socks = dict(poller.poll(100))
             if socks.get(self.rep_socket) == zmq.POLLIN:
-                # receive call
-                msg = self.rep_socket.recv()
+                # receive all calls: [identity, (request id,) '', msg]
+                while True:
+                    try:
+                        frames = self.rep_socket.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    self._calls.put((frames[:-1], frames[-1]))
+            if socks.get(self.replies_socket) == zmq.POLLIN:
+                while True:
+                    try:
+                        frames = self.replies_socket.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    self.rep_socket.send_multipart(frames)
+
+    def _worker(self):
+        replies = self.zmq_context.socket(zmq.PUSH)
+        replies.setsockopt(zmq.LINGER, 0)
+        replies.connect(self._inproc + "-replies")
+        while True:
+            call = self._calls.get()
+            if call is None:
+                break
+            (envelope, msg) = call
+            try:
                 (id_str, args) = pmt.to_python(pmt.deserialize_str(msg))
                 print "[RPC] request:", id_str, ", args:", args
-                reply = self.callback(id_str, args)
-                self.rep_socket.send(pmt.serialize_str(pmt.to_pmt(reply)))
+                reply = pmt.serialize_str(pmt.to_pmt(self.callback(id_str, args)))
+            except Exception as e:
+                print "[RPC] ERROR: request failed:", e
+                reply = pmt.serialize_str(pmt.to_pmt(None))
+            replies.send_multipart(envelope + [reply])
+        replies.close()
 
     def start_watcher(self):
+        self.keep_running = True
+        self._worker_threads = []
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, args=())
+            t.daemon = True
+            t.start()
+            self._worker_threads.append(t)
         self.watcher_thread = threading.Thread(target=self.watcher,args=())
         self.watcher_thread.daemon = True
         self.watcher_thread.start()
 
     def stop_watcher(self):
         self.keep_running = False
-        self.watcher_thread.join()
-
-    def request(self, id_str, args=None):
-        socks = dict(self.poller_req_out.poll(10))
-        if socks.get(self.req_socket) == zmq.POLLOUT:
-            self.req_socket.send(pmt.serialize_str(pmt.to_pmt((id_str,args))))
-        socks = dict(self.poller_req_in.poll(10))
-        if socks.get(self.req_socket) == zmq.POLLIN:
-            reply = pmt.to_python(pmt.deserialize_str(self.req_socket.recv()))
-            print "[RPC] reply:", reply
-            return reply
+        if self.watcher_thread is not None:
+            self.watcher_thread.join()
+            self.watcher_thread = None
+        for t in self._worker_threads:
+            self._calls.put(None)
+        for t in self._worker_threads:
+            t.join()
+        self._worker_threads = []
+
+    def stop_client(self):
+        """
+        Stop the request side: ends the client I/O thread and closes
+        the request sockets of all threads. Requests still in flight
+        get no reply. Call it when no other thread sends requests.
+        """
+        if self._client_thread is None:
+            return
+        # a single frame tells the I/O thread to stop
+        stop = self.zmq_context.socket(zmq.PUSH)
+        stop.connect(self._inproc + "-requests")
+        stop.send("")
+        stop.close()
+        self._client_thread.join()
+        self._client_thread = None
+        self.req_socket = None
+        for sock in self._client_sockets:
+            sock.close()
+        self._client_sockets = []
+        self._client_local = threading.local()
+
+    def close(self):
+        """
+        Stop all threads and close all sockets of this rpc_manager.
+        """
+        self.stop_watcher()
+        self.stop_client()
+        if self.rep_socket is not None:
+            self.rep_socket.close(linger=0)
+            self.replies_socket.close(linger=0)
+            self.rep_socket = None
+        self.zmq_context.term()
+
+    def _client_io(self):
+        poller = zmq.Poller()
+        poller.register(self.req_socket, zmq.POLLIN)
+        poller.register(self.requests_socket, zmq.POLLIN)
+        while True:
+            socks = dict(poller.poll())
+            if socks.get(self.requests_socket) == zmq.POLLIN:
+                while True:
+                    try:
+                        frames = self.requests_socket.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    if len(frames) == 1:
+                        # stop_client: the sockets are closed by this thread
+                        self.req_socket.close()
+                        self.requests_socket.close()
+                        return
+                    self.req_socket.send_multipart(frames)
+            if socks.get(self.req_socket) == zmq.POLLIN:
+                while True:
+                    try:
+                        frames = self.req_socket.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    # [request id, '', msg]
+                    with self._pending_lock:
+                        future = self._pending.pop(frames[0], None)
+                    if future is not None:
+                        future._set_msg(frames[-1])
+
+    def _discard(self, req_id):
+        with self._pending_lock:
+            self._pending.pop(req_id, None)
+
+    def request_async(self, id_str, args=None):
+        """
+        Send a request without waiting for the reply.
+
+        Returns:
+            a rpc_future of the reply
+        """
+        msg = pmt.serialize_str(pmt.to_pmt((id_str,args)))
+        req_id = struct.pack("!Q", self._req_ids.next())
+        future = rpc_future(self, req_id)
+        with self._pending_lock:
+            self._pending[req_id] = future
+        # each calling thread passes its requests to the I/O thread
+        # through its own socket
+        requests = getattr(self._client_local, "socket", None)
+        if requests is None:
+            requests = self.zmq_context.socket(zmq.PUSH)
+            requests.setsockopt(zmq.LINGER, 0)
+            requests.connect(self._inproc + "-requests")
+            self._client_local.socket = requests
+            with self._pending_lock:
+                self._client_sockets.append(requests)
+        requests.send_multipart([req_id, "", msg])
+        return future
+
+    def request(self, id_str, args=None, timeout=1.0):
+        """
+        Call a remote function and wait for the reply, at most timeout
+        seconds. Returns None if there is no reply in time.
+        """
+        try:
+            reply = self.request_async(id_str, args).result(timeout)
+        except rpc_timeout:
+            print "[RPC] ERROR: no reply to request:", id_str
+            return None
+        print "[RPC] reply:", reply
+        return reply
 
     def callback(self, id_str, args):
         if self.interfaces.has_key(id_str):
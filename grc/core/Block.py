@@ -44,6 +44,17 @@ def _get_elem(lst, key):
         raise ValueError('Key "{0}" not found in {1}.'.format(key, _get_keys(lst)))
 
 
+# Compiled cheetah templates, the same strings are resolved over and over
+_template_classes = {}
+
+
+def _get_template_class(tmpl):
+    template_cls = _template_classes.get(tmpl)
+    if template_cls is None:
+        template_cls = _template_classes[tmpl] = Template.compile(source=tmpl)
+    return template_cls
+
+
 class Block(Element):
 
     is_block = True
@@ -97,6 +108,9 @@ class Block(Element):
 
         # Create the param objects
         self._params = list()
+        # Template namespace of resolve_dependencies and the params it was built from
+        self._template_params = None
+        self._template_args = None
 
         # Add the id param
         self.get_params().append(self.get_parent().get_parent().Param(
@@ -694,10 +708,14 @@ class Block(Element):
         tmpl = str(tmpl)
         if '$' not in tmpl:
             return tmpl
-        n = dict((param.get_key(), param.template_arg)
-                 for param in self.get_params())  # TODO: cache that
+        # The template args follow the values of their params, the
+        # namespace only needs rebuilding if params are added or removed
+        if self._template_params != self._params:
+            self._template_params = list(self._params)
+            self._template_args = dict((param.get_key(), param.template_arg)
+                                       for param in self._params)
         try:
-            return str(Template(tmpl, n))
+            return str(_get_template_class(tmpl)(searchList=[self._template_args]))
         except Exception as err:
             return "Template error: {0}\n    {1}".format(tmpl, err)
 
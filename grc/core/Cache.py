@@ -0,0 +1,160 @@
+"""
+Copyright 2016 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+import os
+import sys
+import cPickle as pickle
+import multiprocessing
+import tempfile
+
+from . import ParseXML
+
+# Bump when the nested data format changes
+CACHE_VERSION = 1
+
+# Below this number of changed files parsing in a pool is not worth it
+MIN_PARALLEL_FILES = 16
+
+
+def _parse_pickled(job):
+    """Validate and parse an xml file in a worker process"""
+    xml_file, dtd_file = job
+    try:
+        return pickle.dumps(ParseXML.load_file(xml_file, dtd_file), pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # Invalid files are parsed again by the caller to report the errors
+        return None
+
+
+class Cache(object):
+    """
+    Persistent cache of validated nested data from xml files.
+
+    Entries are keyed by path and only used while the modification time
+    and size of the xml file and of its dtd match. Every lookup returns
+    a fresh copy, the nested data may be modified by the caller.
+    """
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self._entries = {}
+        self._dtd_keys = {}
+        self._keys = {}
+        self._changed = False
+        try:
+            with open(cache_file, 'rb') as fp:
+                version, entries = pickle.load(fp)
+            if version == CACHE_VERSION:
+                self._entries = entries
+        except Exception:
+            pass  # no or unreadable cache, start empty
+
+    def _key(self, xml_file, dtd_file):
+        key = self._keys.get((xml_file, dtd_file))
+        if key is None:
+            if dtd_file and dtd_file not in self._dtd_keys:
+                st = os.stat(dtd_file)
+                self._dtd_keys[dtd_file] = (st.st_mtime, st.st_size)
+            st = os.stat(xml_file)
+            key = st.st_mtime, st.st_size, dtd_file, self._dtd_keys.get(dtd_file)
+            # files are only stat'ed once per cache instance
+            self._keys[xml_file, dtd_file] = key
+        return key
+
+    def _is_valid(self, xml_file, dtd_file):
+        entry = self._entries.get(xml_file)
+        return entry is not None and entry[0] == self._key(xml_file, dtd_file)
+
+    def update(self, jobs, processes=None):
+        """
+        Parse the changed files among the (xml_file, dtd_file) jobs,
+        in worker processes if there are many of them.
+        """
+        jobs = [job for job in jobs if not self._is_valid(*job)]
+        if not jobs:
+            return
+        results = None
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        # daemonic processes may not have children
+        if (len(jobs) >= MIN_PARALLEL_FILES and processes > 1 and
+                not multiprocessing.current_process().daemon):
+            try:
+                pool = multiprocessing.Pool(processes)
+                try:
+                    results = pool.map(_parse_pickled, jobs,
+                                       max(1, len(jobs) // (4 * processes)))
+                finally:
+                    pool.terminate()
+                    pool.join()
+            except OSError:
+                results = None  # no process support, parse here
+        if results is None:
+            results = map(_parse_pickled, jobs)
+
+        for (xml_file, dtd_file), data in zip(jobs, results):
+            if data is not None:
+                self._entries[xml_file] = (self._key(xml_file, dtd_file), data)
+                self._changed = True
+
+    def load(self, xml_file, dtd_file=None):
+        """
+        Get the nested data of an xml file, validating and parsing it if
+        the file changed since it was cached.
+
+        Returns:
+            the nested data with grc version information
+        @throws Exception validation fails
+        """
+        entry = self._entries.get(xml_file)
+        key = self._key(xml_file, dtd_file)
+        if entry is not None and entry[0] == key:
+            try:
+                return pickle.loads(entry[1])
+            except Exception:
+                pass  # e.g. written by another installation, parse again
+        nested_data = ParseXML.load_file(xml_file, dtd_file)
+        self._entries[xml_file] = (key, pickle.dumps(nested_data, pickle.HIGHEST_PROTOCOL))
+        self._changed = True
+        return nested_data
+
+    def save(self):
+        """Write the cache to disk if it changed, dropping deleted files"""
+        for xml_file in self._entries.keys():
+            if not os.path.exists(xml_file):
+                del self._entries[xml_file]
+                self._changed = True
+        if not self._changed:
+            return
+        path = os.path.dirname(self.cache_file)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(path)
+            # Write to a temporary file first, readers only ever see complete caches
+            fd, tmp_file = tempfile.mkstemp(suffix='.tmp', dir=path)
+            try:
+                with os.fdopen(fd, 'wb') as fp:
+                    pickle.dump((CACHE_VERSION, self._entries), fp, pickle.HIGHEST_PROTOCOL)
+                os.rename(tmp_file, self.cache_file)
+            except:
+                os.remove(tmp_file)
+                raise
+            self._changed = False
+        except (IOError, OSError) as e:
+            print >> sys.stderr, 'Warning: Could not write block cache {0}: {1}'.format(self.cache_file, e)
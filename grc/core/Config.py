@@ -32,6 +32,8 @@ class Config(object):
 
     hier_block_lib_dir = os.environ.get('GRC_HIER_PATH', Constants.DEFAULT_HIER_BLOCK_LIB_DIR)
 
+    cache_file = os.environ.get('GRC_CACHE_FILE', Constants.CACHE_FILE)
+
     def __init__(self, prefs_file, version, version_parts=None):
         self.prefs = prefs_file
         self.version = version
@@ -29,6 +29,7 @@ BLOCK_DTD = os.path.join(DATA_DIR, 'block.dtd')
 DEFAULT_FLOW_GRAPH = os.path.join(DATA_DIR, 'default_flow_graph.grc')
 DEFAULT_HIER_BLOCK_LIB_DIR = os.path.expanduser('~/.grc_gnuradio')
 DOMAIN_DTD = os.path.join(DATA_DIR, 'domain.dtd')
+CACHE_FILE = os.path.expanduser('~/.cache/grc_gnuradio/block_cache.pickle')
 
 # File format versions:
 #  0: undefined / legacy
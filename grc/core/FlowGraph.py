@@ -59,6 +59,8 @@ class FlowGraph(Element):
 
         self._eval_cache = {}
         self.namespace = {}
+        self._base_namespace = {}
+        self._namespace_definitions = None
 
         self.grc_file_path = ''
         self._options_block = self.new_block('options')
@@ -225,37 +227,118 @@ class FlowGraph(Element):
         self.bus_ports_rewrite()
 
     def renew_namespace(self):
+        """
+        Evaluate imports, python modules, parameters and variables into the
+        namespace. Only definitions that changed since the last call and
+        the variables depending on them are evaluated again, any change of
+        imports or python modules evaluates everything.
+        """
+        imports = self.get_imports()
+        python_modules = list(self.get_python_modules())
+        parameters = dict((parameter.get_id(), parameter.get_param('value').to_code())
+                          for parameter in self.get_parameters())
+        variables = [(variable.get_id(), variable.get_var_value())
+                     for variable in self.get_variables()]
+        definitions = imports, python_modules, parameters, dict(variables)
+
+        previous = self._namespace_definitions
+        self._namespace_definitions = definitions
+        if previous is None or previous[:2] != definitions[:2]:
+            self._build_namespace(imports, python_modules, parameters, variables)
+            return
+
+        # Names defined differently than before, including removed ones
+        changed = set()
+        for old, new in zip(previous[2:], definitions[2:]):
+            changed.update(name for name in set(old) | set(new) if old.get(name) != new.get(name))
+        if not changed:
+            return
+        dirty = self._get_dependent_names(changed, parameters, definitions[3])
+
+        # Reset dirty names to what the imports and modules defined
+        for name in dirty:
+            self.namespace.pop(name, None)
+            if name in self._base_namespace:
+                self.namespace[name] = self._base_namespace[name]
+
+        for id, code in parameters.iteritems():  # params don't know each other
+            if id in dirty:
+                try:
+                    self.namespace[id] = eval(code, self._base_namespace)
+                except:
+                    pass
+
+        for id, expr in variables:
+            if id in dirty:
+                try:
+                    self.namespace[id] = eval(expr, self.namespace)
+                except:
+                    pass
+
+        # Drop the cached evaluations that may use a dirty name
+        for expr in self._eval_cache.keys():
+            if not dirty.isdisjoint(expr_utils.expr_split(expr)):
+                del self._eval_cache[expr]
+
+    @staticmethod
+    def _get_dependent_names(changed, parameters, variables):
+        """
+        Get the changed names and all variables that depend on them.
+
+        Args:
+            changed: a set of names
+            parameters: a mapping of parameter name to code
+            variables: a mapping of variable name to expression
+
+        Returns:
+            a set of names
+        """
+        # Parameters and removed names have no dependencies of their own
+        exprs = dict.fromkeys(chain(changed, parameters), '')
+        exprs.update(variables)
+        var_graph = expr_utils.get_graph(exprs)
+        dirty = set(changed)
+        todo = list(changed)
+        while todo:
+            for dependent in var_graph.get_edges(todo.pop()):
+                if dependent not in dirty:
+                    dirty.add(dependent)
+                    todo.append(dependent)
+        return dirty
+
+    def _build_namespace(self, imports, python_modules, parameters, variables):
         namespace = {}
         # Load imports
-        for expr in self.get_imports():
+        for expr in imports:
             try:
                 exec expr in namespace
             except:
                 pass
 
-        for id, expr in self.get_python_modules():
+        for id, expr in python_modules:
             try:
                 module = imp.new_module(id)
                 exec expr in module.__dict__
                 namespace[id] = module
             except:
                 pass
+        self._base_namespace = dict(namespace)
 
         # Load parameters
         np = {}  # params don't know each other
-        for parameter in self.get_parameters():
+        for id, code in parameters.iteritems():
             try:
-                value = eval(parameter.get_param('value').to_code(), namespace)
-                np[parameter.get_id()] = value
+                value = eval(code, namespace)
+                np[id] = value
             except:
                 pass
         namespace.update(np)  # Merge param namespace
 
         # Load variables
-        for variable in self.get_variables():
+        for id, expr in variables:
             try:
-                value = eval(variable.get_var_value(), namespace)
-                namespace[variable.get_id()] = value
+                value = eval(expr, namespace)
+                namespace[id] = value
             except:
                 pass
 
@@ -24,6 +24,8 @@ from .utils import odict
 xml_failures = {}
 etree.set_default_parser(etree.XMLParser(remove_comments=True))
 
+_dtds = {}
+
 
 class XMLSyntaxError(Exception):
     def __init__(self, error_log):
@@ -74,7 +76,55 @@ def from_file(xml_file):
     Returns:
         the nested data with grc version information
     """
-    xml = etree.parse(xml_file)
+    return _from_tree(etree.parse(xml_file))
+
+
+def load_file(xml_file, dtd_file=None):
+    """
+    Validate an xml file and create nested data from it. Same as
+    validate_dtd followed by from_file, but the file is parsed only once.
+
+    Args:
+        xml_file: the xml file path
+        dtd_file: the optional dtd file
+
+    Returns:
+        the nested data with grc version information
+    @throws Exception validation fails
+    """
+    # Perform parsing, use dtd validation if dtd file is not specified
+    parser = etree.XMLParser(dtd_validation=not dtd_file, remove_comments=True)
+    try:
+        xml = etree.parse(xml_file, parser=parser)
+    except etree.LxmlError:
+        pass
+    if parser.error_log:
+        raise XMLSyntaxError(parser.error_log)
+
+    if dtd_file:
+        try:
+            # a few dtd files are used for thousands of xml files
+            dtd = _dtds.get(dtd_file)
+            if dtd is None:
+                dtd = _dtds[dtd_file] = etree.DTD(dtd_file)
+            if not dtd.validate(xml.getroot()):
+                raise XMLSyntaxError(dtd.error_log)
+        except etree.LxmlError:
+            raise XMLSyntaxError(dtd.error_log)
+    return _from_tree(xml)
+
+
+def _from_tree(xml):
+    """
+    Create nested data from a parsed xml document, including the grc
+    version information.
+
+    Args:
+        xml: the parsed xml document
+
+    Returns:
+        the nested data with grc version information
+    """
     nested_data = _from_file(xml.getroot())
 
     # Get the embedded instructions and build a dictionary item
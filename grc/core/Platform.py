@@ -17,11 +17,13 @@ along with this program; if not, write to the Free Software
 Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 """
 
+import hashlib
 import os
 import sys
 
 from . import ParseXML, Messages, Constants
 
+from .Cache import Cache
 from .Config import Config
 from .Element import Element
 from .generator import Generator
@@ -71,6 +73,7 @@ class Platform(Element):
         self.connection_templates = {}
 
         self._auto_hier_block_generate_chain = set()
+        self._xml_cache = None
 
         self.build_block_library()
 
@@ -141,8 +144,13 @@ class Platform(Element):
         self.connection_templates.clear()
         ParseXML.xml_failures.clear()
 
+        # Parse the files that changed since the last run up front, in parallel
+        xml_files = list(self.iter_xml_files())
+        self._xml_cache = Cache(self.config.cache_file)
+        self._xml_cache.update([(xml_file, self._get_dtd_file(xml_file)) for xml_file in xml_files])
+
         # Try to parse and load blocks
-        for xml_file in self.iter_xml_files():
+        for xml_file in xml_files:
             try:
                 if xml_file.endswith("block_tree.xml"):
                     self.load_category_tree_xml(xml_file)
@@ -155,6 +163,8 @@ class Platform(Element):
                 pass
             except Exception as e:
                 print >> sys.stderr, 'Warning: XML parsing failed:\n\t%r\n\tIgnoring: %s' % (e, xml_file)
+        self._xml_cache.save()
+        self._xml_cache = None
 
         # Add blocks to block tree
         for key, block in self.blocks.iteritems():
@@ -182,16 +192,57 @@ class Platform(Element):
                     for filename in sorted(filter(lambda f: f.endswith('.xml'), filenames)):
                         yield os.path.join(dirpath, filename)
 
-    def load_block_xml(self, xml_file):
-        """Load block description from xml file"""
+    @staticmethod
+    def _get_dtd_file(xml_file):
+        if xml_file.endswith("block_tree.xml"):
+            return Constants.BLOCK_TREE_DTD
+        elif xml_file.endswith('domain.xml'):
+            return Constants.DOMAIN_DTD
+        return Constants.BLOCK_DTD
+
+    def _load_xml(self, xml_file, dtd_file):
+        """Validate and parse an xml file, from the cache while building the block library"""
+        if self._xml_cache is not None:
+            return self._xml_cache.load(xml_file, dtd_file)
+        return ParseXML.load_file(xml_file, dtd_file)
+
+    def get_block_library_hash(self):
+        """
+        Hash the grc version and the contents of all block, category tree
+        and domain files. Generated hier blocks are left out, they change
+        with their flow graphs and are hashed by the flow graphs using them.
+        """
+        hier_block_lib_dir = os.path.join(os.path.realpath(self.config.hier_block_lib_dir), '')
+        hier_block_files = set(
+            os.path.realpath(block.get_block_wrapper_path())
+            for block in self.blocks.itervalues() if block._grc_source
+        )
+        sha = hashlib.sha1(self.config.version)
+        for xml_file in self.iter_xml_files():
+            xml_path = os.path.realpath(xml_file)
+            if xml_path.startswith(hier_block_lib_dir) or xml_path in hier_block_files:
+                continue
+            with open(xml_file, 'rb') as fp:
+                data = fp.read()
+            sha.update('{0}\0{1}\0'.format(xml_file, len(data)))
+            sha.update(data)
+        return sha.hexdigest()
+
+    def load_block_xml(self, xml_file, replace=False):
+        """
+        Load block description from xml file
+
+        Args:
+            xml_file: the block xml file
+            replace: replace a loaded block with the same key (e.g. a regenerated hier block)
+        """
         # Validate and import
-        ParseXML.validate_dtd(xml_file, Constants.BLOCK_DTD)
-        n = ParseXML.from_file(xml_file).find('block')
+        n = self._load_xml(xml_file, Constants.BLOCK_DTD).find('block')
         n['block_wrapper_path'] = xml_file  # inject block wrapper path
         # Get block instance and add it to the list of blocks
         block = self.Block(self._flow_graph, n)
         key = block.get_key()
-        if key in self.blocks:
+        if key in self.blocks and not replace:
             print >> sys.stderr, 'Warning: Block with key "{0}" already exists.\n\tIgnoring: {1}'.format(key, xml_file)
         else:  # Store the block
             self.blocks[key] = block
@@ -205,8 +256,7 @@ class Platform(Element):
 
     def load_category_tree_xml(self, xml_file):
         """Validate and parse category tree file and add it to list"""
-        ParseXML.validate_dtd(xml_file, Constants.BLOCK_TREE_DTD)
-        xml = ParseXML.from_file(xml_file)
+        xml = self._load_xml(xml_file, Constants.BLOCK_TREE_DTD)
         path = []
 
         def load_category(cat_n):
@@ -222,8 +272,7 @@ class Platform(Element):
 
     def load_domain_xml(self, xml_file):
         """Load a domain properties and connection templates from XML"""
-        ParseXML.validate_dtd(xml_file, Constants.DOMAIN_DTD)
-        n = ParseXML.from_file(xml_file).find('domain')
+        n = self._load_xml(xml_file, Constants.DOMAIN_DTD).find('domain')
 
         key = n.find('key')
         if not key:
@@ -290,8 +339,7 @@ class Platform(Element):
         """
         flow_graph_file = flow_graph_file or self.config.default_flow_graph
         open(flow_graph_file, 'r').close()  # Test open
-        ParseXML.validate_dtd(flow_graph_file, Constants.FLOW_GRAPH_DTD)
-        return ParseXML.from_file(flow_graph_file)
+        return ParseXML.load_file(flow_graph_file, Constants.FLOW_GRAPH_DTD)
 
     def get_new_flow_graph(self):
         return self.FlowGraph(platform=self)
@@ -33,6 +33,19 @@ from ..utils import expr_utils, odict
 DATA_DIR = os.path.dirname(__file__)
 FLOW_GRAPH_TEMPLATE = os.path.join(DATA_DIR, 'flow_graph.tmpl')
 
+_flow_graph_template_cls = None
+
+
+def get_flow_graph_template():
+    """
+    Get the compiled flow graph template class. The template is only
+    read and compiled once per process.
+    """
+    global _flow_graph_template_cls
+    if _flow_graph_template_cls is None:
+        _flow_graph_template_cls = Template.compile(file=FLOW_GRAPH_TEMPLATE)
+    return _flow_graph_template_cls
+
 
 class Generator(object):
     """Adaptor for various generators (uses generate_options)"""
@@ -248,7 +261,7 @@ class TopBlockGenerator(object):
             'callbacks': callbacks,
         }
         # Build the template
-        t = Template(open(FLOW_GRAPH_TEMPLATE, 'r').read(), namespace)
+        t = get_flow_graph_template()(searchList=[namespace])
         output.append((self.file_path, str(t)))
         return output
 
@@ -17,7 +17,10 @@ along with this program; if not, write to the Free Software
 Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 """
 
+import re
 import string
+import tokenize
+
 VAR_CHARS = string.letters + string.digits + '_'
 
 
@@ -56,11 +59,29 @@ class graph(object):
         return self._graph[node_key]
 
 
+# Tokens of an expression, built from the patterns of the python tokenizer:
+# strings (also unterminated ones) and comments are single tokens, as are
+# names, everything else is split into single characters. The tokens
+# always join back to the expression.
+_STRING = tokenize.group(
+    "[uUbB]?[rR]?'''" + tokenize.Single3,
+    '[uUbB]?[rR]?"""' + tokenize.Double3,
+    tokenize.String,
+    r"""['"][\s\S]*""")
+_TOKEN_RE = {
+    VAR_CHARS: re.compile(tokenize.group(_STRING, tokenize.Comment, r'\w+', r'[\s\S]')),
+    VAR_CHARS + '.': re.compile(tokenize.group(_STRING, tokenize.Comment, r'[\w.]+', r'[\s\S]')),
+}
+
+# Tokenized expressions, the same expressions are split over and over
+_split_cache = {}
+_SPLIT_CACHE_SIZE = 10000
+
+
 def expr_split(expr, var_chars=VAR_CHARS):
     """
     Split up an expression by non alphanumeric characters, including underscore.
     Leave strings in-tact.
-    #TODO ignore escaped quotes, use raw strings.
 
     Args:
         expr: an expression string
@@ -68,6 +89,25 @@ def expr_split(expr, var_chars=VAR_CHARS):
     Returns:
         a list of string tokens that form expr
     """
+    key = (expr, var_chars)
+    toks = _split_cache.get(key)
+    if toks is None:
+        token_re = _TOKEN_RE.get(var_chars)
+        if token_re is not None:
+            toks = [match.group() for match in token_re.finditer(expr)]
+        else:
+            toks = _char_split(expr, var_chars)
+        if len(_split_cache) >= _SPLIT_CACHE_SIZE:
+            _split_cache.clear()
+        _split_cache[key] = toks
+    return list(toks)
+
+
+def _char_split(expr, var_chars):
+    """
+    Split up an expression character by character, for other sets of
+    variable name characters.
+    """
     toks = list()
     tok = ''
     quote = ''
@@ -117,8 +157,7 @@ def get_variable_dependencies(expr, vars):
     Returns:
         a subset of vars used in the expression
     """
-    expr_toks = expr_split(expr)
-    return set(var for var in vars if var in expr_toks)
+    return set(expr_split(expr)).intersection(vars)
 
 
 def get_graph(exprs):
@@ -155,19 +194,48 @@ def sort_variables(exprs):
     @throws Exception circular dependencies
     """
     var_graph = get_graph(exprs)
+    names = sorted(var_graph.get_nodes())
+    index = dict((name, i) for i, name in enumerate(names))
+    # Count the dependents of each variable and list its dependencies
+    num_dependents = [len(var_graph.get_edges(name)) for name in names]
+    dependencies = [[] for name in names]
+    for i, name in enumerate(names):
+        for dependent in var_graph.get_edges(name):
+            dependencies[index[dependent]].append(i)
+    # Determine dependency order: strip the variables nothing depends on,
+    # one layer at a time (Kahn's algorithm on the reversed graph)
     sorted_vars = list()
-    # Determine dependency order
-    while var_graph.get_nodes():
-        # Get a list of nodes with no edges
-        indep_vars = filter(lambda var: not var_graph.get_edges(var), var_graph.get_nodes())
-        if not indep_vars:
-            raise Exception('circular dependency caught in sort_variables')
-        # Add the indep vars to the end of the list
-        sorted_vars.extend(sorted(indep_vars))
-        # Remove each edge-less node from the graph
-        for var in indep_vars:
-            var_graph.remove_node(var)
-    return reversed(sorted_vars)
+    layer = [i for i, count in enumerate(num_dependents) if not count]
+    while layer:
+        sorted_vars.extend(layer)
+        next_layer = []
+        for i in layer:
+            for dep in dependencies[i]:
+                num_dependents[dep] -= 1
+                if not num_dependents[dep]:
+                    next_layer.append(dep)
+        layer = sorted(next_layer)
+    if len(sorted_vars) < len(names):
+        raise Exception('circular dependency caught in sort_variables: ' +
+                        ' -> '.join(_find_cycle(var_graph, names, num_dependents)))
+    return [names[i] for i in reversed(sorted_vars)]
+
+
+def _find_cycle(var_graph, names, num_dependents):
+    """
+    Find a cycle among the variables left over by sort_variables. Each
+    of them still has a dependent that is left over, follow those.
+
+    Returns:
+        a list of variable names, starting and ending with the same one
+    """
+    left = set(name for name, count in zip(names, num_dependents) if count)
+    path = [min(left)]
+    seen = {}
+    while path[-1] not in seen:
+        seen[path[-1]] = len(path) - 1
+        path.append(min(left.intersection(var_graph.get_edges(path[-1]))))
+    return path[seen[path[-1]]:]
 
 
 def sort_objects(objects, get_id, get_expr):